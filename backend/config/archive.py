@@ -0,0 +1,9 @@
+from dotenv import load_dotenv
+import os
+load_dotenv()
+ARCHIVE_ENABLED = os.getenv('ARCHIVE_ENABLED', '1') == '1'
+ARCHIVE_ORDERS_AFTER_DAYS = int(os.getenv('ARCHIVE_ORDERS_AFTER_DAYS', 365)) # Завершенные/отмененные заказы с выездом раньше
+ARCHIVE_RECORDS_AFTER_DAYS = int(os.getenv('ARCHIVE_RECORDS_AFTER_DAYS', 365)) # Записи о процедурах старше
+ARCHIVE_BATCH_SIZE = int(os.getenv('ARCHIVE_BATCH_SIZE', 1000)) # Строк за одну транзакцию
+ARCHIVE_MAX_BATCHES = int(os.getenv('ARCHIVE_MAX_BATCHES', 50)) # Пачек за один запуск задачи, остаток - следующей задачей
+ARCHIVE_INTERVAL = int(os.getenv('ARCHIVE_INTERVAL', 86400)) # Секунд между плановыми запусками
@@ -0,0 +1,4 @@
+from dotenv import load_dotenv
+import os
+load_dotenv()
+ASSIGN_SEARCH_BUDGET = float(os.getenv('ASSIGN_SEARCH_BUDGET', 0.3)) # Секунд на локальный поиск после жадного прохода
@@ -0,0 +1,10 @@
+from dotenv import load_dotenv
+import os
+load_dotenv()
+AUDIT_ENABLED = os.getenv('AUDIT_ENABLED', '1') == '1'
+AUDIT_BATCH_SIZE = int(os.getenv('AUDIT_BATCH_SIZE', 500)) # Записей в одном INSERT, при наборе - сброс сразу
+AUDIT_FLUSH_INTERVAL = float(os.getenv('AUDIT_FLUSH_INTERVAL', 2)) # Секунд между сбросами неполного буфера
+AUDIT_MAX_BUFFER = int(os.getenv('AUDIT_MAX_BUFFER', 100000)) # Сверх этого буфер при недоступной БД уходит в файл
+AUDIT_SPILL_PATH = os.getenv('AUDIT_SPILL_PATH', 'audit_spill.jsonl') # Записи, не попавшие в БД, дописываются при старте
+# Таблицы, изменения которых попадают в журнал
+AUDIT_TABLES = ('childs', 'child_diagnosis', 'orders', 'procedure_records')
@@ -8,4 +8,9 @@ ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 EXPIRATION_TIME = timedelta(hours=2)
 UPDATE_EXPIRATION_TIME = timedelta(days=60)
-oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
\ No newline at end of file
+oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
+# Список отозванных refresh-токенов: фильтр Блума в памяти каждого воркера
+REVOCATION_CAPACITY = int(os.getenv('REVOCATION_CAPACITY', 100000)) # Начальный размер фильтра, растет при перестроении
+REVOCATION_ERROR_RATE = float(os.getenv('REVOCATION_ERROR_RATE', 0.001)) # Доля ложных "возможно отозван" (идут в БД)
+REVOCATION_RECENT_SIZE = int(os.getenv('REVOCATION_RECENT_SIZE', 10000)) # LRU недавно отозванных, отвечает без БД
+REVOCATION_SYNC_INTERVAL = float(os.getenv('REVOCATION_SYNC_INTERVAL', 5)) # Секунд до подхвата отзывов с других воркеров
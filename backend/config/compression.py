@@ -0,0 +1,9 @@
+from dotenv import load_dotenv
+import os
+load_dotenv()
+COMPRESSION_MIN_SIZE = int(os.getenv('COMPRESSION_MIN_SIZE', 1024)) # Байт, меньше - отдаем как есть
+COMPRESSION_LEVEL = int(os.getenv('COMPRESSION_LEVEL', 6)) # gzip 1-9
+BROTLI_QUALITY = int(os.getenv('BROTLI_QUALITY', 5)) # brotli 0-11
+# Каталоги, сжатые ответы которых кешируются и не пережимаются на каждый запрос
+COMPRESSION_CACHE_PATHS = ('/api/diagnosis', '/api/procedures', '/api/rooms', '/api/courses')
+COMPRESSION_CACHE_SIZE = int(os.getenv('COMPRESSION_CACHE_SIZE', 256))
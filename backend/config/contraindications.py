@@ -0,0 +1,4 @@
+from dotenv import load_dotenv
+import os
+load_dotenv()
+CONTRAINDICATIONS_TTL = float(os.getenv('CONTRAINDICATIONS_TTL', 10)) # Раз в сколько секунд сверять матрицу противопоказаний со справочниками
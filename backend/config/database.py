@@ -1,8 +1,15 @@
 from sqlalchemy.orm import declarative_base
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.engine import create_engine
+from sqlalchemy import event
+from fastapi import Header, HTTPException
 from dotenv import load_dotenv
-import os 
+from utils.routing import RoutingSession, use_primary
+from utils.load import TimedQueuePool
+from utils.sharding import DEFAULT_SHARD, parse_mapping
+from utils.tokens import bearer_claims
+from utils.enums import AuthStatus
+import os
 
 load_dotenv()
 Base = declarative_base()
@@ -12,15 +19,54 @@ PASSWORD_DB = os.getenv('PASSWORD_DB')
 HOST_DB = os.getenv('HOST_DB')
 NAME_DB = os.getenv('NAME_DB')
 
-engine = create_engine(f'mysql+pymysql://{USERNAME_DB}:{PASSWORD_DB}@{HOST_DB}/{NAME_DB}')
+# DATABASE_URL и REPLICA_URLS позволяют проверить маршрутизацию локально на двух файлах:
+# DATABASE_URL=sqlite:///primary.db REPLICA_URLS=sqlite:///replica.db
+DATABASE_URL = os.getenv('DATABASE_URL', f'mysql+pymysql://{USERNAME_DB}:{PASSWORD_DB}@{HOST_DB}/{NAME_DB}')
+REPLICA_URLS = [url.strip() for url in os.getenv('REPLICA_URLS', '').split(',') if url.strip()]
+PRIMARY_STICKY_SECONDS = int(os.getenv('PRIMARY_STICKY_SECONDS', 5)) # Сколько клиент читает с primary после своей записи
+# Шарды филиалов: SHARD_URLS=east=mysql+pymysql://...,west=... и FACILITY_SHARDS=2=east,3=west.
+# Филиалы без шарда живут в основной БД (DATABASE_URL), реплики используются только для нее
+SHARD_URLS = parse_mapping(os.getenv('SHARD_URLS', ''))
+FACILITY_SHARDS = {int(facility): shard for facility, shard in parse_mapping(os.getenv('FACILITY_SHARDS', '')).items()}
+REPLICATION_MAX_ATTEMPTS = int(os.getenv('REPLICATION_MAX_ATTEMPTS', 50)) # Повторы записи на недоступный шард; интервал растет до JOBS_BACKOFF_MAX
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+POOL_SIZE = int(os.getenv('POOL_SIZE', 5))
+WARMUP_CONNECTIONS = min(int(os.getenv('WARMUP_CONNECTIONS', 2)), POOL_SIZE) # Соединения, открываемые при старте воркера
 
-def get_session():
+def enable_foreign_keys(connection, record):
+    # SQLite по умолчанию не проверяет внешние ключи, и каскады ON DELETE не срабатывают
+    cursor = connection.cursor()
+    cursor.execute('PRAGMA foreign_keys=ON')
+    cursor.close()
+
+def make_engine(url: str):
+    connect_args = {'check_same_thread': False} if url.startswith('sqlite') else {}
+    engine = create_engine(url, poolclass=TimedQueuePool, pool_size=POOL_SIZE, connect_args=connect_args)
+    if url.startswith('sqlite'):
+        event.listen(engine, 'connect', enable_foreign_keys)
+    return engine
+
+engine = make_engine(DATABASE_URL)
+replica_engines = [make_engine(url) for url in REPLICA_URLS]
+shard_engines = {DEFAULT_SHARD: engine, **{name: make_engine(url) for name, url in SHARD_URLS.items()}}
+
+SessionLocal = sessionmaker(class_=RoutingSession, autocommit=False, autoflush=False, bind=engine,
+                            replicas=replica_engines, shards=shard_engines, facility_shards=FACILITY_SHARDS)
+
+def get_session(x_facility: int | None = Header(None), authorization: str | None = Header(None)):
+    # Филиал сотрудника берется из подписанного токена; X-Facility выбирает филиал только
+    # для учетных записей всей сети и анонимных запросов и не может расширить область токена
+    claims = bearer_claims(authorization)
+    facility = x_facility
+    if claims and claims.get('fac') is not None:
+        if x_facility is not None and x_facility != claims['fac']:
+            raise HTTPException(status_code=403, detail={'status': AuthStatus.FORBIDDEN.value})
+        facility = claims['fac']
     db = SessionLocal()
+    db.info['primary'] = use_primary.get()
+    db.info['facility'] = facility
+    db.info['actor'] = claims['sub'] if claims else None # Автор изменений для журнала аудита
     try:
         yield db
     finally:
         db.close()
-
-
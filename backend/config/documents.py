@@ -0,0 +1,5 @@
+from dotenv import load_dotenv
+import os
+load_dotenv()
+DOCUMENT_PROCESSES = int(os.getenv('DOCUMENT_PROCESSES', 2)) # Процессы для рендеринга PDF/HTML, вне event loop
+DOCUMENT_CACHE_SIZE = int(os.getenv('DOCUMENT_CACHE_SIZE', 128)) # Готовых документов в памяти воркера
@@ -0,0 +1,7 @@
+from dotenv import load_dotenv
+import os
+load_dotenv()
+EVENTS_HEARTBEAT = float(os.getenv('EVENTS_HEARTBEAT', 15)) # Секунд между комментариями-пингами в SSE
+EVENTS_BUFFER_SIZE = int(os.getenv('EVENTS_BUFFER_SIZE', 1000)) # Последние события для докачки по Last-Event-ID
+EVENTS_QUEUE_SIZE = int(os.getenv('EVENTS_QUEUE_SIZE', 100)) # Недоставленных событий на подписчика, дальше он отключается
+EVENTS_RETRY_MS = int(os.getenv('EVENTS_RETRY_MS', 3000)) # Пауза переподключения для EventSource
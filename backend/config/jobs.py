@@ -0,0 +1,10 @@
+from dotenv import load_dotenv
+import os
+load_dotenv()
+JOBS_ENABLED = os.getenv('JOBS_ENABLED', '1') == '1' # Запускать обработчик очереди в этом процессе
+JOBS_POLL_INTERVAL = float(os.getenv('JOBS_POLL_INTERVAL', 1)) # Секунд между опросами таблицы jobs
+JOBS_VISIBILITY_TIMEOUT = int(os.getenv('JOBS_VISIBILITY_TIMEOUT', 300)) # Через сколько секунд зависшую задачу может забрать другой процесс
+JOBS_MAX_ATTEMPTS = int(os.getenv('JOBS_MAX_ATTEMPTS', 5))
+JOBS_BACKOFF_BASE = float(os.getenv('JOBS_BACKOFF_BASE', 5)) # Секунд до первого повтора, дальше удваивается
+JOBS_BACKOFF_MAX = float(os.getenv('JOBS_BACKOFF_MAX', 3600))
+JOBS_SHUTDOWN_GRACE = float(os.getenv('JOBS_SHUTDOWN_GRACE', 10)) # Сколько ждать выполняющиеся задачи при остановке
@@ -0,0 +1,22 @@
+from dotenv import load_dotenv
+import os
+load_dotenv()
+SHED_ENABLED = os.getenv('SHED_ENABLED', '1') == '1'
+SHED_POOL_WAIT = float(os.getenv('SHED_POOL_WAIT', 0.5)) # Секунд ожидания соединения из пула
+SHED_MAX_IN_FLIGHT = int(os.getenv('SHED_MAX_IN_FLIGHT', 256)) # Одновременных запросов на воркер
+SHED_LOOP_LAG = float(os.getenv('SHED_LOOP_LAG', 0.25)) # Секунд отставания event loop
+SHED_PROBE_INTERVAL = float(os.getenv('SHED_PROBE_INTERVAL', 0.5))
+# Низкоприоритетные маршруты (выгрузки и списки), которые отклоняются при перегрузке
+SHED_LOW_PRIORITY = (
+    ('GET', '/api/orders'),
+    ('GET', '/api/childs'),
+    ('GET', '/api/childs/reports'),
+    ('GET', '/api/childs/*/report.*'),
+    ('GET', '/api/procedure_records'),
+    ('GET', '/api/users/parents'),
+    ('GET', '/api/users/staffs'),
+    ('GET', '/api/reports/*'),
+    ('GET', '/api/jobs'),
+)
+# Долгоживущие соединения не считаются запросами в работе
+SHED_UNTRACKED = ('/api/orders/events',)
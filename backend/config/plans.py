@@ -0,0 +1,7 @@
+from dotenv import load_dotenv
+from datetime import time
+import os
+load_dotenv()
+PLAN_DAY_START = time.fromisoformat(os.getenv('PLAN_DAY_START', '09:00')) # Начало окна процедур
+PLAN_DAY_END = time.fromisoformat(os.getenv('PLAN_DAY_END', '18:00')) # Конец окна: приемы за день делят его поровну
+PLAN_BATCH_SIZE = int(os.getenv('PLAN_BATCH_SIZE', 1000)) # Строк в одном INSERT
@@ -0,0 +1,19 @@
+from dotenv import load_dotenv
+import os
+load_dotenv()
+RATE_LIMIT_ENABLED = os.getenv('RATE_LIMIT_ENABLED', '1') == '1'
+RATE_LIMIT_SHARDS = int(os.getenv('RATE_LIMIT_SHARDS', 16)) # Шарды in-memory хранилища, у каждого свой lock
+RATE_LIMIT_MAX_KEYS = int(os.getenv('RATE_LIMIT_MAX_KEYS', 10000)) # Ключей в шарде, дальше вытесняются самые старые
+RATE_LIMIT_TRUST_FORWARDED = os.getenv('RATE_LIMIT_TRUST_FORWARDED', '0') == '1' # Брать IP из X-Forwarded-For (за nginx)
+# Правила: метод, путь, чем ключевать (user - id из JWT, без токена - IP; ip - всегда IP), лимит "запросов/секунд"
+RATE_LIMITS = (
+    ('POST', '/api/auth/login', 'ip', os.getenv('RATE_LIMIT_LOGIN', '5/60')),
+    ('POST', '/api/auth/signup/parent', 'ip', os.getenv('RATE_LIMIT_SIGNUP', '5/600')),
+    ('POST', '/api/auth/signup/staff', 'ip', os.getenv('RATE_LIMIT_SIGNUP', '5/600')),
+    ('GET', '/api/orders/', 'user', os.getenv('RATE_LIMIT_LISTS', '60/60')),
+    ('GET', '/api/childs/', 'user', os.getenv('RATE_LIMIT_LISTS', '60/60')),
+    ('GET', '/api/procedure_records/', 'user', os.getenv('RATE_LIMIT_LISTS', '60/60')),
+    ('GET', '/api/users/parents', 'user', os.getenv('RATE_LIMIT_LISTS', '60/60')),
+    ('GET', '/api/users/staffs', 'user', os.getenv('RATE_LIMIT_LISTS', '60/60')),
+    ('GET', '/api/childs/reports', 'user', os.getenv('RATE_LIMIT_EXPORTS', '5/60')),
+)
@@ -0,0 +1,4 @@
+from dotenv import load_dotenv
+import os
+load_dotenv()
+COURSE_INDEX_TTL = float(os.getenv('COURSE_INDEX_TTL', 300)) # Секунд до полной пересборки индекса курсов для рекомендаций
@@ -0,0 +1,5 @@
+from dotenv import load_dotenv
+import os
+load_dotenv()
+ROSTER_TTL = float(os.getenv('ROSTER_TTL', 60)) # Секунд жизни развернутого дня в индексе дежурств
+ROSTER_DAYS = int(os.getenv('ROSTER_DAYS', 14)) # Сколько развернутых дней держать в памяти
@@ -0,0 +1,10 @@
+from dotenv import load_dotenv
+import os
+load_dotenv()
+SINGLEFLIGHT_ENABLED = os.getenv('SINGLEFLIGHT_ENABLED', '1') == '1'
+# Маршруты, одинаковые GET которых выполняются один раз на всех ждущих: путь и область авторизации
+# (public - ответ не зависит от пользователя, token - общий только для запросов с тем же токеном)
+SINGLEFLIGHT_ROUTES = (
+    ('/api/courses', 'public'),
+    ('/api/rooms', 'public'),
+)
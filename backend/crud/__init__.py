@@ -4,4 +4,11 @@ from .courses import CourseRepository
 from .diagnosis import DiagnosisRepository
 from .orders import OrderRepository
 from .rooms import RoomRepository
-from .procedure_records import ProcedureRecordRepository
\ No newline at end of file
+from .procedure_records import ProcedureRecordRepository
+from .reports import ReportRepository
+from .jobs import JobRepository
+from .archive import ArchiveRepository
+from .audit import AuditRepository
+from .tokens import TokenRepository
+from .shifts import ShiftRepository
+from .contraindications import ContraindicationRepository
\ No newline at end of file
@@ -0,0 +1,4 @@
+from utils.abstract_repository import IREpository
+
+class TokenRepository(IREpository):
+    ...
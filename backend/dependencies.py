@@ -6,6 +6,78 @@ from config.database import get_session
 from config.auth import oauth2_scheme
 from utils.enums import Roles, AuthStatus
 from service import *
+from utils.documents import DocumentRenderer
+from config.documents import DOCUMENT_PROCESSES, DOCUMENT_CACHE_SIZE
+from utils.events import EventBroker
+from config.events import EVENTS_BUFFER_SIZE, EVENTS_QUEUE_SIZE
+from utils.load import LoadMonitor
+from config.load import SHED_POOL_WAIT, SHED_MAX_IN_FLIGHT, SHED_LOOP_LAG, SHED_PROBE_INTERVAL
+from config.database import shard_engines, replica_engines
+from utils.singleflight import SingleFlight
+from utils.audit import AuditBuffer, track_changes
+from config.audit import (AUDIT_ENABLED, AUDIT_BATCH_SIZE, AUDIT_FLUSH_INTERVAL, AUDIT_MAX_BUFFER,
+                          AUDIT_SPILL_PATH, AUDIT_TABLES)
+from utils.revocation import RevocationList
+from utils.roster import RosterIndex
+from config.roster import ROSTER_TTL, ROSTER_DAYS
+from utils.contraindications import ContraindicationMatrix
+from config.contraindications import CONTRAINDICATIONS_TTL
+from utils.recommendations import CourseIndex
+from config.recommendations import COURSE_INDEX_TTL
+from config.auth import REVOCATION_CAPACITY, REVOCATION_ERROR_RATE, REVOCATION_RECENT_SIZE, REVOCATION_SYNC_INTERVAL
+
+document_renderer = DocumentRenderer(DOCUMENT_PROCESSES, DOCUMENT_CACHE_SIZE)
+event_broker = EventBroker(EVENTS_BUFFER_SIZE, EVENTS_QUEUE_SIZE)
+load_monitor = LoadMonitor([*shard_engines.values(), *replica_engines], SHED_POOL_WAIT, SHED_MAX_IN_FLIGHT, SHED_LOOP_LAG,
+                           SHED_PROBE_INTERVAL)
+single_flight = SingleFlight()
+audit_buffer = AuditBuffer(AuditLog, AUDIT_BATCH_SIZE, AUDIT_FLUSH_INTERVAL, AUDIT_MAX_BUFFER, AUDIT_SPILL_PATH)
+if AUDIT_ENABLED:
+    track_changes(audit_buffer, AUDIT_TABLES)
+roster_index = RosterIndex(ROSTER_TTL, ROSTER_DAYS)
+contraindication_matrix = ContraindicationMatrix(CONTRAINDICATIONS_TTL)
+course_index = CourseIndex(COURSE_INDEX_TTL)
+revocation_list = RevocationList(RevokedToken, REVOCATION_CAPACITY, REVOCATION_ERROR_RATE, REVOCATION_RECENT_SIZE,
+                                 REVOCATION_SYNC_INTERVAL)
+
+# Jobs
+def get_job_repository(db: Session = Depends(get_session)):
+    return JobRepository(model=Job, session=db)
+
+def get_job_service(job_repository: JobRepository = Depends(get_job_repository)):
+    return JobService(job_repository=job_repository)
+
+
+# Audit
+def get_audit_repository(db: Session = Depends(get_session)):
+    return AuditRepository(model=AuditLog, session=db)
+
+def get_audit_service(audit_repository: AuditRepository = Depends(get_audit_repository)):
+    return AuditService(audit_repository=audit_repository)
+
+
+# Order and Reports
+def get_order_repository(db: Session = Depends(get_session)):
+    return OrderRepository(model=Order, session=db)
+
+def get_room_occupancy_repository(db: Session = Depends(get_session)):
+    return ReportRepository(model=RoomOccupancy, session=db)
+
+def get_course_revenue_repository(db: Session = Depends(get_session)):
+    return ReportRepository(model=CourseRevenue, session=db)
+
+def get_order_archive_repository(db: Session = Depends(get_session)):
+    return ArchiveRepository(model=OrderArchive, session=db)
+
+def get_report_service(order_repository: OrderRepository = Depends(get_order_repository),
+                       order_archive_repository: ArchiveRepository = Depends(get_order_archive_repository),
+                       occupancy_repository: ReportRepository = Depends(get_room_occupancy_repository),
+                       revenue_repository: ReportRepository = Depends(get_course_revenue_repository)):
+    return ReportService(order_repository=order_repository,
+                         order_archive_repository=order_archive_repository,
+                         occupancy_repository=occupancy_repository,
+                         revenue_repository=revenue_repository)
+
 
 # User and Auth
 def get_user_repository(db: Session = Depends(get_session)):
@@ -17,28 +89,45 @@ def get_staff_repository(db: Session = Depends(get_session)):
 def get_parent_repository(db: Session = Depends(get_session)):
     return UserRepository(model=Parent, session=db)
 
-def get_auth_service(user_repository: UserRepository = Depends(get_user_repository)) -> AuthService:
-    return AuthService(user_repository=user_repository)
+def get_token_repository(db: Session = Depends(get_session)):
+    return TokenRepository(model=RevokedToken, session=db)
+
+def get_auth_service(user_repository: UserRepository = Depends(get_user_repository),
+                     token_repository: TokenRepository = Depends(get_token_repository)) -> AuthService:
+    return AuthService(user_repository=user_repository,
+                       token_repository=token_repository,
+                       revocation_list=revocation_list)
 
 def get_current_user(token: str=Depends(oauth2_scheme), 
-                     user_repository: UserRepository = Depends(get_user_repository)) -> User:
-    service = AuthService(user_repository=user_repository)
+                     service: AuthService = Depends(get_auth_service)) -> User:
     return service.get_user_by_token(token)
 
 def get_current_admin(token: str=Depends(oauth2_scheme), 
-                      user_repository: UserRepository = Depends(get_user_repository)) -> User:
-    service = AuthService(user_repository=user_repository)
+                      service: AuthService = Depends(get_auth_service)) -> User:
     user = service.get_user_by_token(token)
     if user.role != Roles.ADMIN.value:
         raise HTTPException(status_code=403, detail={'status': AuthStatus.FORBIDDEN.value})
     return user
 
+def get_shift_repository(db: Session = Depends(get_session)):
+    return ShiftRepository(model=StaffShift, session=db)
+
+def get_roster_service(shift_repository: ShiftRepository = Depends(get_shift_repository),
+                       staff_repository: UserRepository = Depends(get_staff_repository)) -> RosterService:
+    return RosterService(shift_repository=shift_repository,
+                         staff_repository=staff_repository,
+                         roster_index=roster_index)
+
 def get_user_service(user_repository: UserRepository = Depends(get_user_repository),
                      staff_repository: UserRepository = Depends(get_staff_repository),
-                     parent_repository: UserRepository = Depends(get_parent_repository)) -> UserService:
+                     parent_repository: UserRepository = Depends(get_parent_repository),
+                     report_service: ReportService = Depends(get_report_service),
+                     roster_service: RosterService = Depends(get_roster_service)) -> UserService:
     return UserService(user_repository=user_repository,
                        staff_repository=staff_repository,
-                       parent_repository=parent_repository)
+                       parent_repository=parent_repository,
+                       report_service=report_service,
+                       roster_service=roster_service)
 
 
 # Child
@@ -49,17 +138,40 @@ def get_child_diagnosis_repository(db: Session = Depends(get_session)):
     return ChildRepository(model=ChildDiagnosis, session=db)
 
 def get_child_service(child_repository: ChildRepository = Depends(get_child_repository),
-                      child_diagnosis_repository: ChildRepository = Depends(get_child_diagnosis_repository)):
+                      child_diagnosis_repository: ChildRepository = Depends(get_child_diagnosis_repository),
+                      report_service: ReportService = Depends(get_report_service)):
     return ChildService(child_repository=child_repository,
-                        child_diagnosis_repository=child_diagnosis_repository)
+                        child_diagnosis_repository=child_diagnosis_repository,
+                        report_service=report_service)
 
 
 # ProcedureRecord
 def get_procedure_record_repository(db: Session = Depends(get_session)):
     return ProcedureRecordRepository(model=ProcedureRecord, session=db)
 
-def get_procedure_record_service(procedure_record_repository: ProcedureRecordRepository = Depends(get_procedure_record_repository)):
-    return ProcedureRecordService(procedure_record_repository=procedure_record_repository)
+def get_procedure_record_archive_repository(db: Session = Depends(get_session)):
+    return ArchiveRepository(model=ProcedureRecordArchive, session=db)
+
+def get_procedure_record_service(procedure_record_repository: ProcedureRecordRepository = Depends(get_procedure_record_repository),
+                                 archive_repository: ArchiveRepository = Depends(get_procedure_record_archive_repository)):
+    return ProcedureRecordService(procedure_record_repository=procedure_record_repository,
+                                  archive_repository=archive_repository)
+
+
+# Child reports
+def get_child_report_service(child_repository: ChildRepository = Depends(get_child_repository),
+                             child_diagnosis_repository: ChildRepository = Depends(get_child_diagnosis_repository),
+                             procedure_record_repository: ProcedureRecordRepository = Depends(get_procedure_record_repository),
+                             order_repository: OrderRepository = Depends(get_order_repository),
+                             procedure_record_archive_repository: ArchiveRepository = Depends(get_procedure_record_archive_repository),
+                             order_archive_repository: ArchiveRepository = Depends(get_order_archive_repository)):
+    return ChildReportService(child_repository=child_repository,
+                              child_diagnosis_repository=child_diagnosis_repository,
+                              procedure_record_repository=procedure_record_repository,
+                              order_repository=order_repository,
+                              procedure_record_archive_repository=procedure_record_archive_repository,
+                              order_archive_repository=order_archive_repository,
+                              renderer=document_renderer)
 
 
 # Course
@@ -77,7 +189,9 @@ def get_course_service(course_repository: CourseRepository = Depends(get_course_
                        procedure_repository: CourseRepository = Depends(get_procedure_repository)):
     return CourseService(course_repository=course_repository,
                          course_procedure_repository=course_procedure_repository,
-                         procedure_repository=procedure_repository)
+                         procedure_repository=procedure_repository,
+                         contraindication_matrix=contraindication_matrix,
+                         course_index=course_index)
 
 
 # Diagnosis
@@ -85,15 +199,66 @@ def get_diagnosis_repository(db: Session = Depends(get_session)):
     return DiagnosisRepository(model=Diagnosis, session=db)
 
 def get_diagnosis_service(diagnosis_repository: DiagnosisRepository = Depends(get_diagnosis_repository)):
-    return DiagnosisService(diagnosis_repository=diagnosis_repository)
+    return DiagnosisService(diagnosis_repository=diagnosis_repository,
+                            contraindication_matrix=contraindication_matrix,
+                            course_index=course_index)
+
+
+# Contraindications
+def get_contraindication_repository(db: Session = Depends(get_session)):
+    return ContraindicationRepository(model=Contraindication, session=db)
+
+def get_contraindication_service(contraindication_repository: ContraindicationRepository = Depends(get_contraindication_repository),
+                                 diagnosis_repository: DiagnosisRepository = Depends(get_diagnosis_repository),
+                                 course_procedure_repository: CourseRepository = Depends(get_course_procedure_repository),
+                                 child_diagnosis_repository: ChildRepository = Depends(get_child_diagnosis_repository)):
+    return ContraindicationService(contraindication_repository=contraindication_repository,
+                                   diagnosis_repository=diagnosis_repository,
+                                   course_procedure_repository=course_procedure_repository,
+                                   child_diagnosis_repository=child_diagnosis_repository,
+                                   contraindication_matrix=contraindication_matrix)
+
+
+# Recommendations
+def get_recommendation_service(course_repository: CourseRepository = Depends(get_course_repository),
+                               course_procedure_repository: CourseRepository = Depends(get_course_procedure_repository),
+                               diagnosis_repository: DiagnosisRepository = Depends(get_diagnosis_repository),
+                               child_diagnosis_repository: ChildRepository = Depends(get_child_diagnosis_repository),
+                               contraindication_service: ContraindicationService = Depends(get_contraindication_service)):
+    return RecommendationService(course_repository=course_repository,
+                                 course_procedure_repository=course_procedure_repository,
+                                 diagnosis_repository=diagnosis_repository,
+                                 child_diagnosis_repository=child_diagnosis_repository,
+                                 contraindication_service=contraindication_service,
+                                 course_index=course_index)
 
 
 # Order
-def get_order_repository(db: Session = Depends(get_session)):
-    return OrderRepository(model=Order, session=db)
+def get_order_service(order_repository: OrderRepository = Depends(get_order_repository),
+                      archive_repository: ArchiveRepository = Depends(get_order_archive_repository),
+                      report_service: ReportService = Depends(get_report_service),
+                      job_service: JobService = Depends(get_job_service)):
+    return OrderService(order_repository=order_repository,
+                        archive_repository=archive_repository,
+                        report_service=report_service,
+                        job_service=job_service,
+                        event_broker=event_broker)
+
+
+# Plans
+def get_plan_service(order_repository: OrderRepository = Depends(get_order_repository),
+                     course_procedure_repository: CourseRepository = Depends(get_course_procedure_repository),
+                     procedure_record_repository: ProcedureRecordRepository = Depends(get_procedure_record_repository),
+                     contraindication_service: ContraindicationService = Depends(get_contraindication_service)):
+    return PlanService(order_repository=order_repository,
+                       course_procedure_repository=course_procedure_repository,
+                       procedure_record_repository=procedure_record_repository,
+                       contraindication_service=contraindication_service)
 
-def get_order_service(order_repository: OrderRepository = Depends(get_order_repository)):
-    return OrderService(order_repository=order_repository)
+def get_assignment_service(procedure_record_repository: ProcedureRecordRepository = Depends(get_procedure_record_repository),
+                           roster_service: RosterService = Depends(get_roster_service)):
+    return AssignmentService(procedure_record_repository=procedure_record_repository,
+                             roster_service=roster_service)
 
 
 # Room
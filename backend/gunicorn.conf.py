@@ -0,0 +1,34 @@
+import gc
+import os
+
+# gunicorn -c gunicorn.conf.py main:app
+# Приложение загружается и прогревается в мастере, после чего объекты замораживаются (gc.freeze),
+# чтобы форкнутые воркеры делили страницы памяти с мастером, а не копировали их при сборке мусора
+bind = os.getenv('BIND', '0.0.0.0:8000')
+workers = int(os.getenv('WEB_CONCURRENCY', 4))
+worker_class = 'uvicorn.workers.UvicornWorker'
+preload_app = True
+timeout = 60
+
+# Сборщик выключен только на загрузку приложения (preload_app импортирует его сразу после этого
+# файла) и прогрев в мастере; when_ready включает его обратно, и воркеры наследуют включенный
+gc.disable()
+
+
+def when_ready(server):
+    from main import app
+    from utils.warmup import preload, rss_mb
+    try:
+        timings = preload(app)
+    finally:
+        gc.collect()
+        gc.freeze()
+        gc.enable()
+    server.log.info('Preloaded in master: %s, rss %.1f MB', timings, rss_mb())
+
+
+def post_fork(server, worker):
+    # Соединения пула не должны переходить из мастера в воркер
+    from config.database import shard_engines, replica_engines
+    for pool_engine in (*shard_engines.values(), *replica_engines):
+        pool_engine.dispose(close=False)
@@ -1,11 +1,71 @@
-from fastapi import FastAPI
-from fastapi.responses import FileResponse
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
+from fastapi.responses import FileResponse, JSONResponse
 from routers import routers
 from starlette.middleware.cors import CORSMiddleware
-app = FastAPI(title="Sanatory API")
+from middlewares import (CompressionMiddleware, PrimaryStickinessMiddleware, RateLimitMiddleware,
+                         LoadSheddingMiddleware, SingleFlightMiddleware)
+from config.database import engine, replica_engines, SessionLocal, WARMUP_CONNECTIONS
+from utils.warmup import warm_up
+from utils.jobs import JobRunner
+from config.jobs import JOBS_ENABLED
+from config.archive import ARCHIVE_ENABLED
+from config.ratelimit import RATE_LIMIT_ENABLED
+from config.load import SHED_ENABLED
+from config.singleflight import SINGLEFLIGHT_ENABLED
+from service import tasks
+from dependencies import document_renderer, event_broker, load_monitor, single_flight, audit_buffer, revocation_list
+from sqlalchemy.exc import IntegrityError
+from utils.abstract_repository import VersionConflict
+from utils.enums import Status
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    warm_up(app, engine, SessionLocal, WARMUP_CONNECTIONS)
+    runner = JobRunner(SessionLocal)
+    if JOBS_ENABLED and ARCHIVE_ENABLED:
+        tasks.bootstrap_archive(runner.session)
+    if JOBS_ENABLED:
+        await runner.start()
+    app.state.jobs = runner
+    load_monitor.start()
+    audit_buffer.start(SessionLocal)
+    revocation_list.start(SessionLocal)
+    yield
+    await load_monitor.stop()
+    await revocation_list.stop()
+    event_broker.close()
+    await runner.stop()
+    document_renderer.shutdown()
+    # Последним: фоновые задачи тоже пишут в журнал
+    await audit_buffer.stop()
+
+app = FastAPI(title="Sanatory API", lifespan=lifespan)
 
 app.include_router(routers)
 
+@app.exception_handler(VersionConflict)
+async def version_conflict_handler(request: Request, exc: VersionConflict):
+    return JSONResponse(status_code=409, content={'detail': {'status': Status.CONFLICT.value}})
+
+@app.exception_handler(IntegrityError)
+async def integrity_error_handler(request: Request, exc: IntegrityError):
+    return JSONResponse(status_code=409, content={'detail': {'status': Status.CONFLICT.value}})
+
+if SINGLEFLIGHT_ENABLED:
+    app.add_middleware(SingleFlightMiddleware, single_flight=single_flight)
+
+app.add_middleware(CompressionMiddleware)
+
+if replica_engines:
+    app.add_middleware(PrimaryStickinessMiddleware)
+
+if RATE_LIMIT_ENABLED:
+    app.add_middleware(RateLimitMiddleware)
+
+if SHED_ENABLED:
+    app.add_middleware(LoadSheddingMiddleware, monitor=load_monitor)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["http://localhost:3000", "http://localhost:3001"],
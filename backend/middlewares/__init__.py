@@ -0,0 +1,5 @@
+from .compression import CompressionMiddleware
+from .routing import PrimaryStickinessMiddleware
+from .ratelimit import RateLimitMiddleware
+from .shedding import LoadSheddingMiddleware
+from .singleflight import SingleFlightMiddleware
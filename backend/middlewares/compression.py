@@ -0,0 +1,172 @@
+import hashlib
+import zlib
+from collections import OrderedDict
+import anyio
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from config.compression import (COMPRESSION_MIN_SIZE, COMPRESSION_LEVEL, BROTLI_QUALITY,
+                                COMPRESSION_CACHE_PATHS, COMPRESSION_CACHE_SIZE)
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_TYPES = ('text/', 'application/json', 'application/javascript', 'application/xml')
+# Тела больше этого размера сжимаются в пуле потоков, чтобы не блокировать event loop
+THREAD_THRESHOLD = 256 * 1024
+
+
+def negotiate(accept_encoding: str) -> str | None:
+    weights = {}
+    for item in accept_encoding.split(','):
+        name, _, params = item.strip().partition(';')
+        quality = 1.0
+        if params.strip().startswith('q='):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                quality = 0.0
+        weights[name.strip().lower()] = quality
+    if brotli is not None and weights.get('br', 0) > 0:
+        return 'br'
+    if weights.get('gzip', 0) > 0:
+        return 'gzip'
+    return None
+
+
+class StreamCompressor:
+    def __init__(self, encoding: str, level: int, quality: int):
+        if encoding == 'br':
+            self.compressor = brotli.Compressor(quality=quality)
+        else:
+            self.compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+        self.encoding = encoding
+
+    def compress(self, data: bytes) -> bytes:
+        if self.encoding == 'br':
+            return self.compressor.process(data) + self.compressor.flush()
+        return self.compressor.compress(data) + self.compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        if self.encoding == 'br':
+            return self.compressor.finish()
+        return self.compressor.flush()
+
+
+def compress(data: bytes, encoding: str, level: int, quality: int) -> bytes:
+    if encoding == 'br':
+        return brotli.compress(data, quality=quality)
+    return zlib.compress(data, level, wbits=31)
+
+
+class CompressionMiddleware:
+    def __init__(self, app: ASGIApp,
+                 minimum_size: int = COMPRESSION_MIN_SIZE,
+                 level: int = COMPRESSION_LEVEL,
+                 quality: int = BROTLI_QUALITY,
+                 cache_paths: tuple[str, ...] = COMPRESSION_CACHE_PATHS,
+                 cache_size: int = COMPRESSION_CACHE_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.level = level
+        self.quality = quality
+        self.cache_paths = cache_paths
+        self.cache_size = cache_size
+        self.cache: OrderedDict[tuple[str, bytes], bytes] = OrderedDict()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope['type'] != 'http':
+            return await self.app(scope, receive, send)
+        encoding = negotiate(Headers(scope=scope).get('accept-encoding', ''))
+        if encoding is None:
+            return await self.app(scope, receive, send)
+        cacheable = scope['method'] == 'GET' and scope['path'].startswith(self.cache_paths)
+        responder = CompressionResponder(self, encoding, cacheable)
+        await responder(scope, receive, send)
+
+    async def compress_body(self, body: bytes, encoding: str, cacheable: bool) -> bytes:
+        key = None
+        if cacheable:
+            key = (encoding, hashlib.blake2b(body, digest_size=16).digest())
+            cached = self.cache.get(key)
+            if cached is not None:
+                self.cache.move_to_end(key)
+                return cached
+
+        if len(body) > THREAD_THRESHOLD:
+            compressed = await anyio.to_thread.run_sync(compress, body, encoding, self.level, self.quality)
+        else:
+            compressed = compress(body, encoding, self.level, self.quality)
+
+        if key is not None:
+            self.cache[key] = compressed
+            if len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+        return compressed
+
+
+class CompressionResponder:
+    def __init__(self, middleware: CompressionMiddleware, encoding: str, cacheable: bool):
+        self.middleware = middleware
+        self.encoding = encoding
+        self.cacheable = cacheable
+        self.start_message: Message | None = None
+        self.compressor: StreamCompressor | None = None
+        self.passthrough = False
+        self.send: Send | None = None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        self.send = send
+        await self.middleware.app(scope, receive, self.send_with_compression)
+
+    async def send_with_compression(self, message: Message):
+        if message['type'] == 'http.response.start':
+            self.start_message = message
+            headers = Headers(raw=message['headers'])
+            content_type = headers.get('content-type', '')
+            self.passthrough = ('content-encoding' in headers
+                                or not content_type.startswith(COMPRESSIBLE_TYPES)
+                                or content_type.startswith('text/event-stream'))
+            return
+        if message['type'] != 'http.response.body':
+            return await self.send(message)
+
+        if self.passthrough:
+            if self.start_message is not None:
+                await self.send(self.start_message)
+                self.start_message = None
+            return await self.send(message)
+
+        body = message.get('body', b'')
+        more_body = message.get('more_body', False)
+
+        if self.start_message is not None:
+            headers = MutableHeaders(raw=self.start_message['headers'])
+            if not more_body:
+                # Ответ целиком в одном сообщении: сжимаем сразу, маленькие отдаем как есть
+                if len(body) < self.middleware.minimum_size:
+                    await self.send(self.start_message)
+                    return await self.send(message)
+                cacheable = self.cacheable and self.start_message['status'] == 200
+                body = await self.middleware.compress_body(body, self.encoding, cacheable)
+                headers['Content-Encoding'] = self.encoding
+                headers['Content-Length'] = str(len(body))
+                headers.add_vary_header('Accept-Encoding')
+                await self.send(self.start_message)
+                self.start_message = None
+                return await self.send({'type': 'http.response.body', 'body': body})
+
+            # Потоковый ответ: сжимаем по частям с flush, длина заранее неизвестна
+            self.compressor = StreamCompressor(self.encoding, self.middleware.level, self.middleware.quality)
+            headers['Content-Encoding'] = self.encoding
+            headers.add_vary_header('Accept-Encoding')
+            if 'content-length' in headers:
+                del headers['Content-Length']
+            await self.send(self.start_message)
+            self.start_message = None
+
+        chunk = self.compressor.compress(body) if body else b''
+        if not more_body:
+            chunk += self.compressor.finish()
+        await self.send({'type': 'http.response.body', 'body': chunk, 'more_body': more_body})
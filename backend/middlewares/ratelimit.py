@@ -0,0 +1,54 @@
+import json
+import math
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Receive, Scope, Send
+from config.ratelimit import (RATE_LIMITS, RATE_LIMIT_SHARDS, RATE_LIMIT_MAX_KEYS,
+                              RATE_LIMIT_TRUST_FORWARDED)
+from utils.ratelimit import RateLimit, RateLimitStore, MemoryStore, load_limits
+from utils.enums import Status
+from utils.tokens import bearer_subject
+
+
+class RateLimitMiddleware:
+    # Стоит снаружи роутов: отказ происходит до зависимостей, сессии БД и проверки пароля
+    def __init__(self, app: ASGIApp, rules=RATE_LIMITS, store: RateLimitStore | None = None,
+                 trust_forwarded: bool = RATE_LIMIT_TRUST_FORWARDED):
+        self.app = app
+        self.limits = load_limits(rules)
+        self.store = store or MemoryStore(RATE_LIMIT_SHARDS, RATE_LIMIT_MAX_KEYS)
+        self.trust_forwarded = trust_forwarded
+
+    def client_ip(self, scope: Scope, headers: Headers) -> str:
+        if self.trust_forwarded:
+            # Последний адрес дописан нашим прокси, первые клиент может подделать
+            forwarded = headers.get('x-forwarded-for')
+            if forwarded:
+                return forwarded.split(',')[-1].strip()
+        client = scope.get('client')
+        return client[0] if client else 'unknown'
+
+    def identity(self, limit: RateLimit, scope: Scope) -> str:
+        headers = Headers(scope=scope)
+        if limit.key == 'user':
+            subject = bearer_subject(headers.get('authorization'))
+            if subject is not None:
+                return f'user:{subject}'
+        return f'ip:{self.client_ip(scope, headers)}'
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope['type'] != 'http':
+            return await self.app(scope, receive, send)
+        limit = self.limits.get((scope['method'], scope['path'].rstrip('/') or '/'))
+        if limit is None:
+            return await self.app(scope, receive, send)
+        key = f'{limit.method} {limit.path} {self.identity(limit, scope)}'
+        retry_after = await self.store.take(key, limit.capacity, limit.rate)
+        if not retry_after:
+            return await self.app(scope, receive, send)
+
+        body = json.dumps({'detail': {'status': Status.TOO_MANY_REQUESTS.value}}).encode()
+        await send({'type': 'http.response.start', 'status': 429,
+                    'headers': [(b'content-type', b'application/json'),
+                                (b'content-length', str(len(body)).encode()),
+                                (b'retry-after', str(math.ceil(retry_after)).encode())]})
+        await send({'type': 'http.response.body', 'body': body})
@@ -0,0 +1,45 @@
+import time
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from config.database import PRIMARY_STICKY_SECONDS
+from utils.routing import use_primary
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+STICKY_COOKIE = 'primary_until'
+
+
+class PrimaryStickinessMiddleware:
+    # Запросы на запись идут на primary и ставят cookie, пока она жива - клиент читает
+    # тоже с primary и не видит отставшую от своих же изменений реплику
+    def __init__(self, app: ASGIApp, window: int = PRIMARY_STICKY_SECONDS, cookie: str = STICKY_COOKIE):
+        self.app = app
+        self.window = window
+        self.cookie = cookie
+
+    def pinned(self, scope: Scope) -> bool:
+        for item in Headers(scope=scope).get('cookie', '').split(';'):
+            name, _, value = item.strip().partition('=')
+            if name == self.cookie:
+                try:
+                    return float(value) > time.time()
+                except ValueError:
+                    return False
+        return False
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope['type'] != 'http':
+            return await self.app(scope, receive, send)
+        write = scope['method'] not in SAFE_METHODS
+
+        async def send_with_cookie(message: Message):
+            if write and message['type'] == 'http.response.start' and message['status'] < 400:
+                until = int(time.time()) + self.window
+                MutableHeaders(scope=message).append(
+                    'set-cookie', f'{self.cookie}={until}; Max-Age={self.window}; Path=/; HttpOnly; SameSite=Lax')
+            await send(message)
+
+        token = use_primary.set(write or self.pinned(scope))
+        try:
+            await self.app(scope, receive, send_with_cookie)
+        finally:
+            use_primary.reset(token)
@@ -0,0 +1,43 @@
+import json
+from fnmatch import fnmatchcase
+from starlette.types import ASGIApp, Receive, Scope, Send
+from config.load import SHED_LOW_PRIORITY, SHED_UNTRACKED
+from utils.load import LoadMonitor
+from utils.enums import Status
+
+
+class LoadSheddingMiddleware:
+    # При перегрузке быстро отказывает выгрузкам и спискам, чтобы авторизация и
+    # запись заказов не стояли в очереди за пулом соединений
+    def __init__(self, app: ASGIApp, monitor: LoadMonitor,
+                 low_priority=SHED_LOW_PRIORITY, untracked=SHED_UNTRACKED):
+        self.app = app
+        self.monitor = monitor
+        self.low_priority = low_priority
+        self.untracked = untracked
+
+    def is_low_priority(self, method: str, path: str) -> bool:
+        path = path.rstrip('/') or '/'
+        return any(method == rule_method and fnmatchcase(path, pattern)
+                   for rule_method, pattern in self.low_priority)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope['type'] != 'http' or scope['path'] in self.untracked:
+            return await self.app(scope, receive, send)
+        if self.is_low_priority(scope['method'], scope['path']):
+            reason = self.monitor.overloaded()
+            if reason is not None:
+                self.monitor.shed[reason] += 1
+                body = json.dumps({'detail': {'status': Status.OVERLOADED.value}}).encode()
+                await send({'type': 'http.response.start', 'status': 503,
+                            'headers': [(b'content-type', b'application/json'),
+                                        (b'content-length', str(len(body)).encode()),
+                                        (b'retry-after', b'1')]})
+                await send({'type': 'http.response.body', 'body': body})
+                return
+        self.monitor.admitted += 1
+        self.monitor.in_flight += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.monitor.in_flight -= 1
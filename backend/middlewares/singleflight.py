@@ -0,0 +1,75 @@
+import asyncio
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from config.singleflight import SINGLEFLIGHT_ROUTES
+from utils.routing import use_primary
+from utils.singleflight import SingleFlight
+from utils.tokens import bearer_claims
+
+
+def copy_message(message: Message) -> Message:
+    # Внешние middleware (сжатие) меняют заголовки на месте, каждому получателю нужна своя копия
+    if 'headers' in message:
+        return {**message, 'headers': list(message['headers'])}
+    return dict(message)
+
+
+class SingleFlightMiddleware:
+    # Стоит внутри сжатия: разделяется исходный ответ, а кодировка подбирается каждому клиенту.
+    # Роуты, на которых он включен, должны быть def: пока ведущий запрос в пуле потоков,
+    # event loop свободен и принимает одинаковые запросы, которые просто ждут его результат
+    def __init__(self, app: ASGIApp, single_flight: SingleFlight, routes=SINGLEFLIGHT_ROUTES):
+        self.app = app
+        self.single_flight = single_flight
+        self.routes = dict(routes)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope['type'] != 'http' or scope['method'] != 'GET':
+            return await self.app(scope, receive, send)
+        path = scope['path'].rstrip('/') or '/'
+        auth_scope = self.routes.get(path)
+        # Клиент, читающий свою запись с primary, не должен получить ответ, начатый до нее
+        if auth_scope is None or use_primary.get():
+            return await self.app(scope, receive, send)
+
+        headers = Headers(scope=scope)
+        authorization = headers.get('authorization') if auth_scope == 'token' else None
+        # Филиал выбирает шард и фильтр, поэтому входит в ключ при любой области. Как и в get_session,
+        # он берется из токена, а X-Facility - только для токенов без филиала
+        facility = headers.get('x-facility')
+        claims = bearer_claims(headers.get('authorization'))
+        if claims and claims.get('fac') is not None:
+            if facility is not None and facility != str(claims['fac']):
+                # Такой запрос получит 403 и не должен забрать чужой ответ
+                return await self.app(scope, receive, send)
+            facility = str(claims['fac'])
+        key = self.single_flight.key(scope['path'], scope.get('query_string', b''), authorization, facility)
+        flights = self.single_flight.flights
+        flight = flights.get(key)
+        if flight is not None:
+            messages = await asyncio.shield(flight)
+            if messages is not None:
+                self.single_flight.coalesced[path] += 1
+                for message in messages:
+                    await send(copy_message(message))
+                return
+            # Ведущий упал - выполняем запрос сами
+            return await self.app(scope, receive, send)
+
+        flight = flights[key] = asyncio.get_running_loop().create_future()
+        self.single_flight.leaders[path] += 1
+        messages = []
+
+        async def send_and_record(message: Message):
+            messages.append(copy_message(message))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_and_record)
+        except BaseException:
+            flight.set_result(None)
+            raise
+        else:
+            flight.set_result(messages)
+        finally:
+            del flights[key]
@@ -16,7 +16,7 @@ HOST_DB = os.getenv("HOST_DB")
 NAME_DB = os.getenv("NAME_DB")
 
 # Формируем URL для подключения
-DATABASE_URL = f"mysql+pymysql://{USERNAME_DB}:{PASSWORD_DB}@{HOST_DB}/{NAME_DB}"
+DATABASE_URL = os.getenv("DATABASE_URL", f"mysql+pymysql://{USERNAME_DB}:{PASSWORD_DB}@{HOST_DB}/{NAME_DB}")
 
 # Настраиваем движок SQLAlchemy
 engine = create_engine(DATABASE_URL)
@@ -5,3 +5,10 @@ from .diagnosis import *
 from .orders import *
 from .rooms import *
 from .users import *
+from .reports import *
+from .jobs import *
+from .facilities import *
+from .archive import *
+from .audit import *
+
+from .tokens import *
\ No newline at end of file
@@ -0,0 +1,34 @@
+from config.database import Base
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import Integer, String, Date, DateTime, ForeignKey, DECIMAL
+from datetime import date, datetime
+from typing import Optional
+
+# Холодные копии orders и procedure_records: те же колонки и id, строки сюда только переносятся
+
+class OrderArchive(Base):
+    __tablename__ = 'orders_archive'
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)
+    id_child: Mapped[int] = mapped_column(ForeignKey('childs.id', ondelete='CASCADE'))
+    id_parent: Mapped[int] = mapped_column(ForeignKey('parents.id', ondelete='CASCADE'))
+    id_treatment_course: Mapped[int] = mapped_column(ForeignKey('treatment_courses.id'))
+    id_room: Mapped[int] = mapped_column(ForeignKey('rooms.id'))
+    id_facility: Mapped[int] = mapped_column(ForeignKey('facilities.id'), index=True, default=1, server_default='1')
+    status: Mapped[str] = mapped_column(String(255))
+    check_in_date: Mapped[date] = mapped_column(Date)
+    check_out_date: Mapped[date] = mapped_column(Date, index=True)
+    price: Mapped[float] = mapped_column(DECIMAL(7, 2))
+    version: Mapped[int] = mapped_column(Integer, default=1, server_default='1')
+
+class ProcedureRecordArchive(Base):
+    __tablename__ = 'procedure_records_archive'
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)
+    id_child: Mapped[int] = mapped_column(ForeignKey('childs.id', ondelete='CASCADE'))
+    id_facility: Mapped[int] = mapped_column(ForeignKey('facilities.id'), index=True, default=1, server_default='1')
+    id_procedure: Mapped[int] = mapped_column(ForeignKey('procedures.id'))
+    id_staff: Mapped[Optional[int]] = mapped_column(ForeignKey('staff.id', ondelete='SET NULL'), nullable=True)
+    procedure_time: Mapped[datetime] = mapped_column(DateTime, index=True)
+    id_order: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    version: Mapped[int] = mapped_column(Integer, default=1, server_default='1')
@@ -0,0 +1,21 @@
+from config.database import Base
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import BigInteger, Integer, String, DateTime, JSON, Index
+from datetime import datetime
+from typing import Optional
+
+class AuditLog(Base):
+    __tablename__ = 'audit_log'
+
+    id: Mapped[int] = mapped_column(BigInteger().with_variant(Integer, 'sqlite'), primary_key=True, autoincrement=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime) # Время коммита изменения
+    id_user: Mapped[Optional[int]] = mapped_column(Integer, nullable=True) # Без FK: журнал переживает удаление пользователя
+    id_facility: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    entity: Mapped[str] = mapped_column(String(50)) # Имя таблицы
+    entity_id: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    action: Mapped[str] = mapped_column(String(10)) # CREATE, UPDATE, DELETE
+    changes: Mapped[dict] = mapped_column(JSON) # {поле: [было, стало]}
+
+    __table_args__ = (Index('ix_audit_log_entity', 'entity', 'entity_id', 'created_at'),
+                      Index('ix_audit_log_user', 'id_user', 'created_at'),
+                      Index('ix_audit_log_created_at', 'created_at'))
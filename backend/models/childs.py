@@ -1,36 +1,45 @@
 from config.database import Base
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy import Integer, String, DateTime, ForeignKey, DECIMAL, Text, Date
+from sqlalchemy import Integer, String, DateTime, ForeignKey, DECIMAL, Text, Date, UniqueConstraint
 from datetime import datetime, date
+from typing import Optional
 
 class Child(Base):
     __tablename__ = 'childs'
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
-    name: Mapped[str] = mapped_column(String(255))
+    name: Mapped[str] = mapped_column(String(255), index=True)
     birth_date: Mapped[date] = mapped_column(Date)
     gender: Mapped[str] = mapped_column(String(1)) # M/F
-    id_parent: Mapped[int] = mapped_column(ForeignKey('parents.id'))
+    id_parent: Mapped[int] = mapped_column(ForeignKey('parents.id', ondelete='CASCADE'))
+    id_facility: Mapped[int] = mapped_column(ForeignKey('facilities.id'), index=True, default=1, server_default='1')
     height: Mapped[float] = mapped_column(DECIMAL(4, 1))
     weight: Mapped[float] = mapped_column(DECIMAL(4, 1))
     blood: Mapped[str] = mapped_column(String(5)) # A+, B-, AB+ OR 1+, 2-
     disability: Mapped[str] = mapped_column(String(255)) # Инвалидность
     vaccinations: Mapped[str] = mapped_column(Text) # Прививки
     medical_note: Mapped[str] = mapped_column(Text) # Любые другие мед записи об особенностях организма 
+    version: Mapped[int] = mapped_column(Integer, default=1, server_default='1')
 
     parent: Mapped["Parent"] = relationship("Parent", back_populates="children")
-    diagnoses: Mapped[list["ChildDiagnosis"]] = relationship("ChildDiagnosis", back_populates="child")
-    procedures: Mapped[list["ProcedureRecord"]] = relationship("ProcedureRecord", back_populates="child")
-    orders: Mapped[list["Order"]] = relationship("Order", back_populates="child")
+    diagnoses: Mapped[list["ChildDiagnosis"]] = relationship("ChildDiagnosis", back_populates="child", passive_deletes=True)
+    procedures: Mapped[list["ProcedureRecord"]] = relationship("ProcedureRecord", back_populates="child", passive_deletes=True)
+    orders: Mapped[list["Order"]] = relationship("Order", back_populates="child", passive_deletes=True)
     
 class ProcedureRecord(Base):
     __tablename__ = 'procedure_records'
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
-    id_child: Mapped[int] = mapped_column(ForeignKey('childs.id'))
+    id_child: Mapped[int] = mapped_column(ForeignKey('childs.id', ondelete='CASCADE'))
+    id_facility: Mapped[int] = mapped_column(ForeignKey('facilities.id'), index=True, default=1, server_default='1')
     id_procedure: Mapped[int] = mapped_column(ForeignKey('procedures.id'))
-    id_staff: Mapped[int] = mapped_column(ForeignKey('staff.id'))
-    procedure_time: Mapped[datetime] = mapped_column(DateTime)
+    id_staff: Mapped[Optional[int]] = mapped_column(ForeignKey('staff.id', ondelete='SET NULL'), nullable=True) # NULL, если сотрудник удален
+    procedure_time: Mapped[datetime] = mapped_column(DateTime, index=True)
+    id_order: Mapped[Optional[int]] = mapped_column(Integer, nullable=True) # Заказ, по плану которого создана запись; без FK - заказ может уйти в архив
+    version: Mapped[int] = mapped_column(Integer, default=1, server_default='1')
+
+    # Повторное развертывание плана того же заказа не создает дублей
+    __table_args__ = (UniqueConstraint('id_order', 'id_procedure', 'procedure_time', name='uq_procedure_records_plan_slot'),)
 
     child: Mapped["Child"] = relationship("Child", back_populates="procedures")
     procedure: Mapped["Procedure"] = relationship("Procedure", back_populates="child_procedures")
@@ -40,7 +49,7 @@ class ChildDiagnosis(Base):
     __tablename__ = 'child_diagnosis'
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
-    id_child: Mapped[int] = mapped_column(ForeignKey('childs.id'))
+    id_child: Mapped[int] = mapped_column(ForeignKey('childs.id', ondelete='CASCADE'))
     id_diagnosis: Mapped[int] = mapped_column(ForeignKey('diagnosis.id'))
     date_diagnosis: Mapped[date] = mapped_column(Date)
     doctor: Mapped[str] = mapped_column(String(255))
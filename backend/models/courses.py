@@ -2,26 +2,28 @@ from config.database import Base
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy import Integer, String, Date, ForeignKey, DECIMAL, Text
 from datetime import date
+from typing import Optional
 
 class TreatmentCourse(Base):
     __tablename__ = 'treatment_courses'
     
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
-    name: Mapped[str] = mapped_column(String(255))
+    name: Mapped[str] = mapped_column(String(255), index=True)
     description: Mapped[str] = mapped_column(Text)
-    price: Mapped[float] = mapped_column(DECIMAL(7, 2))
+    price: Mapped[float] = mapped_column(DECIMAL(7, 2), index=True)
     duration_days: Mapped[int] = mapped_column(Integer)  
     id_diagnosis: Mapped[int] = mapped_column(ForeignKey('diagnosis.id'))
+    version: Mapped[int] = mapped_column(Integer, default=1, server_default='1')
 
     diagnosis: Mapped["Diagnosis"] = relationship("Diagnosis", back_populates="courses")
-    procedures: Mapped[list["CourseProcedure"]] = relationship("CourseProcedure", back_populates="course")
+    procedures: Mapped[list["CourseProcedure"]] = relationship("CourseProcedure", back_populates="course", passive_deletes=True)
     orders: Mapped[list["Order"]] = relationship("Order", back_populates="treatment_course")
 
 class CourseProcedure(Base):
     __tablename__ = 'courses_procedures'
 
-    id_course: Mapped[int] = mapped_column(ForeignKey('treatment_courses.id'), primary_key=True)
-    id_procedure: Mapped[int] = mapped_column(ForeignKey('procedures.id'), primary_key=True)
+    id_course: Mapped[int] = mapped_column(ForeignKey('treatment_courses.id', ondelete='CASCADE'), primary_key=True)
+    id_procedure: Mapped[int] = mapped_column(ForeignKey('procedures.id', ondelete='CASCADE'), primary_key=True)
 
     course: Mapped["TreatmentCourse"] = relationship("TreatmentCourse", back_populates="procedures")
     procedure: Mapped["Procedure"] = relationship("Procedure", back_populates="course_procedures")
@@ -30,11 +32,26 @@ class Procedure(Base):
     __tablename__ = 'procedures'
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
-    name: Mapped[str] = mapped_column(String(255))
+    name: Mapped[str] = mapped_column(String(255), index=True)
     description: Mapped[str] = mapped_column(Text)
     contraindications: Mapped[str] = mapped_column(Text) # Противопоказания
     frequency: Mapped[str] = mapped_column(String(50)) # Частота выполнения
     duration_min: Mapped[int] = mapped_column(Integer) # Длительность в мин 
+    department: Mapped[Optional[str]] = mapped_column(String(100), nullable=True) # Отдел, чьи сотрудники проводят процедуру; NULL - любой
+    version: Mapped[int] = mapped_column(Integer, default=1, server_default='1')
 
     child_procedures: Mapped[list["ProcedureRecord"]] = relationship("ProcedureRecord", back_populates="procedure")
-    course_procedures: Mapped[list["CourseProcedure"]] = relationship("CourseProcedure", back_populates="procedure")
+    course_procedures: Mapped[list["CourseProcedure"]] = relationship("CourseProcedure", back_populates="procedure", passive_deletes=True)
+    contraindication_links: Mapped[list["Contraindication"]] = relationship("Contraindication", back_populates="procedure", passive_deletes=True)
+
+class Contraindication(Base):
+    __tablename__ = 'contraindications'
+
+    # Связь процедуры с диагнозом или с группой диагнозов по префиксу кода МКБ ("J45", "I")
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    id_procedure: Mapped[int] = mapped_column(ForeignKey('procedures.id', ondelete='CASCADE'), index=True)
+    id_diagnosis: Mapped[Optional[int]] = mapped_column(ForeignKey('diagnosis.id', ondelete='CASCADE'), nullable=True, index=True)
+    icd_prefix: Mapped[Optional[str]] = mapped_column(String(10), nullable=True)
+    note: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+
+    procedure: Mapped["Procedure"] = relationship("Procedure", back_populates="contraindication_links")
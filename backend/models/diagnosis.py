@@ -7,11 +7,12 @@ class Diagnosis(Base):
     __tablename__ = "diagnosis"
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
-    name: Mapped[str] = mapped_column(String(100))  # Название диагноза
-    icd_code: Mapped[str] = mapped_column(String(10)) # Код по МКБ
+    name: Mapped[str] = mapped_column(String(100), index=True)  # Название диагноза
+    icd_code: Mapped[str] = mapped_column(String(10), index=True) # Код по МКБ
     description: Mapped[str] = mapped_column(Text)
     symptoms: Mapped[str] = mapped_column(Text)
     contraindications: Mapped[str] = mapped_column(Text)
+    version: Mapped[int] = mapped_column(Integer, default=1, server_default='1')
 
     courses: Mapped[list["TreatmentCourse"]] = relationship("TreatmentCourse", back_populates="diagnosis")
     children: Mapped[list["ChildDiagnosis"]] = relationship("ChildDiagnosis", back_populates="diagnosis")
@@ -0,0 +1,9 @@
+from config.database import Base
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import Integer, String
+
+class Facility(Base):
+    __tablename__ = 'facilities'
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    name: Mapped[str] = mapped_column(String(255)) # Филиал санатория
@@ -0,0 +1,24 @@
+from config.database import Base
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import Integer, String, DateTime, Text, JSON, Index
+from datetime import datetime
+from typing import Optional
+from utils.enums import JobStatus
+
+class Job(Base):
+    __tablename__ = 'jobs'
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    type: Mapped[str] = mapped_column(String(100), index=True)
+    payload: Mapped[dict] = mapped_column(JSON)
+    idempotency_key: Mapped[str] = mapped_column(String(255), unique=True) # Повторная постановка с тем же ключом игнорируется
+    status: Mapped[str] = mapped_column(String(20), default=JobStatus.PENDING.value)
+    attempts: Mapped[int] = mapped_column(Integer, default=0)
+    max_attempts: Mapped[int] = mapped_column(Integer)
+    run_at: Mapped[datetime] = mapped_column(DateTime) # Не раньше этого времени, сдвигается при повторах
+    locked_until: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True) # Таймаут видимости взятой задачи
+    last_error: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.now)
+    finished_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+
+    __table_args__ = (Index('ix_jobs_status_run_at', 'status', 'run_at'),)
@@ -7,14 +7,16 @@ class Order(Base):
     __tablename__ = 'orders'
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
-    id_child: Mapped[int] = mapped_column(ForeignKey('childs.id'))
-    id_parent: Mapped[int] = mapped_column(ForeignKey('parents.id'))
+    id_child: Mapped[int] = mapped_column(ForeignKey('childs.id', ondelete='CASCADE'))
+    id_parent: Mapped[int] = mapped_column(ForeignKey('parents.id', ondelete='CASCADE'))
     id_treatment_course: Mapped[int] = mapped_column(ForeignKey('treatment_courses.id'))
     id_room: Mapped[int] = mapped_column(ForeignKey('rooms.id'))
-    status: Mapped[str] = mapped_column(String(255))
-    check_in_date: Mapped[date] = mapped_column(Date)
-    check_out_date: Mapped[date] = mapped_column(Date)
-    price: Mapped[float] = mapped_column(DECIMAL(7, 2))
+    id_facility: Mapped[int] = mapped_column(ForeignKey('facilities.id'), index=True, default=1, server_default='1')
+    status: Mapped[str] = mapped_column(String(255), index=True)
+    check_in_date: Mapped[date] = mapped_column(Date, index=True)
+    check_out_date: Mapped[date] = mapped_column(Date, index=True)
+    price: Mapped[float] = mapped_column(DECIMAL(7, 2), index=True)
+    version: Mapped[int] = mapped_column(Integer, default=1, server_default='1')
 
     child: Mapped["Child"] = relationship("Child", back_populates="orders")
     parent: Mapped["Parent"] = relationship("Parent", back_populates="orders")
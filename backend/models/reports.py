@@ -0,0 +1,19 @@
+from config.database import Base
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import Integer, Date, ForeignKey, DECIMAL
+from datetime import date
+
+class RoomOccupancy(Base):
+    __tablename__ = 'report_room_occupancy'
+
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    id_room: Mapped[int] = mapped_column(ForeignKey('rooms.id', ondelete='CASCADE'), primary_key=True)
+    guests: Mapped[int] = mapped_column(Integer, default=0) # Количество детей, проживающих в номере в эту ночь
+
+class CourseRevenue(Base):
+    __tablename__ = 'report_course_revenue'
+
+    month: Mapped[date] = mapped_column(Date, primary_key=True) # Первое число месяца заезда
+    id_treatment_course: Mapped[int] = mapped_column(ForeignKey('treatment_courses.id', ondelete='CASCADE'), primary_key=True)
+    orders_count: Mapped[int] = mapped_column(Integer, default=0)
+    revenue: Mapped[float] = mapped_column(DECIMAL(12, 2), default=0)
@@ -7,9 +7,11 @@ class Room(Base):
     __tablename__ = 'rooms'
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    id_facility: Mapped[int] = mapped_column(ForeignKey('facilities.id'), index=True, default=1, server_default='1')
     number: Mapped[str] = mapped_column(String(10))
     floor: Mapped[int] = mapped_column(Integer)
     capacity: Mapped[int] = mapped_column(Integer)
     description: Mapped[str] = mapped_column(Text) # Общее описание удобств
+    version: Mapped[int] = mapped_column(Integer, default=1, server_default='1')
 
     orders: Mapped[list["Order"]] = relationship("Order", back_populates="room")
\ No newline at end of file
@@ -0,0 +1,14 @@
+from config.database import Base
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import Integer, String, DateTime
+from datetime import datetime
+from typing import Optional
+
+class RevokedToken(Base):
+    __tablename__ = 'revoked_tokens'
+
+    jti: Mapped[str] = mapped_column(String(32), primary_key=True) # jti refresh-токена или id всей сессии (fam)
+    id_user: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    reason: Mapped[str] = mapped_column(String(10)) # LOGOUT, ROTATED, REUSED
+    revoked_at: Mapped[datetime] = mapped_column(DateTime, index=True)
+    expires_at: Mapped[datetime] = mapped_column(DateTime, index=True) # После этого токен отклоняется и без списка
@@ -1,44 +1,63 @@
 from config.database import Base
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy import Integer, String, DATE, ForeignKey
-from datetime import date
+from sqlalchemy import Integer, String, DATE, Time, ForeignKey
+from datetime import date, time
+from typing import Optional
 
 class User(Base):
     __tablename__ = 'users'
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     role: Mapped[str] = mapped_column(String(255))
-    email: Mapped[str] = mapped_column(String(255))
+    email: Mapped[str] = mapped_column(String(255), index=True)
     password: Mapped[str] = mapped_column(String(255))
+    id_home_facility: Mapped[Optional[int]] = mapped_column(ForeignKey('facilities.id', name='fk_users_id_home_facility'), nullable=True) # Филиал сотрудника, к нему привязан токен; NULL - вся сеть
+    version: Mapped[int] = mapped_column(Integer, default=1, server_default='1')
 
-    parent: Mapped["Parent"] = relationship("Parent", back_populates="user", uselist=False)
-    staff: Mapped["Staff"] = relationship("Staff", back_populates="user", uselist=False)
+    parent: Mapped["Parent"] = relationship("Parent", back_populates="user", uselist=False, passive_deletes=True)
+    staff: Mapped["Staff"] = relationship("Staff", back_populates="user", uselist=False, passive_deletes=True)
 
 class Staff(Base):
     __tablename__ = 'staff'
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
-    id_user: Mapped[int] = mapped_column(ForeignKey('users.id'))
+    id_user: Mapped[int] = mapped_column(ForeignKey('users.id', ondelete='CASCADE'))
     name: Mapped[str] = mapped_column(String(255))
     position: Mapped[str] = mapped_column(String(255)) # Должность
     qualification: Mapped[str] = mapped_column(String(255)) # Образование
     hire_date: Mapped[date] = mapped_column(DATE) # Дата приема на работу
     department: Mapped[str] = mapped_column(String(100)) # Отдел
     schedule: Mapped[str] = mapped_column(String(255)) # График
+    version: Mapped[int] = mapped_column(Integer, default=1, server_default='1')
 
     user: Mapped["User"] = relationship("User", back_populates="staff")
-    procedures: Mapped[list["ProcedureRecord"]] = relationship("ProcedureRecord", back_populates="staff")
+    procedures: Mapped[list["ProcedureRecord"]] = relationship("ProcedureRecord", back_populates="staff", passive_deletes=True)
+    shifts: Mapped[list["StaffShift"]] = relationship("StaffShift", back_populates="staff", passive_deletes=True)
+
+class StaffShift(Base):
+    __tablename__ = 'staff_shifts'
+
+    # Недельный график (weekday) или исключение на дату (day). Исключение без времени - выходной
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    id_staff: Mapped[int] = mapped_column(ForeignKey('staff.id', ondelete='CASCADE'), index=True)
+    weekday: Mapped[Optional[int]] = mapped_column(Integer, nullable=True, index=True) # 0 - понедельник
+    day: Mapped[Optional[date]] = mapped_column(DATE, nullable=True, index=True)
+    start_time: Mapped[Optional[time]] = mapped_column(Time, nullable=True)
+    end_time: Mapped[Optional[time]] = mapped_column(Time, nullable=True) # Не позже start_time - смена через полночь
+
+    staff: Mapped["Staff"] = relationship("Staff", back_populates="shifts")
 
 class Parent(Base):
     __tablename__ = 'parents'
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
-    id_user: Mapped[int] = mapped_column(ForeignKey('users.id'))
-    name: Mapped[str] = mapped_column(String(255))
+    id_user: Mapped[int] = mapped_column(ForeignKey('users.id', ondelete='CASCADE'))
+    name: Mapped[str] = mapped_column(String(255), index=True)
     phone: Mapped[str] = mapped_column(String(20))
     address: Mapped[str] = mapped_column(String(255))
     passport_data: Mapped[str] = mapped_column(String(100))
+    version: Mapped[int] = mapped_column(Integer, default=1, server_default='1')
 
     user: Mapped["User"] = relationship("User", back_populates="parent")
-    children: Mapped[list["Child"]] = relationship("Child", back_populates="parent")
-    orders: Mapped[list["Order"]] = relationship("Order", back_populates="parent")
+    children: Mapped[list["Child"]] = relationship("Child", back_populates="parent", passive_deletes=True)
+    orders: Mapped[list["Order"]] = relationship("Order", back_populates="parent", passive_deletes=True)
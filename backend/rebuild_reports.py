@@ -0,0 +1,10 @@
+from config.database import SessionLocal
+from service import ReportService
+
+# Полная пересборка сводных таблиц отчетов: python rebuild_reports.py
+if __name__ == '__main__':
+    session = SessionLocal()
+    try:
+        print(ReportService.for_session(session).rebuild_all())
+    finally:
+        session.close()
@@ -8,6 +8,10 @@ from routers.courses import router as course_router
 from routers.childs import router as child_router
 from routers.procedure_records import router as procedure_records_router
 from routers.orders import router as order_router
+from routers.reports import router as report_router
+from routers.jobs import router as job_router
+from routers.system import router as system_router
+from routers.audit import router as audit_router
 
 routers = APIRouter(prefix='/api')
 routers.include_router(auth_router, prefix='/auth', tags=['auth'])
@@ -18,4 +22,8 @@ routers.include_router(rooms_router, prefix='/rooms', tags=['rooms'])
 routers.include_router(course_router, prefix='/courses', tags=['courses'])
 routers.include_router(child_router, prefix='/childs', tags=['childs'])
 routers.include_router(procedure_records_router, prefix='/procedure_records', tags=['procedure_records'])
-routers.include_router(order_router, prefix='/orders', tags=['orders'])
\ No newline at end of file
+routers.include_router(order_router, prefix='/orders', tags=['orders'])
+routers.include_router(report_router, prefix='/reports', tags=['reports'])
+routers.include_router(job_router, prefix='/jobs', tags=['jobs'])
+routers.include_router(system_router, prefix='/system', tags=['system'])
+routers.include_router(audit_router, prefix='/audit', tags=['audit'])
\ No newline at end of file
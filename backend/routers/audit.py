@@ -0,0 +1,25 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from datetime import datetime
+from dependencies import AuditService, get_audit_service, get_current_admin
+from schemas.audit import *
+from utils.enums import Status
+
+router = APIRouter()
+
+@router.get('/', status_code=200)
+def get_audit_log(entity: str | None = Query(None),
+                  entity_id: int | None = Query(None),
+                  id_user: int | None = Query(None),
+                  date_from: datetime | None = Query(None),
+                  date_to: datetime | None = Query(None),
+                  limit: int = Query(100, ge=1, le=1000),
+                  audit_service: AuditService = Depends(get_audit_service),
+                  current_admin = Depends(get_current_admin)):
+    if entity_id is not None and entity is None:
+        raise HTTPException(status_code=400, detail={'status': Status.FAILED.value})
+    if date_from and date_to and date_from > date_to:
+        raise HTTPException(status_code=400, detail={'status': Status.FAILED.value})
+    filter = {'entity': entity, 'entity_id': entity_id, 'id_user': id_user,
+              'created_at__gte': date_from, 'created_at__lte': date_to}
+    entries = audit_service.get_entries(limit, **{k: v for k, v in filter.items() if v is not None})
+    return [AuditLogResponse(**entry.__dict__) for entry in entries]
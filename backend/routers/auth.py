@@ -1,6 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException, Cookie, Request, Form
 from fastapi.responses import JSONResponse
 from dependencies import get_auth_service, AuthService, get_current_user, UserService, get_user_service
+from config.auth import oauth2_scheme
 from schemas.users import *
 from utils.enums import Status
 from datetime import timedelta
@@ -72,9 +73,13 @@ async def refresh(request: Request, auth_service: AuthService = Depends(get_auth
     return response
 
 @router.get('/logout', status_code=200)
-async def logout(user = Depends(get_current_user)):
+async def logout(request: Request,
+                 token: str = Depends(oauth2_scheme),
+                 auth_service: AuthService = Depends(get_auth_service),
+                 user = Depends(get_current_user)):
     if not user:
         raise HTTPException(status_code=401, detail={'status': Status.UNAUTHORIZED.value})
+    auth_service.logout(token, request.cookies.get('update_token'))
     response = JSONResponse(content={'status': Status.SUCCESS.value})
     response.delete_cookie(key='update_token')
     return response
@@ -1,11 +1,23 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
-from utils.enums import Status
+import asyncio
+import io
+import zipfile
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from utils.enums import Status, AuthStatus, Roles, DocumentFormat
 from dependencies import (ChildService, get_child_service, 
                           DiagnosisService, get_diagnosis_service,
-                          UserService, get_user_service)
+                          UserService, get_user_service,
+                          ChildReportService, get_child_report_service,
+                          ContraindicationService, get_contraindication_service,
+                          RecommendationService, get_recommendation_service,
+                          get_current_user, get_current_admin)
+from utils.documents import MEDIA_TYPES, pdf_available
 from schemas.childs import *
 from schemas.diagnosis import *
+from schemas.courses import RecommendedCourseResponse
 from schemas.users import ShortParentResponse
+from utils.fields import parse_fields, load_fields, trim_schema, wants
+from utils.filters import query_filters
+from models import Child
 
 router = APIRouter()
 
@@ -27,37 +39,114 @@ async def get_all_childs(name: str | None = Query(None),
                         weight: float | None = Query(None),
                         blood: BloodType | None = Query(None),
                         disability: str | None = Query(None),
+                        fields: str | None = Query(None),
+                        filters: dict = Depends(query_filters(Child)),
                         child_service: ChildService = Depends(get_child_service),
                         diagnosis_service: DiagnosisService = Depends(get_diagnosis_service),
                         user_service: UserService = Depends(get_user_service)):
-    filter = {k: v for k, v in locals().items() if v is not None and k not in {'child_service', 'diagnosis_service', 'user_service'}}
-    childs = child_service.get_all_childs_filter_by(**filter)
+    filter = {k: v for k, v in locals().items() if v is not None and k not in {'child_service', 'diagnosis_service', 'user_service', 'fields', 'filters'}}
+    filter.update(filters)
+    fields = parse_fields(ChildResponse, fields)
+    childs = load_fields(child_service.get_all_childs_filter_by(**filter), fields, required=('id_parent',))
     if not childs:
         raise HTTPException(status_code=404, detail={'status': Status.NOT_FOUND.value})
+    response_model = trim_schema(ChildResponse, fields)
     response = []
     for child in childs:
-        diagnoses_assoc = child_service.get_all_child_diagnosis_filter_by(id_child=child.id)
-        diagnoses_list = []
-        for diagnosis_assoc in diagnoses_assoc:
-            
-            diagnosis = diagnosis_service.get_one_diagnosis_filter_by(id=diagnosis_assoc.id_diagnosis)
-            diagnosis_resp = DiagnosisResponse(**diagnosis.__dict__)
-
-            diagnosis_record_dict = diagnosis_assoc.__dict__
-            diagnosis_record_dict.update({
-                'diagnosis': diagnosis_resp
-            })
-            diagnoses_list.append(ChildDiagnosisResponse(**diagnosis_record_dict))
+        child_dict = child.__dict__
+        if wants(fields, 'diagnoses'):
+            diagnoses_assoc = child_service.get_all_child_diagnosis_filter_by(id_child=child.id)
+            diagnoses_list = []
+            for diagnosis_assoc in diagnoses_assoc:
+                
+                diagnosis = diagnosis_service.get_one_diagnosis_filter_by(id=diagnosis_assoc.id_diagnosis)
+                diagnosis_resp = DiagnosisResponse(**diagnosis.__dict__)
+
+                diagnosis_record_dict = diagnosis_assoc.__dict__
+                diagnosis_record_dict.update({
+                    'diagnosis': diagnosis_resp
+                })
+                diagnoses_list.append(ChildDiagnosisResponse(**diagnosis_record_dict))
+            child_dict['diagnoses'] = diagnoses_list
         
-        parent = user_service.get_one_parent_filter_by(id=child.id_parent)
-        parent_response = ShortParentResponse(**parent.__dict__)
+        if wants(fields, 'parent'):
+            parent = user_service.get_one_parent_filter_by(id=child.id_parent)
+            child_dict['parent'] = ShortParentResponse(**parent.__dict__)
 
-        child_response = ChildResponse(**child.__dict__, 
-                                       parent=parent_response, 
-                                       diagnoses=diagnoses_list)
-        response.append(child_response)
+        response.append(response_model(**child_dict))
     return response
 
+def check_format(format: DocumentFormat):
+    if format == DocumentFormat.PDF and not pdf_available():
+        raise HTTPException(status_code=501, detail={'status': Status.FAILED.value})
+
+def zip_documents(documents: list[tuple[str, bytes]], compress: bool) -> bytes:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED if compress else zipfile.ZIP_STORED) as archive:
+        for name, content in documents:
+            archive.writestr(name, content)
+    return buffer.getvalue()
+
+@router.get('/reports', status_code=200)
+async def get_child_reports(check_out_date: date = Query(...),
+                            format: DocumentFormat = Query(DocumentFormat.PDF),
+                            child_report_service: ChildReportService = Depends(get_child_report_service),
+                            current_admin = Depends(get_current_admin)):
+    # Выписки всех детей, выезжающих в этот день, одним zip-архивом
+    check_format(format)
+    ids = child_report_service.checking_out(check_out_date)
+    if not ids:
+        raise HTTPException(status_code=404, detail={'status': Status.NOT_FOUND.value})
+    reports = child_report_service.gather(ids)
+    rendered = await asyncio.gather(*[child_report_service.render(id, data, format.value)
+                                      for id, data in reports.items()])
+    documents = [(f'{id}.{format.value}', content) for id, (content, _) in zip(reports, rendered)]
+    archive = await asyncio.to_thread(zip_documents, documents, format == DocumentFormat.HTML)
+    return Response(content=archive, media_type='application/zip',
+                    headers={'Content-Disposition': f'attachment; filename="reports-{check_out_date}.zip"'})
+
+@router.get('/{id}/report.{format}', status_code=200)
+async def get_child_report(id: int,
+                           format: DocumentFormat,
+                           request: Request,
+                           child_report_service: ChildReportService = Depends(get_child_report_service),
+                           current_user = Depends(get_current_user)):
+    check_format(format)
+    data = child_report_service.gather([id]).get(id)
+    if not data:
+        raise HTTPException(status_code=404, detail={'status': Status.NOT_FOUND.value})
+    if current_user.role != Roles.ADMIN.value and data['id_user'] != current_user.id:
+        raise HTTPException(status_code=403, detail={'status': AuthStatus.FORBIDDEN.value})
+    content, digest = await child_report_service.render(id, data, format.value)
+    headers = {'ETag': f'"{digest}"', 'Cache-Control': 'private, no-cache'}
+    if request.headers.get('if-none-match') == headers['ETag']:
+        return Response(status_code=304, headers=headers)
+    if format == DocumentFormat.PDF:
+        headers['Content-Disposition'] = f'inline; filename="report-{id}.pdf"'
+    return Response(content=content, media_type=MEDIA_TYPES[format.value], headers=headers)
+
+@router.get('/{id}/contraindications', status_code=200)
+async def get_child_contraindications(id: int,
+                                      id_procedure: int | None = Query(None),
+                                      id_course: int | None = Query(None),
+                                      contraindication_service: ContraindicationService = Depends(get_contraindication_service)):
+    # Диагнозы ребенка, при которых процедура (или хотя бы одна процедура курса) противопоказана
+    if (id_procedure is None) == (id_course is None):
+        raise HTTPException(status_code=400, detail={'status': Status.FAILED.value})
+    if id_procedure is not None:
+        return {'ids_diagnoses': contraindication_service.procedure_conflicts(id, id_procedure)}
+    return {'ids_diagnoses': contraindication_service.course_conflicts(id, id_course)}
+
+@router.get('/{id}/recommended-courses', status_code=200)
+async def get_recommended_courses(id: int,
+                                  limit: int = Query(20, ge=1, le=100),
+                                  child_service: ChildService = Depends(get_child_service),
+                                  recommendation_service: RecommendationService = Depends(get_recommendation_service)):
+    # Курсы по покрытию диагнозов ребенка, без курсов с противопоказанными процедурами
+    if not child_service.get_one_child_filter_by(id=id):
+        raise HTTPException(status_code=404, detail={'status': Status.NOT_FOUND.value})
+    return [RecommendedCourseResponse(**item) for item in recommendation_service.recommend_courses(id)[:limit]]
+
 @router.get('/{id}', status_code=200)
 async def get_one_child(id: int,
                         child_service: ChildService = Depends(get_child_service),
@@ -90,17 +179,15 @@ async def get_one_child(id: int,
 async def update_child(id: int,
                        data: UpdateChild,
                        child_service: ChildService = Depends(get_child_service)):
-    child = child_service.get_one_child_filter_by(id=id)
-    if not child:
-        raise HTTPException(status_code=404, detail={'status': Status.NOT_FOUND.value})
     updated_child = child_service.update_child(id=id, upd_data=data)
+    if not updated_child:
+        raise HTTPException(status_code=404, detail={'status': Status.NOT_FOUND.value})
     return updated_child
 
 @router.delete('/{id}', status_code=200)
 async def delete_child(id: int,
+                       version: int | None = Query(None),
                        child_service: ChildService = Depends(get_child_service)):
-    child = child_service.get_one_child_filter_by(id=id)
-    if not child:
+    if not child_service.delete_child(id=id, version=version):
         raise HTTPException(status_code=404, detail={'status': Status.NOT_FOUND.value})
-    deleted_child = child_service.delete_child(id=id)
     return {'status': Status.SUCCESS.value}
@@ -3,6 +3,9 @@ from dependencies import CourseService, get_course_service, DiagnosisService, ge
 from schemas.courses import *
 from schemas.diagnosis import DiagnosisResponse
 from utils.enums import Status
+from utils.fields import parse_fields, load_fields, trim_schema, wants
+from utils.filters import query_filters
+from models import TreatmentCourse
 
 router = APIRouter()
 
@@ -15,33 +18,36 @@ async def create_course(data: CreateTreatmentCourse,
     return new_course
 
 @router.get('/', status_code=200)
-async def get_all_courses(name: str = Query(None),
+def get_all_courses(name: str = Query(None),
                           price: float = Query(None),
                           duration_days: int = Query(None),
                           id_diagnosis: int = Query(None),
+                          fields: str | None = Query(None),
+                          filters: dict = Depends(query_filters(TreatmentCourse)),
                           course_service: CourseService = Depends(get_course_service),
                           diagnosis_service: DiagnosisService = Depends(get_diagnosis_service)):
-    filter = {k: v for k, v in locals().items() if v is not None and k not in {'course_service', 'diagnosis_service'}}
-    courses = course_service.get_all_courses_filter_by(**filter)
+    filter = {k: v for k, v in locals().items() if v is not None and k not in {'course_service', 'diagnosis_service', 'fields', 'filters'}}
+    filter.update(filters)
+    fields = parse_fields(TreatmentCourseResponse, fields)
+    courses = load_fields(course_service.get_all_courses_filter_by(**filter), fields, required=('id_diagnosis',))
     if not courses:
         raise HTTPException(status_code=404, detail={'status': Status.NOT_FOUND.value})
+    response_model = trim_schema(TreatmentCourseResponse, fields)
     response = []
     for course in courses:
-        procedures_assoc = course_service.get_all_course_procedures_filter_by(id_course=course.id)
-        procedures_resp = []
-
-        diagnosis = diagnosis_service.get_one_diagnosis_filter_by(id=course.id_diagnosis)
-        diagnosis_resp = DiagnosisResponse(**diagnosis.__dict__)
-
-        for procedure_assoc in procedures_assoc:
-            procedure = course_service.get_one_procedure_filter_by(id=procedure_assoc.id_procedure)
-            procedures_resp.append(ProcedureResponse(**procedure.__dict__))
         course_dict = course.__dict__
-        course_dict.update({
-            'procedures': procedures_resp,
-            'diagnosis': diagnosis_resp
-        })
-        response.append(TreatmentCourseResponse(**course_dict))
+        if wants(fields, 'procedures'):
+            procedures_assoc = course_service.get_all_course_procedures_filter_by(id_course=course.id)
+            procedures_resp = []
+            for procedure_assoc in procedures_assoc:
+                procedure = course_service.get_one_procedure_filter_by(id=procedure_assoc.id_procedure)
+                procedures_resp.append(ProcedureResponse(**procedure.__dict__))
+            course_dict['procedures'] = procedures_resp
+
+        if wants(fields, 'diagnosis'):
+            diagnosis = diagnosis_service.get_one_diagnosis_filter_by(id=course.id_diagnosis)
+            course_dict['diagnosis'] = DiagnosisResponse(**diagnosis.__dict__)
+        response.append(response_model(**course_dict))
     return response
 
 @router.get('/{id}', status_code=200)
@@ -71,17 +77,15 @@ async def get_one_course(id: int,
 async def update_course(id: int,
                         data: UpdateTreatmentCourse,
                         course_service: CourseService = Depends(get_course_service)):
-    course = course_service.get_one_course_filter_by(id=id)
-    if not course:
-        raise HTTPException(status_code=404, detail={'status': Status.NOT_FOUND.value})
     updated_course = course_service.update_course(id=id, upd_course=data)
+    if not updated_course:
+        raise HTTPException(status_code=404, detail={'status': Status.NOT_FOUND.value})
     return updated_course
 
 @router.delete('/{id}', status_code=200)
 async def delete_course(id: int,
+                        version: int | None = Query(None),
                         course_service: CourseService = Depends(get_course_service)):
-    course = course_service.get_one_course_filter_by(id=id)
-    if not course:
+    if not course_service.delete_course(id=id, version=version):
         raise HTTPException(status_code=404, detail={'status': Status.NOT_FOUND.value})
-    course_service.delete_course(id=id)
     return {'status': Status.SUCCESS.value}
\ No newline at end of file
@@ -2,6 +2,9 @@ from fastapi import APIRouter, Depends, HTTPException, Query
 from dependencies import DiagnosisService, get_diagnosis_service
 from schemas.diagnosis import *
 from utils.enums import Status
+from utils.fields import parse_fields, load_fields, trim_schema
+from utils.filters import query_filters
+from models import Diagnosis
 
 router = APIRouter()
 
@@ -16,12 +19,17 @@ async def create_diagnosis(data: CreateDiagnosis,
 @router.get('/', status_code=200)
 async def get_all_diagnosis(name: str | None = Query(None),
                             icd_code: str | None = Query(None),
+                            fields: str | None = Query(None),
+                            filters: dict = Depends(query_filters(Diagnosis)),
                             diagnosis_service: DiagnosisService = Depends(get_diagnosis_service)):
-    filter = {k: v for k, v in locals().items() if v is not None and k != 'diagnosis_service'}
-    diagnoses = diagnosis_service.get_all_diagnosis_filter_by(**filter)
+    filter = {k: v for k, v in locals().items() if v is not None and k not in {'diagnosis_service', 'fields', 'filters'}}
+    filter.update(filters)
+    fields = parse_fields(DiagnosisResponse, fields)
+    diagnoses = load_fields(diagnosis_service.get_all_diagnosis_filter_by(**filter), fields)
     if not diagnoses:
         raise HTTPException(status_code=404, detail={'status': Status.NOT_FOUND.value})
-    return [DiagnosisResponse(**diagnosis.__dict__) for diagnosis in diagnoses]
+    response_model = trim_schema(DiagnosisResponse, fields)
+    return [response_model(**diagnosis.__dict__) for diagnosis in diagnoses]
 
 @router.get('/{id}', status_code=200)
 async def get_one_diagnosis(id: int,
@@ -35,17 +43,15 @@ async def get_one_diagnosis(id: int,
 async def update_diagnosis(id: int,
                            data: UpdateDiagnosis,
                            diagnosis_service: DiagnosisService = Depends(get_diagnosis_service)):
-    diagnosis = diagnosis_service.get_one_diagnosis_filter_by(id=id)
-    if not diagnosis:
-        raise HTTPException(status_code=404, detail={'status': Status.NOT_FOUND.value})
     updated_diagnosis = diagnosis_service.update_diagnosis(id=id, upd_diagnosis=data)
+    if not updated_diagnosis:
+        raise HTTPException(status_code=404, detail={'status': Status.NOT_FOUND.value})
     return updated_diagnosis
 
 @router.delete('/{id}', status_code=200)
 async def delete_diagnosis(id: int,
+                           version: int | None = Query(None),
                            diagnosis_service: DiagnosisService = Depends(get_diagnosis_service)):
-    diagnosis = diagnosis_service.get_one_diagnosis_filter_by(id=id)
-    if not diagnosis:
+    if not diagnosis_service.delete_diagnosis(id=id, version=version):
         raise HTTPException(status_code=404, detail={'status': Status.NOT_FOUND.value})
-    diagnosis_service.delete_diagnosis(id=id)
     return {'status': Status.SUCCESS.value}
\ No newline at end of file
@@ -0,0 +1,26 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from dependencies import JobService, get_job_service, get_current_admin
+from models.jobs import Job
+from schemas.jobs import *
+from utils.enums import Status
+
+router = APIRouter()
+
+@router.get('/', status_code=200)
+async def get_all_jobs(type: str | None = Query(None),
+                       status: str | None = Query(None),
+                       job_service: JobService = Depends(get_job_service),
+                       current_admin = Depends(get_current_admin)):
+    filter = {k: v for k, v in locals().items() if v is not None
+              and k not in {'job_service', 'current_admin'}}
+    jobs = job_service.get_all_jobs_filter_by(**filter).order_by(Job.id.desc()).limit(100)
+    return [JobResponse(**job.__dict__) for job in jobs]
+
+@router.get('/{id}', status_code=200)
+async def get_one_job(id: int,
+                      job_service: JobService = Depends(get_job_service),
+                      current_admin = Depends(get_current_admin)):
+    job = job_service.get_one_job_filter_by(id=id)
+    if not job:
+        raise HTTPException(status_code=404, detail={'status': Status.NOT_FOUND.value})
+    return JobResponse(**job.__dict__)
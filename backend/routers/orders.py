@@ -7,6 +7,13 @@ from schemas.courses import ShortCourseResponse
 from schemas.rooms import RoomResponse
 from schemas.orders import *
 from utils.enums import *
+from utils.fields import parse_fields, load_fields, trim_schema, wants
+from utils.filters import query_filters
+from utils.events import stream
+from config.events import EVENTS_HEARTBEAT, EVENTS_RETRY_MS
+from fastapi import Request
+from fastapi.responses import StreamingResponse
+from itertools import chain
 
 router = APIRouter()
 
@@ -42,6 +49,8 @@ async def get_all_orders(id_child: int = Query(None),
                          check_in_date: str = Query(None),
                          check_out_date: str = Query(None),
                          price: float = Query(None),
+                         fields: str | None = Query(None),
+                         filters: dict = Depends(query_filters(Order)),
                          order_service: OrderService = Depends(get_order_service),
                          user_service: UserService = Depends(get_user_service),
                          course_service: CourseService = Depends(get_course_service),
@@ -51,41 +60,74 @@ async def get_all_orders(id_child: int = Query(None),
                         ):
     if current_user.role == Roles.ADMIN.value:
         filter = {k: v for k, v in locals().items() if v is not None 
-                  and k not in ['order_service', 'current_user', 'user_service', 'course_service', 'room_service', 'child_service']}
+                  and k not in ['order_service', 'current_user', 'user_service', 'course_service', 'room_service', 'child_service', 'fields', 'filters']}
+        filter.update(filters)
     else:
         filter = {k: v for k, v in locals().items() if v is not None 
-                  and k not in ['order_service', 'current_user', 'user_service', 'course_service', 'room_service', 'child_service']}
+                  and k not in ['order_service', 'current_user', 'user_service', 'course_service', 'room_service', 'child_service', 'fields', 'filters']}
+        filter.update(filters)
         parent = user_service.get_one_parent_filter_by(id_user=current_user.id)
         filter['id_parent'] = parent.id
 
-    orders = order_service.get_all_orders_filter_by(**filter)
+    fields = parse_fields(OrderResponse, fields)
+    required = ('id_child', 'id_parent', 'id_treatment_course', 'id_room')
+    orders = load_fields(order_service.get_all_orders_filter_by(**filter), fields, required=required)
+    archived = order_service.get_archived_orders_filter_by(**filter)
+    if archived is not None:
+        orders = chain(orders, load_fields(archived, fields, required=required))
     if not orders:
         raise HTTPException(status_code=404, detail={'status': Status.NOT_FOUND.value})
+    response_model = trim_schema(OrderResponse, fields)
     response = []
     for order in orders:
-        child = child_service.get_one_child_filter_by(id=order.id_child)
-        child_resp = ShortChildResponse(**child.__dict__)
+        order_dict = order.__dict__
+        if wants(fields, 'child'):
+            child = child_service.get_one_child_filter_by(id=order.id_child)
+            order_dict['child'] = ShortChildResponse(**child.__dict__)
 
-        parent = user_service.get_one_parent_filter_by(id=order.id_parent)
-        parent_resp = ShortParentResponse(**parent.__dict__)
+        if wants(fields, 'parent'):
+            parent = user_service.get_one_parent_filter_by(id=order.id_parent)
+            order_dict['parent'] = ShortParentResponse(**parent.__dict__)
 
-        course = course_service.get_one_course_filter_by(id=order.id_treatment_course)
-        course_resp = ShortCourseResponse(**course.__dict__)
+        if wants(fields, 'treatment_course'):
+            course = course_service.get_one_course_filter_by(id=order.id_treatment_course)
+            order_dict['treatment_course'] = ShortCourseResponse(**course.__dict__)
 
-        room = room_service.get_one_room_filter_by(id=order.id_room)
-        room_resp = RoomResponse(**room.__dict__)
+        if wants(fields, 'room'):
+            room = room_service.get_one_room_filter_by(id=order.id_room)
+            order_dict['room'] = RoomResponse(**room.__dict__)
 
-        order_dict = order.__dict__
-        order_dict.update({
-            'child': child_resp,
-            'parent': parent_resp,
-            'treatment_course': course_resp,
-            'room': room_resp
-        })
-
-        response.append(OrderResponse(**order_dict))
+        response.append(response_model(**order_dict))
     return response
         
+@router.get('/events', status_code=200)
+async def order_events(request: Request,
+                       token: str | None = Query(None),
+                       last_event_id: str | None = Query(None),
+                       auth_service: AuthService = Depends(get_auth_service),
+                       user_service: UserService = Depends(get_user_service)):
+    # EventSource не умеет слать заголовки, поэтому токен можно передать и в query
+    header = request.headers.get('authorization', '')
+    token = header[7:] if header.lower().startswith('bearer ') else token
+    if not token:
+        raise HTTPException(status_code=401, detail={'status': AuthStatus.INVALID_TOKEN.value})
+    current_user = auth_service.get_user_by_token(token)
+    if current_user.role == Roles.ADMIN.value:
+        channel = 'admin'
+    else:
+        parent = user_service.get_one_parent_filter_by(id_user=current_user.id)
+        if not parent:
+            raise HTTPException(status_code=403, detail={'status': AuthStatus.FORBIDDEN.value})
+        channel = f'parent:{parent.id}'
+    # Соединение с БД не должно висеть все время жизни стрима
+    auth_service.user_repository.session.close()
+
+    subscriber = event_broker.subscribe(channel)
+    backlog = event_broker.replay(channel, request.headers.get('last-event-id') or last_event_id)
+    return StreamingResponse(stream(event_broker, subscriber, backlog, EVENTS_HEARTBEAT, EVENTS_RETRY_MS),
+                             media_type='text/event-stream',
+                             headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
 @router.get('/{id}', status_code=200)
 async def get_one_order(id: int,
                         order_service: OrderService = Depends(get_order_service),
@@ -127,9 +169,6 @@ async def update_order(id: int,
                        course_service: CourseService = Depends(get_course_service),
                        current_user: User = Depends(get_current_user),
                        ):
-    order = order_service.get_one_order_filter_by(id=id)
-    if not order:
-        raise HTTPException(status_code=404, detail={'status': Status.NOT_FOUND.value})
     
     data_dict = data.model_dump()
     if 'id_treatment_course' in data_dict:
@@ -140,15 +179,16 @@ async def update_order(id: int,
             data_dict['price'] = None
 
     updated_order = order_service.update_order(id, data_dict)
+    if not updated_order:
+        raise HTTPException(status_code=404, detail={'status': Status.NOT_FOUND.value})
     return updated_order
     
 @router.delete('/{id}', status_code=200)
 async def delete_order(id: int,
+                       version: int | None = Query(None),
                        order_service: OrderService = Depends(get_order_service),
                        current_user: User = Depends(get_current_user),
                        ):
-    order = order_service.get_one_order_filter_by(id=id)
-    if not order:
+    if not order_service.delete_order(id=id, version=version):
         raise HTTPException(status_code=404, detail={'status': Status.NOT_FOUND.value})
-    deleted_order = order_service.delete_order(id=id)
     return {'status': Status.SUCCESS.value}
\ No newline at end of file
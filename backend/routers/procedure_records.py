@@ -3,16 +3,27 @@ from utils.enums import Status
 from dependencies import (ProcedureRecordService, get_procedure_record_service,
                           ChildService, get_child_service,
                           UserService, get_user_service,
-                          CourseService, get_course_service)
+                          CourseService, get_course_service,
+                          PlanService, get_plan_service, get_current_admin,
+                          AssignmentService, get_assignment_service,
+                          ContraindicationService, get_contraindication_service)
 from schemas.childs import *
 from schemas.users import ShortStaffResponse
 from schemas.courses import *
+from utils.fields import parse_fields, load_fields, trim_schema, wants
+from utils.filters import query_filters
+from models import ProcedureRecord
+from itertools import chain
 
 router = APIRouter()
 
 @router.post('/', status_code=201)
 async def create_procedure_record(data: CreateProcedureRecord,
-                                  procedure_record_service: ProcedureRecordService = Depends(get_procedure_record_service)):
+                                  procedure_record_service: ProcedureRecordService = Depends(get_procedure_record_service),
+                                  contraindication_service: ContraindicationService = Depends(get_contraindication_service)):
+    conflicts = contraindication_service.procedure_conflicts(data.id_child, data.id_procedure)
+    if conflicts:
+        raise HTTPException(status_code=409, detail={'status': Status.CONTRAINDICATED.value, 'ids_diagnoses': conflicts})
     data_dict = data.model_dump()
     data_dict['procedure_time'] = datetime.now().replace(second=0, microsecond=0)
     new_record = procedure_record_service.create_procedure_record(data_dict)
@@ -20,38 +31,65 @@ async def create_procedure_record(data: CreateProcedureRecord,
         raise HTTPException(status_code=400, detail={'status': Status.FAILED.value})
     return new_record
 
+@router.post('/plan', status_code=200)
+def plan_procedure_records(date_from: date = Query(...),
+                           date_to: date = Query(...),
+                           plan_service: PlanService = Depends(get_plan_service),
+                           current_admin = Depends(get_current_admin)):
+    # Развертывает планы всех подтвержденных заказов с заездом в периоде; повторный вызов
+    # добавляет только недостающие слоты
+    if date_from > date_to:
+        raise HTTPException(status_code=400, detail={'status': Status.FAILED.value})
+    return plan_service.expand_period_all(date_from, date_to)
+
+@router.post('/assign', status_code=200)
+def assign_procedure_records(day: date = Query(...),
+                             dry_run: bool = Query(True),
+                             assignment_service: AssignmentService = Depends(get_assignment_service),
+                             current_admin = Depends(get_current_admin)):
+    # Назначает сотрудников на слоты дня без id_staff; dry_run=true только показывает результат
+    return assignment_service.assign_day(day, dry_run=dry_run)
+
 @router.get('/', status_code=200)
 async def get_all_procedure_records(id_child: int | None = Query(None),
                                     id_procedure: int | None = Query(None),
                                     id_staff: int | None = Query(None),
                                     procedure_time: datetime | None = Query(None),
+                                    fields: str | None = Query(None),
+                                    filters: dict = Depends(query_filters(ProcedureRecord)),
                                     procedure_record_service: ProcedureRecordService = Depends(get_procedure_record_service),
                                     child_service: ChildService = Depends(get_child_service),
                                     user_service: UserService = Depends(get_user_service),
                                     course_service: CourseService = Depends(get_course_service)
                                     ):
     filter = {k: v for k, v in locals().items() if v is not None and k 
-              not in {'procedure_record_service', 'child_service', 'user_service', 'course_service'}}
-    records = procedure_record_service.get_all_procedure_records_filter_by(**filter)
+              not in {'procedure_record_service', 'child_service', 'user_service', 'course_service', 'fields', 'filters'}}
+    filter.update(filters)
+    fields = parse_fields(ProcedureRecordResponse, fields)
+    required = ('id_child', 'id_procedure', 'id_staff')
+    records = load_fields(procedure_record_service.get_all_procedure_records_filter_by(**filter), fields,
+                          required=required)
+    archived = procedure_record_service.get_archived_procedure_records_filter_by(**filter)
+    if archived is not None:
+        records = chain(records, load_fields(archived, fields, required=required))
     if not records:
         raise HTTPException(status_code=404, detail={'status': Status.NOT_FOUND.value})
+    response_model = trim_schema(ProcedureRecordResponse, fields)
     response = []
     for record in records:
-        child = child_service.get_one_child_filter_by(id=record.id_child)
-        procedure = course_service.get_one_procedure_filter_by(id=record.id_procedure)
-        staff = user_service.get_one_staff_filter_by(id=record.id_staff)
+        record_dict = record.__dict__
+        if wants(fields, 'child'):
+            child = child_service.get_one_child_filter_by(id=record.id_child)
+            record_dict['child'] = ShortChildResponse(**child.__dict__)
 
-        child_response = ShortChildResponse(**child.__dict__)
-        procedure_response = ProcedureResponse(**procedure.__dict__)
-        staff_response = ShortStaffResponse(**staff.__dict__)
+        if wants(fields, 'procedure'):
+            procedure = course_service.get_one_procedure_filter_by(id=record.id_procedure)
+            record_dict['procedure'] = ProcedureResponse(**procedure.__dict__)
 
-        record_dict = record.__dict__
-        record_dict.update({
-            'child': child_response,
-            'procedure': procedure_response,
-            'staff': staff_response
-        })
-        response.append(ProcedureRecordResponse(**record_dict))
+        if wants(fields, 'staff'):
+            staff = user_service.get_one_staff_filter_by(id=record.id_staff)
+            record_dict['staff'] = ShortStaffResponse(**staff.__dict__) if staff else None
+        response.append(response_model(**record_dict))
     return response
 
 @router.get('/{id}', status_code=200)
@@ -70,7 +108,7 @@ async def get_one_procedure_record(id: int,
 
     child_response = ShortChildResponse(**child.__dict__)
     procedure_response = ProcedureResponse(**procedure.__dict__)
-    staff_response = ShortStaffResponse(**staff.__dict__)
+    staff_response = ShortStaffResponse(**staff.__dict__) if staff else None
 
     record_dict = record.__dict__
     record_dict.update({
@@ -84,17 +122,15 @@ async def get_one_procedure_record(id: int,
 async def update_procedure_record(id: int,
                                   data: UpdateProcedureRecord,
                                   procedure_record_service: ProcedureRecordService = Depends(get_procedure_record_service)):
-    record = procedure_record_service.get_one_procedure_record_filter_by(id=id)
-    if not record:
-        raise HTTPException(status_code=404, detail={'status': Status.NOT_FOUND.value})
     updated_record = procedure_record_service.update_procedure_record(id=id, upd_record=data)
+    if not updated_record:
+        raise HTTPException(status_code=404, detail={'status': Status.NOT_FOUND.value})
     return updated_record
 
 @router.delete('/{id}', status_code=200)
 async def delete_procedure_record(id: int,
+                                   version: int | None = Query(None),
                                    procedure_record_service: ProcedureRecordService = Depends(get_procedure_record_service)):
-    record = procedure_record_service.get_one_procedure_record_filter_by(id=id)
-    if not record:
+    if not procedure_record_service.delete_procedure_record(id=id, version=version):
         raise HTTPException(status_code=404, detail={'status': Status.NOT_FOUND.value})
-    procedure_record_service.delete_procedure_record(id=id)
     return {'status': Status.SUCCESS.value}
\ No newline at end of file
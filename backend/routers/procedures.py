@@ -1,7 +1,11 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
-from dependencies import CourseService, get_course_service
+from dependencies import (CourseService, get_course_service,
+                          ContraindicationService, get_contraindication_service, get_current_admin)
 from schemas.courses import *
 from utils.enums import Status
+from utils.fields import parse_fields, load_fields, trim_schema
+from utils.filters import query_filters
+from models import Procedure
 
 router = APIRouter()
 
@@ -19,12 +23,50 @@ async def get_all_procedures(name: str | None = Query(None),
                             contraindications: str | None = Query(None),
                             frequency: str | None = Query(None),
                             duration_min: int | None = Query(None),
+                            fields: str | None = Query(None),
+                            filters: dict = Depends(query_filters(Procedure)),
                             course_service: CourseService = Depends(get_course_service)):
-    filter = {k: v for k, v in locals().items() if v is not None and k != 'course_service'}
-    procedures = course_service.get_all_procedures_filter_by(**filter)
+    filter = {k: v for k, v in locals().items() if v is not None and k not in {'course_service', 'fields', 'filters'}}
+    filter.update(filters)
+    fields = parse_fields(ProcedureResponse, fields)
+    procedures = load_fields(course_service.get_all_procedures_filter_by(**filter), fields)
     if not procedures:
         raise HTTPException(status_code=404, detail={'status': Status.NOT_FOUND.value})
-    return [ProcedureResponse(**procedure.__dict__) for procedure in procedures]
+    response_model = trim_schema(ProcedureResponse, fields)
+    return [response_model(**procedure.__dict__) for procedure in procedures]
+
+@router.get('/{id}/contraindications', status_code=200)
+async def get_procedure_contraindications(id: int,
+                                          contraindication_service: ContraindicationService = Depends(get_contraindication_service)):
+    return [ContraindicationResponse(**link.__dict__)
+            for link in contraindication_service.get_contraindications_filter_by(id_procedure=id)]
+
+@router.post('/{id}/contraindications', status_code=201)
+async def add_procedure_contraindication(id: int,
+                                         data: CreateContraindication,
+                                         course_service: CourseService = Depends(get_course_service),
+                                         contraindication_service: ContraindicationService = Depends(get_contraindication_service),
+                                         current_admin = Depends(get_current_admin)):
+    if not course_service.get_one_procedure_filter_by(id=id):
+        raise HTTPException(status_code=404, detail={'status': Status.NOT_FOUND.value})
+    link = contraindication_service.create_contraindication(id, data.model_dump())
+    if not link:
+        raise HTTPException(status_code=400, detail={'status': Status.FAILED.value})
+    return ContraindicationResponse(**link.__dict__)
+
+@router.delete('/{id}/contraindications', status_code=200)
+async def delete_procedure_contraindication(id: int,
+                                            id_diagnosis: int | None = Query(None),
+                                            icd_prefix: str | None = Query(None),
+                                            contraindication_service: ContraindicationService = Depends(get_contraindication_service),
+                                            current_admin = Depends(get_current_admin)):
+    # Удаление по диагнозу или префиксу, а не по id: на шардах у копий строк id могут различаться
+    if (id_diagnosis is None) == (icd_prefix is None):
+        raise HTTPException(status_code=400, detail={'status': Status.FAILED.value})
+    filter = {'id_diagnosis': id_diagnosis} if id_diagnosis is not None else {'icd_prefix': icd_prefix}
+    if not contraindication_service.delete_contraindications(id, **filter):
+        raise HTTPException(status_code=404, detail={'status': Status.NOT_FOUND.value})
+    return {'status': Status.SUCCESS.value}
 
 @router.get('/{id}', status_code=200)
 async def get_one_procedure(id: int,
@@ -38,17 +80,15 @@ async def get_one_procedure(id: int,
 async def update_procedure(id: int,
                            data: UpdateProcedure,
                            course_service: CourseService = Depends(get_course_service)):
-    procedure = course_service.get_one_procedure_filter_by(id=id)
-    if not procedure:
-        raise HTTPException(status_code=404, detail={'status': Status.NOT_FOUND.value})
     updated_procedure = course_service.update_procedure(id=id, upd_procedure=data)
+    if not updated_procedure:
+        raise HTTPException(status_code=404, detail={'status': Status.NOT_FOUND.value})
     return updated_procedure
 
 @router.delete('/{id}', status_code=200)
 async def delete_procedure(id: int,
+                           version: int | None = Query(None),
                            course_service: CourseService = Depends(get_course_service)):
-    procedure = course_service.get_one_procedure_filter_by(id=id)
-    if not procedure:
+    if not course_service.delete_procedure(id=id, version=version):
         raise HTTPException(status_code=404, detail={'status': Status.NOT_FOUND.value})
-    course_service.delete_procedure(id=id)
     return {'status': Status.SUCCESS.value}
\ No newline at end of file
@@ -0,0 +1,37 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from datetime import date, datetime
+from dependencies import ReportService, JobService, get_report_service, get_job_service, get_current_admin
+from schemas.reports import *
+from utils.enums import Status
+
+router = APIRouter()
+
+@router.get('/occupancy', status_code=200)
+def get_occupancy(date_from: date = Query(...),
+                        date_to: date = Query(...),
+                        id_room: int | None = Query(None),
+                        report_service: ReportService = Depends(get_report_service),
+                        current_admin = Depends(get_current_admin)):
+    if date_from > date_to:
+        raise HTTPException(status_code=400, detail={'status': Status.FAILED.value})
+    rows = report_service.get_occupancy_all(date_from=date_from, date_to=date_to, id_room=id_room)
+    return [RoomOccupancyResponse(**row) for row in rows]
+
+@router.get('/revenue', status_code=200)
+def get_revenue(month_from: date = Query(...),
+                      month_to: date = Query(...),
+                      id_treatment_course: int | None = Query(None),
+                      report_service: ReportService = Depends(get_report_service),
+                      current_admin = Depends(get_current_admin)):
+    if month_from > month_to:
+        raise HTTPException(status_code=400, detail={'status': Status.FAILED.value})
+    rows = report_service.get_revenue_all(month_from=month_from, month_to=month_to,
+                                          id_treatment_course=id_treatment_course)
+    return [CourseRevenueResponse(**row) for row in rows]
+
+@router.post('/rebuild', status_code=202)
+async def rebuild_reports(job_service: JobService = Depends(get_job_service),
+                          current_admin = Depends(get_current_admin)):
+    # Пересчет идет в очереди задач; повторные запросы в ту же минуту не ставят второй
+    job = job_service.enqueue('reports.rebuild', key=f'reports.rebuild:{datetime.now():%Y%m%d%H%M}')
+    return {'status': Status.SUCCESS.value, 'id_job': job.id}
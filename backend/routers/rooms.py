@@ -2,6 +2,9 @@ from fastapi import APIRouter, Depends, HTTPException, Query
 from dependencies import RoomService, get_room_service
 from schemas.rooms import *
 from utils.enums import Status
+from utils.fields import parse_fields, load_fields, trim_schema
+from utils.filters import query_filters
+from models import Room
 
 router = APIRouter()
 
@@ -14,15 +17,20 @@ async def create_room(data: CreateRoom,
     return new_room
 
 @router.get('/', status_code=200)
-async def get_all_rooms(number: str | None = Query(None),
+def get_all_rooms(number: str | None = Query(None),
                         floor: int | None = Query(None),
                         capacity: int | None = Query(None),
+                        fields: str | None = Query(None),
+                        filters: dict = Depends(query_filters(Room)),
                         room_service: RoomService = Depends(get_room_service)):
-    filter = {k: v for k, v in locals().items() if v is not None and k != 'room_service'}
-    rooms = room_service.get_all_rooms_filter_by(**filter)
+    filter = {k: v for k, v in locals().items() if v is not None and k not in {'room_service', 'fields', 'filters'}}
+    filter.update(filters)
+    fields = parse_fields(RoomResponse, fields)
+    rooms = load_fields(room_service.get_all_rooms_filter_by(**filter), fields)
     if not rooms:
         raise HTTPException(status_code=404, detail={'status': Status.NOT_FOUND.value})
-    return [RoomResponse(**room.__dict__) for room in rooms]
+    response_model = trim_schema(RoomResponse, fields)
+    return [response_model(**room.__dict__) for room in rooms]
 
 @router.get('/{id}', status_code=200)
 async def get_one_room(id: int,
@@ -36,17 +44,15 @@ async def get_one_room(id: int,
 async def update_room(id: int,
                            data: UpdateRoom,
                            room_service: RoomService = Depends(get_room_service)):
-    room = room_service.get_one_room_filter_by(id=id)
-    if not room:
-        raise HTTPException(status_code=404, detail={'status': Status.NOT_FOUND.value})
     updated_room = room_service.update_room(id=id, upd_room=data)
+    if not updated_room:
+        raise HTTPException(status_code=404, detail={'status': Status.NOT_FOUND.value})
     return updated_room
 
 @router.delete('/{id}', status_code=200)
 async def delete_room(id: int,
+                           version: int | None = Query(None),
                            room_service: RoomService = Depends(get_room_service)):
-    room = room_service.get_one_room_filter_by(id=id)
-    if not room:
+    if not room_service.delete_room(id=id, version=version):
         raise HTTPException(status_code=404, detail={'status': Status.NOT_FOUND.value})
-    room_service.delete_room(id=id)
     return {'status': Status.SUCCESS.value}
\ No newline at end of file
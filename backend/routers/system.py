@@ -0,0 +1,28 @@
+from fastapi import APIRouter, Depends
+from dependencies import get_current_admin, load_monitor, single_flight, revocation_list, roster_index, contraindication_matrix, course_index
+
+router = APIRouter()
+
+@router.get('/load', status_code=200)
+async def get_load(current_admin = Depends(get_current_admin)):
+    return load_monitor.metrics()
+
+@router.get('/coalescing', status_code=200)
+async def get_coalescing(current_admin = Depends(get_current_admin)):
+    return single_flight.metrics()
+
+@router.get('/revocation', status_code=200)
+async def get_revocation(current_admin = Depends(get_current_admin)):
+    return revocation_list.metrics()
+
+@router.get('/roster', status_code=200)
+async def get_roster(current_admin = Depends(get_current_admin)):
+    return roster_index.metrics()
+
+@router.get('/contraindications', status_code=200)
+async def get_contraindications(current_admin = Depends(get_current_admin)):
+    return contraindication_matrix.metrics()
+
+@router.get('/courses', status_code=200)
+async def get_course_index(current_admin = Depends(get_current_admin)):
+    return course_index.metrics()
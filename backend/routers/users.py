@@ -2,11 +2,16 @@ from fastapi import APIRouter, Depends, HTTPException, Query
 from dependencies import (UserService, get_user_service, 
                           get_current_user, get_current_admin, 
                           ChildService, get_child_service,
-                          OrderService, get_order_service)
+                          OrderService, get_order_service,
+                          RosterService, get_roster_service)
 from schemas.users import *
 from utils.enums import AuthStatus, Roles, Status
 from schemas.childs import ShortChildResponse
 from schemas.orders import ShortOrderResponse
+from utils.fields import parse_fields, load_fields, trim_schema, wants
+from utils.filters import query_filters
+from models import Parent, Staff
+from datetime import datetime
 
 router = APIRouter()
 
@@ -25,7 +30,7 @@ async def get_me(user_service: UserService = Depends(get_user_service),
         childs = child_service.get_all_childs_filter_by(id_parent=parent.id)
         childs_resp = [ShortChildResponse(**child.__dict__).model_dump() for child in childs]
 
-        orders = order_service.get_all_orders_filter_by(id_parent=parent.id)
+        orders = order_service.get_order_history_filter_by(id_parent=parent.id)
         orders_resp = [ShortOrderResponse(**order.__dict__).model_dump() for order in orders]
 
         parent_dict = parent.__dict__
@@ -55,34 +60,37 @@ async def get_all_parents(id_user: int | None = Query(None),
                           phone: str | None = Query(None),
                           address: str | None = Query(None),
                           passport_data: str | None = Query(None),
+                          fields: str | None = Query(None),
+                          filters: dict = Depends(query_filters(Parent)),
                           user_service: UserService = Depends(get_user_service),
                           child_service: ChildService = Depends(get_child_service),
                           order_service: OrderService = Depends(get_order_service),
                           #current_admin = Depends(get_current_admin)
                           ):
     filter = {k: v for k, v in locals().items() if v is not None 
-              and k not in {'user_service', 'child_service', 'order_service', 'current_admin'}}
-    parents = user_service.get_all_parents_filter_by(**filter)
+              and k not in {'user_service', 'child_service', 'order_service', 'current_admin', 'fields', 'filters'}}
+    filter.update(filters)
+    fields = parse_fields(ParentResponse, fields)
+    parents = load_fields(user_service.get_all_parents_filter_by(**filter), fields, required=('id_user',))
     if not parents:
         raise HTTPException(status_code=404, detail={'status': Status.NOT_FOUND.value})
+    response_model = trim_schema(ParentResponse, fields)
     response = []
     for parent in parents:
-        user = user_service.get_user_filter_by(id=parent.id_user)
-        user_resp = UserResponse(**user.__dict__)
+        parent_dict = parent.__dict__
+        if wants(fields, 'user'):
+            user = user_service.get_user_filter_by(id=parent.id_user)
+            parent_dict['user'] = UserResponse(**user.__dict__)
 
-        childs = child_service.get_all_childs_filter_by(id_parent=parent.id)
-        childs_resp = [ShortChildResponse(**child.__dict__) for child in childs]
+        if wants(fields, 'childs'):
+            childs = child_service.get_all_childs_filter_by(id_parent=parent.id)
+            parent_dict['childs'] = [ShortChildResponse(**child.__dict__).model_dump() for child in childs]
         
-        orders = order_service.get_all_orders_filter_by(id_parent=parent.id)
-        orders_resp = [ShortOrderResponse(**order.__dict__) for order in orders]
+        if wants(fields, 'orders'):
+            orders = order_service.get_order_history_filter_by(id_parent=parent.id)
+            parent_dict['orders'] = [ShortOrderResponse(**order.__dict__).model_dump() for order in orders]
 
-        parent_dict = parent.__dict__
-        parent_dict.update({
-            'user': user_resp,
-            'childs': childs_resp,
-            'orders': orders_resp
-        })
-        response.append(ParentResponse(**parent_dict))
+        response.append(response_model(**parent_dict))
     return response
 
 @router.get('/parents/{id}', status_code=200)
@@ -99,7 +107,7 @@ async def get_one_parent(id: int,
     childs = child_service.get_all_childs_filter_by(id_parent=parent.id)
     childs_resp = [ShortChildResponse(**child.__dict__) for child in childs]
     
-    orders = order_service.get_all_orders_filter_by(id_parent=parent.id)
+    orders = order_service.get_order_history_filter_by(id_parent=parent.id)
     orders_resp = [ShortOrderResponse(**order.__dict__) for order in orders]
 
     parent_dict = parent.__dict__
@@ -119,21 +127,17 @@ async def get_one_parent(id: int,
 async def update_parent(id: int, 
                         data: UpdateParent,
                         user_service: UserService = Depends(get_user_service)):
-    parent = user_service.get_one_parent_filter_by(id=id)
-    if not parent:
-        raise HTTPException(status_code=404, detail={'status': Status.NOT_FOUND.value})
     updated_parent = user_service.update_parent(id=id, upd_parent=data)
+    if not updated_parent:
+        raise HTTPException(status_code=404, detail={'status': Status.NOT_FOUND.value})
     return updated_parent
 
 @router.delete('/parents/{id}', status_code=200)
 async def delete_parent(id: int, 
+                        version: int | None = Query(None),
                         user_service: UserService = Depends(get_user_service)):
-    parent = user_service.get_one_parent_filter_by(id=id)
-    if not parent:
+    if not user_service.delete_parent(id=id, version=version):
         raise HTTPException(status_code=404, detail={'status': Status.NOT_FOUND.value})
-    id_user = parent.id_user
-    deleted_parent = user_service.delete_parent(id=id)
-    deleted_user = user_service.delete_user(id=id_user)
     return Status.SUCCESS.value
 
 
@@ -141,28 +145,68 @@ async def delete_parent(id: int,
 @router.get('/staffs', status_code=200)
 async def get_all_staffs(id_user: int | None = Query(None),
                           name: str | None = Query(None),
-                          phone: str | None = Query(None),
-                          address: str | None = Query(None),
-                          passport_data: str | None = Query(None),
+                          position: str | None = Query(None),
+                          department: str | None = Query(None),
+                          fields: str | None = Query(None),
+                          filters: dict = Depends(query_filters(Staff)),
                           user_service: UserService = Depends(get_user_service),
                           #current_admin = Depends(get_current_admin)
                           ):
     filter = {k: v for k, v in locals().items() if v is not None 
-              and k not in {'user_service', 'current_admin'}}
-    staffs = user_service.get_all_staffs_filter_by(**filter)
+              and k not in {'user_service', 'current_admin', 'fields', 'filters'}}
+    filter.update(filters)
+    fields = parse_fields(StaffResponse, fields)
+    staffs = load_fields(user_service.get_all_staffs_filter_by(**filter), fields, required=('id_user',))
     if not staffs:
         raise HTTPException(status_code=404, detail={'status': Status.NOT_FOUND.value})
+    response_model = trim_schema(StaffResponse, fields)
     response = []
     for staff in staffs:
-        user = user_service.get_user_filter_by(id=staff.id_user)
-        user_resp = UserResponse(**user.__dict__)
         staff_dict = staff.__dict__
-        staff_dict.update({
-            'user': user_resp
-        })
-        response.append(StaffResponse(**staff_dict))
+        if wants(fields, 'user'):
+            user = user_service.get_user_filter_by(id=staff.id_user)
+            staff_dict['user'] = UserResponse(**user.__dict__)
+        response.append(response_model(**staff_dict))
     return response
 
+@router.get('/staffs/on-duty', status_code=200)
+def get_staffs_on_duty(at: datetime | None = Query(None),
+                       department: str | None = Query(None),
+                       roster_service: RosterService = Depends(get_roster_service)):
+    # Ответ из индекса смен в памяти; из БД читаются только найденные сотрудники по id
+    staffs = roster_service.on_duty(at or datetime.now(), department)
+    return [ShortStaffResponse(**staff.__dict__) for staff in staffs]
+
+@router.get('/staffs/{id}/shifts', status_code=200)
+async def get_staff_shifts(id: int,
+                           roster_service: RosterService = Depends(get_roster_service)):
+    return [StaffShiftResponse(**shift.__dict__) for shift in roster_service.get_shifts_filter_by(id_staff=id)]
+
+@router.post('/staffs/{id}/shifts', status_code=201)
+async def add_staff_shift(id: int,
+                          data: CreateStaffShift,
+                          roster_service: RosterService = Depends(get_roster_service),
+                          user_service: UserService = Depends(get_user_service),
+                          current_admin = Depends(get_current_admin)):
+    if not user_service.get_one_staff_filter_by(id=id):
+        raise HTTPException(status_code=404, detail={'status': Status.NOT_FOUND.value})
+    shift = roster_service.add_shift(id, data.model_dump())
+    return StaffShiftResponse(**shift.__dict__)
+
+@router.delete('/staffs/{id}/shifts', status_code=200)
+async def delete_staff_shifts(id: int,
+                              day: date | None = Query(None),
+                              weekday: int | None = Query(None, ge=0, le=6),
+                              roster_service: RosterService = Depends(get_roster_service),
+                              current_admin = Depends(get_current_admin)):
+    # Удаление по дате или дню недели, а не по id: на шардах у копий строк id могут различаться
+    if (day is None) == (weekday is None):
+        raise HTTPException(status_code=400, detail={'status': Status.FAILED.value})
+    filter = {'day': day} if day is not None else {'weekday': weekday}
+    if not roster_service.delete_shifts(id, **filter):
+        raise HTTPException(status_code=404, detail={'status': Status.NOT_FOUND.value})
+    return {'status': Status.SUCCESS.value}
+
 @router.get('/staffs/{id}', status_code=200)
 async def get_one_staff(id: int, 
                          user_service: UserService = Depends(get_user_service)):
@@ -181,19 +225,15 @@ async def get_one_staff(id: int,
 async def update_staff(id: int, 
                         data: UpdateStaff,
                         user_service: UserService = Depends(get_user_service)):
-    staff = user_service.get_one_staff_filter_by(id=id)
-    if not staff:
-        raise HTTPException(status_code=404, detail={'status': Status.NOT_FOUND.value})
     updated_staff = user_service.update_staff(id=id, upd_staff=data)
+    if not updated_staff:
+        raise HTTPException(status_code=404, detail={'status': Status.NOT_FOUND.value})
     return updated_staff
 
 @router.delete('/staffs/{id}', status_code=200)
 async def delete_staff(id: int, 
+                        version: int | None = Query(None),
                         user_service: UserService = Depends(get_user_service)):
-    staff = user_service.get_one_staff_filter_by(id=id)
-    if not staff:
+    if not user_service.delete_staff(id=id, version=version):
         raise HTTPException(status_code=404, detail={'status': Status.NOT_FOUND.value})
-    id_user = staff.id_user
-    deleted_staff = user_service.delete_staff(id=id)
-    deleted_user = user_service.delete_user(id=id_user)
     return Status.SUCCESS.value
\ No newline at end of file
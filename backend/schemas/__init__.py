@@ -3,4 +3,7 @@ from .courses import *
 from .diagnosis import *
 from .orders import *
 from .rooms import *
-from .users import *
\ No newline at end of file
+from .users import *
+from .reports import *
+from .jobs import *
+from .audit import *
\ No newline at end of file
@@ -0,0 +1,13 @@
+from pydantic import BaseModel
+from typing import Optional
+from datetime import datetime
+
+class AuditLogResponse(BaseModel):
+    id: int
+    created_at: datetime
+    id_user: Optional[int] = None
+    id_facility: Optional[int] = None
+    entity: str
+    entity_id: Optional[int] = None
+    action: str
+    changes: dict # {поле: [было, стало]}
@@ -33,6 +33,8 @@ class ShortChildResponse(BaseModel):
     disability: str
     vaccinations: str
     medical_note: str
+    id_facility: Optional[int] = None
+    version: int
 
 class ChildResponse(BaseModel): 
     id: int
@@ -47,6 +49,8 @@ class ChildResponse(BaseModel):
     vaccinations: str
     medical_note: str
     diagnoses: List[ChildDiagnosisResponse]
+    id_facility: Optional[int] = None
+    version: int
 
 class CreateChild(BaseModel):
     name: str
@@ -73,14 +77,18 @@ class UpdateChild(BaseModel):
     vaccinations: Optional[str] = None
     medical_note: Optional[str] = None
     diagnoses: Optional[List[ChildDiagnosisForm]] = None
+    version: Optional[int] = None
 
 
 class ProcedureRecordResponse(BaseModel):
     id: int
     child: ShortChildResponse
     procedure: ProcedureResponse
-    staff: ShortStaffResponse
+    staff: Optional[ShortStaffResponse] = None
     procedure_time: datetime
+    id_facility: Optional[int] = None
+    id_order: Optional[int] = None
+    version: int
 
 class CreateProcedureRecord(BaseModel):
     id_child: int
@@ -92,4 +100,5 @@ class UpdateProcedureRecord(BaseModel):
     id_procedure: Optional[int] = None
     id_staff: Optional[int] = None
     procedure_time: Optional[datetime] = None
+    version: Optional[int] = None
 
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field, field_validator, EmailStr
+from pydantic import BaseModel, Field, field_validator, model_validator, EmailStr
 import re
 from typing import Optional, List
 from datetime import date
@@ -11,6 +11,8 @@ class ProcedureResponse(BaseModel):
     contraindications: str
     frequency: str
     duration_min: int
+    department: Optional[str] = None
+    version: int
 
 class CreateProcedure(BaseModel):
     name: str
@@ -18,6 +20,7 @@ class CreateProcedure(BaseModel):
     contraindications: str
     frequency: str
     duration_min: int
+    department: Optional[str] = None
 
 class UpdateProcedure(BaseModel):
     name: Optional[str] = None
@@ -25,6 +28,8 @@ class UpdateProcedure(BaseModel):
     contraindications: Optional[str] = None
     frequency: Optional[str] = None
     duration_min: Optional[int] = None
+    department: Optional[str] = None
+    version: Optional[int] = None
 
 class ShortCourseResponse(BaseModel):
     id: int
@@ -32,6 +37,7 @@ class ShortCourseResponse(BaseModel):
     description: str
     price: float
     duration_days: int
+    version: int
     
 class TreatmentCourseResponse(BaseModel):
     id: int
@@ -41,6 +47,7 @@ class TreatmentCourseResponse(BaseModel):
     duration_days: int
     diagnosis: DiagnosisResponse
     procedures: List[ProcedureResponse]
+    version: int
     
 class CreateTreatmentCourse(BaseModel):
     name: str
@@ -57,8 +64,36 @@ class UpdateTreatmentCourse(BaseModel):
     duration_days: Optional[int] = None
     id_diagnosis: Optional[int] = None
     ids_procedures: Optional[List[int]] = None
+    version: Optional[int] = None
+
+
+class RecommendedCourseResponse(BaseModel):
+    course: ShortCourseResponse
+    ids_diagnoses: List[int] # Какие диагнозы ребенка покрывает курс
+    ids_procedures: List[int]
+    coverage: float
 
 
 class CourseProcedureForm(BaseModel):
     id_course: int
-    id_procedure: int
\ No newline at end of file
+    id_procedure: int
+
+
+class ContraindicationResponse(BaseModel):
+    id: int
+    id_procedure: int
+    id_diagnosis: Optional[int] = None
+    icd_prefix: Optional[str] = None
+    note: Optional[str] = None
+
+class CreateContraindication(BaseModel):
+    id_diagnosis: Optional[int] = None
+    icd_prefix: Optional[str] = Field(None, min_length=1, max_length=10)
+    note: Optional[str] = None
+
+    @model_validator(mode='after')
+    def check_target(self):
+        # Связь указывает либо на конкретный диагноз, либо на группу по префиксу МКБ
+        if (self.id_diagnosis is None) == (self.icd_prefix is None):
+            raise ValueError('Exactly one of id_diagnosis and icd_prefix is required')
+        return self
@@ -10,6 +10,7 @@ class DiagnosisResponse(BaseModel):
     description: str
     symptoms: str
     contraindications: str
+    version: int
 
 class CreateDiagnosis(BaseModel):
     name: str
@@ -23,4 +24,5 @@ class UpdateDiagnosis(BaseModel):
     icd_code: Optional[str] = None
     description: Optional[str] = None
     symptoms: Optional[str] = None
-    contraindications: Optional[str] = None
\ No newline at end of file
+    contraindications: Optional[str] = None
+    version: Optional[int] = None
\ No newline at end of file
@@ -0,0 +1,16 @@
+from pydantic import BaseModel
+from typing import Optional
+from datetime import datetime
+
+class JobResponse(BaseModel):
+    id: int
+    type: str
+    payload: dict
+    status: str
+    attempts: int
+    max_attempts: int
+    run_at: datetime
+    locked_until: Optional[datetime] = None
+    last_error: Optional[str] = None
+    created_at: datetime
+    finished_at: Optional[datetime] = None
@@ -17,6 +17,8 @@ class ShortOrderResponse(BaseModel):
     check_in_date: date
     check_out_date: date
     price: float
+    id_facility: Optional[int] = None
+    version: int
  
 class OrderResponse(BaseModel):
     id: int
@@ -28,6 +30,8 @@ class OrderResponse(BaseModel):
     check_in_date: date
     check_out_date: date
     price: float
+    id_facility: Optional[int] = None
+    version: int
 
 class CreateOrder(BaseModel):
     id_child: int
@@ -42,4 +46,5 @@ class UpdateOrder(BaseModel):
     status: Optional[OrderStatus] = None
     check_in_date: Optional[date] = None
     check_out_date: Optional[date] = None
-    price: Optional[float] = None
\ No newline at end of file
+    price: Optional[float] = None
+    version: Optional[int] = None
\ No newline at end of file
@@ -0,0 +1,15 @@
+from pydantic import BaseModel
+from typing import Optional
+from datetime import date
+
+class RoomOccupancyResponse(BaseModel):
+    day: date
+    id_room: int
+    guests: int
+    shard: Optional[str] = None # Номера разных шардов могут иметь одинаковые id
+
+class CourseRevenueResponse(BaseModel):
+    month: date
+    id_treatment_course: int
+    orders_count: int
+    revenue: float
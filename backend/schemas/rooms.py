@@ -9,6 +9,8 @@ class RoomResponse(BaseModel):
     floor: int
     capacity: int
     description: str
+    id_facility: Optional[int] = None
+    version: int
 
 class CreateRoom(BaseModel):
     number: str
@@ -21,3 +23,4 @@ class UpdateRoom(BaseModel):
     floor: Optional[int] = None
     capacity: Optional[int] = None
     description: Optional[str] = None
+    version: Optional[int] = None
@@ -1,7 +1,7 @@
-from pydantic import BaseModel, Field, field_validator, EmailStr
+from pydantic import BaseModel, Field, field_validator, model_validator, EmailStr
 import re
 from typing import Optional, List
-from datetime import date
+from datetime import date, time
 from utils.enums import *
 
 class ShortChildResponse(BaseModel):
@@ -15,6 +15,7 @@ class ShortChildResponse(BaseModel):
     disability: str
     vaccinations: str
     medical_note: str
+    version: int
 
 
 class ShortOrderResponse(BaseModel):
@@ -26,12 +27,14 @@ class ShortOrderResponse(BaseModel):
     check_in_date: date
     check_out_date: date
     price: float
+    version: int
 
 
 class UserCreate(BaseModel):
     role: str
     email: EmailStr
     password: str
+    id_home_facility: Optional[int] = None
 
     @field_validator('email')
     @classmethod
@@ -71,6 +74,7 @@ class UserStaffCreate(BaseModel):
     role: Optional[str] = Roles.ADMIN.value
     email: EmailStr
     password: str
+    id_home_facility: Optional[int] = None
     staff: 'CreateStaff'
 
     @field_validator('email')
@@ -143,6 +147,7 @@ class ShortStaffResponse(BaseModel):
     hire_date: date
     department: str
     schedule: str
+    version: int
 
 class StaffResponse(BaseModel):
     id: int
@@ -153,6 +158,7 @@ class StaffResponse(BaseModel):
     hire_date: date
     department: str
     schedule: str
+    version: int
 
 class CreateStaff(BaseModel):
     name: str
@@ -169,6 +175,7 @@ class UpdateStaff(BaseModel):
     hire_date: Optional[date] = None
     department: Optional[str] = None
     schedule: Optional[str] = None
+    version: Optional[int] = None
 
 
 class ShortParentResponse(BaseModel):
@@ -178,6 +185,7 @@ class ShortParentResponse(BaseModel):
     phone: str
     address: str
     passport_data: str
+    version: int
 
 class ParentResponse(BaseModel):
     id: int
@@ -188,6 +196,7 @@ class ParentResponse(BaseModel):
     passport_data: str
     childs: List['ShortChildResponse']
     orders: List['ShortOrderResponse']
+    version: int
 
 class CreateParent(BaseModel):
     name: str
@@ -200,6 +209,7 @@ class UpdateParent(BaseModel):
     phone: Optional[str] = None
     address: Optional[str] = None
     passport_data: Optional[str] = None
+    version: Optional[int] = None
     
 
 class CreateModelParent(BaseModel):
@@ -216,4 +226,29 @@ class CreateModelStaff(BaseModel):
     qualification: str 
     hire_date: date    
     department: str    
-    schedule: str
\ No newline at end of file
+    schedule: str
+
+class StaffShiftResponse(BaseModel):
+    id: int
+    id_staff: int
+    weekday: Optional[int] = None
+    day: Optional[date] = None
+    start_time: Optional[time] = None
+    end_time: Optional[time] = None
+
+class CreateStaffShift(BaseModel):
+    weekday: Optional[int] = Field(None, ge=0, le=6)
+    day: Optional[date] = None
+    start_time: Optional[time] = None
+    end_time: Optional[time] = None
+
+    @model_validator(mode='after')
+    def validate_shift(self):
+        # Либо день недели со временем, либо дата (без времени - выходной)
+        if (self.weekday is None) == (self.day is None):
+            raise ValueError('Exactly one of weekday and day is required')
+        if (self.start_time is None) != (self.end_time is None):
+            raise ValueError('start_time and end_time go together')
+        if self.weekday is not None and self.start_time is None:
+            raise ValueError('Weekly shift needs start_time and end_time')
+        return self
@@ -5,4 +5,14 @@ from .courses import CourseService
 from .diagnosis import DiagnosisService
 from .orders import OrderService
 from .rooms import RoomService
-from .procedure_records import ProcedureRecordService
\ No newline at end of file
+from .procedure_records import ProcedureRecordService
+from .reports import ReportService
+from .jobs import JobService
+from .child_reports import ChildReportService
+from .archive import ArchiveService
+from .audit import AuditService
+from .plans import PlanService
+from .assignment import AssignmentService
+from .roster import RosterService
+from .contraindications import ContraindicationService
+from .recommendations import RecommendationService
\ No newline at end of file
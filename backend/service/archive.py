@@ -0,0 +1,49 @@
+import logging
+from crud.orders import OrderRepository
+from crud.procedure_records import ProcedureRecordRepository
+from crud.archive import ArchiveRepository
+from models import Order, ProcedureRecord, OrderArchive, ProcedureRecordArchive
+from utils.archive import ARCHIVED_ORDER_STATUSES, horizon
+from utils.sharding import fan_out
+
+logger = logging.getLogger('uvicorn.error')
+
+
+class ArchiveService:
+    def __init__(self, order_repository: OrderRepository,
+                 order_archive_repository: ArchiveRepository,
+                 procedure_record_repository: ProcedureRecordRepository,
+                 procedure_record_archive_repository: ArchiveRepository):
+        self.order_repository=order_repository
+        self.order_archive_repository=order_archive_repository
+        self.procedure_record_repository=procedure_record_repository
+        self.procedure_record_archive_repository=procedure_record_archive_repository
+
+    @classmethod
+    def for_session(cls, session):
+        return cls(order_repository=OrderRepository(model=Order, session=session),
+                   order_archive_repository=ArchiveRepository(model=OrderArchive, session=session),
+                   procedure_record_repository=ProcedureRecordRepository(model=ProcedureRecord, session=session),
+                   procedure_record_archive_repository=ArchiveRepository(model=ProcedureRecordArchive, session=session))
+
+    def run(self, orders_after_days: int, records_after_days: int, batch_size: int, max_batches: int) -> dict:
+        # Каждая пачка - отдельная короткая транзакция, чтобы не держать блокировки на горячих таблицах
+        moved = {'orders': 0, 'procedure_records': 0}
+        jobs = [('orders', self.order_repository, self.order_archive_repository,
+                 {'status__in': list(ARCHIVED_ORDER_STATUSES), 'check_out_date__lt': horizon(orders_after_days)}),
+                ('procedure_records', self.procedure_record_repository, self.procedure_record_archive_repository,
+                 {'procedure_time__lt': horizon(records_after_days)})]
+        batches = 0
+        for name, repository, archive_repository, filters in jobs:
+            while batches < max_batches:
+                count = repository.move_to(archive_repository.model, filters, batch_size)
+                batches += 1
+                moved[name] += count
+                if count < batch_size:
+                    break
+        moved['done'] = batches < max_batches
+        return moved
+
+    def run_all(self, *args) -> dict:
+        results = fan_out(self.order_repository.session, lambda session: ArchiveService.for_session(session).run(*args))
+        return {'shards': results, 'done': all(result['done'] for result in results.values())}
@@ -0,0 +1,89 @@
+import time
+from datetime import date, datetime, timedelta
+from sqlalchemy.orm import joinedload
+from crud.procedure_records import ProcedureRecordRepository
+from service.roster import RosterService
+from models import ProcedureRecord
+from utils.assignment import Assignment, Slot, Worker
+from utils.recurrence import parse_schedule
+from config.assignment import ASSIGN_SEARCH_BUDGET
+from config.plans import PLAN_DAY_START, PLAN_DAY_END
+
+
+def minutes(value) -> int:
+    return value.hour * 60 + value.minute
+
+
+class AssignmentService:
+    def __init__(self, procedure_record_repository: ProcedureRecordRepository,
+                 roster_service: RosterService):
+        self.procedure_record_repository=procedure_record_repository
+        self.roster_service=roster_service
+
+    def workers(self, day: date, unrostered: list[int], unparsed: list[int]) -> list[Worker]:
+        # Смены дня из индекса дежурств, обрезанные по границам суток
+        start = datetime.combine(day, datetime.min.time())
+        index = self.roster_service.day_index(day)
+        departments = {shift.id_staff: shift.department for shift in index.shifts}
+        workers = []
+        for id_staff, shifts in index.windows().items():
+            windows = [(max(int((begin - start).total_seconds()) // 60, 0),
+                        min(int((end - start).total_seconds()) // 60, 24 * 60)) for begin, end in shifts]
+            workers.append(Worker(id=id_staff, group=departments[id_staff], windows=sorted(windows)))
+        # У сотрудника нет строк в staff_shifts: окна берутся из текста Staff.schedule, как до графика дежурств
+        for staff in self.roster_service.unrostered():
+            unrostered.append(staff.id)
+            schedule = parse_schedule(staff.schedule)
+            if schedule is None:
+                # Нераспознанный график: считаем сотрудника доступным в окне процедур, но сообщаем о нем
+                unparsed.append(staff.id)
+                windows = [(minutes(PLAN_DAY_START), minutes(PLAN_DAY_END))]
+            else:
+                # Ночная смена (20-8) учитывается до полуночи
+                windows = [(minutes(start), minutes(end) if end > start else 24 * 60)
+                           for start, end in schedule.get(day.weekday(), ())]
+            if windows:
+                workers.append(Worker(id=staff.id, group=staff.department, windows=windows))
+        return workers
+
+    def assign_day(self, day: date, dry_run: bool = True) -> dict:
+        started = time.perf_counter()
+        unrostered, unparsed = [], []
+        workers = {worker.id: worker for worker in self.workers(day, unrostered, unparsed)}
+        records = self.procedure_record_repository.get_all_filter_by(
+            procedure_time__gte=datetime.combine(day, datetime.min.time()),
+            procedure_time__lt=datetime.combine(day + timedelta(days=1), datetime.min.time())) \
+            .options(joinedload(ProcedureRecord.procedure))
+        slots = []
+        for record in records:
+            start = minutes(record.procedure_time)
+            end = min(start + (record.procedure.duration_min or 0), 24 * 60)
+            if record.id_staff is None:
+                slots.append(Slot(id=record.id, start=start, end=end, group=record.procedure.department))
+            elif record.id_staff in workers:
+                # Уже назначенные записи занимают время сотрудника и входят в его нагрузку
+                workers[record.id_staff].book(start, end)
+        assignment = Assignment(slots, list(workers.values()))
+        result = assignment.solve(ASSIGN_SEARCH_BUDGET)
+        if not dry_run and result:
+            by_staff = {}
+            for id, id_staff in result.items():
+                by_staff.setdefault(id_staff, []).append(id)
+            for id_staff, ids in by_staff.items():
+                # id_staff IS NULL в условии: записи, назначенные вручную за это время, не перезаписываются
+                self.procedure_record_repository.update_by_filter(
+                    {'id__in': ids, 'id_staff': None},
+                    {'id_staff': id_staff, 'version': ProcedureRecord.version + 1}, commit=False)
+            self.procedure_record_repository.session.commit()
+        return {
+            'date': day,
+            'dry_run': dry_run,
+            'slots': len(slots),
+            'assigned': len(result),
+            'unassigned': sorted(assignment.unassigned),
+            'unrostered': unrostered,
+            'unparsed_schedules': unparsed,
+            'loads': {worker.id: worker.load for worker in workers.values()},
+            'assignments': [{'id': id, 'id_staff': id_staff} for id, id_staff in sorted(result.items())],
+            'elapsed_ms': round((time.perf_counter() - started) * 1000, 1),
+        }
@@ -0,0 +1,11 @@
+from crud.audit import AuditRepository
+from models.audit import AuditLog
+
+class AuditService:
+    def __init__(self, audit_repository: AuditRepository):
+        self.audit_repository=audit_repository
+
+    def get_entries(self, limit: int, **filter):
+        # Каждый набор фильтров покрывается своим индексом: сущность, пользователь или период
+        return self.audit_repository.get_all_filter_by(**filter) \
+            .order_by(AuditLog.created_at.desc(), AuditLog.id.desc()).limit(limit).all()
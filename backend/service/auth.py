@@ -1,18 +1,24 @@
 from fastapi import HTTPException
-from utils.enums import AuthStatus
+from utils.enums import AuthStatus, RevocationReason
 from passlib.hash import pbkdf2_sha256
 from datetime import datetime, timedelta
 import jwt
+import uuid
 from config.auth import SECRET_KEY, ALGORITHM, UPDATE_EXPIRATION_TIME, EXPIRATION_TIME
 from crud.users import UserRepository
+from crud.tokens import TokenRepository
+from utils.revocation import RevocationList
 from schemas.users import UserCreate, User, UserLogin
 from dotenv import load_dotenv
 
 load_dotenv()
 
 class AuthService:
-    def __init__(self, user_repository: UserRepository):
+    def __init__(self, user_repository: UserRepository, token_repository: TokenRepository,
+                 revocation_list: RevocationList):
         self.user_repository = user_repository
+        self.token_repository = token_repository
+        self.revocation_list = revocation_list
 
     def create_user(self, user: UserCreate):
         user.password = pbkdf2_sha256.hash(user.password)
@@ -23,8 +29,12 @@ class AuthService:
         return self.user_repository.get_one_filter_by(**filter_by)
 
 
-    def gen_token(self, user: User):
-        payload = {"sub": user.id, "exp": datetime.now() + EXPIRATION_TIME, 'role': user.role}
+    def gen_token(self, user: User, family: str):
+        # fam - id сессии входа: после выхода отклоняются и ее access-токены
+        payload = {"sub": user.id, "exp": datetime.now() + EXPIRATION_TIME, 'role': user.role, 'fam': family}
+        # fac - филиал сотрудника: запросы с таким токеном видят только его, X-Facility не переопределяет
+        if user.id_home_facility is not None:
+            payload['fac'] = user.id_home_facility
         return jwt.encode(payload, SECRET_KEY, algorithm='HS256')
     
     def decode_token(self, token):
@@ -37,16 +47,40 @@ class AuthService:
         except jwt.InvalidTokenError:
             raise HTTPException(status_code=401, detail={'status': AuthStatus.INVALID_TOKEN.value})
 
+    def is_revoked(self, key: str) -> bool:
+        return self.revocation_list.is_revoked(
+            key, lambda jti: self.token_repository.get_one_filter_by(jti=jti) is not None)
+
+    def revoke(self, keys: list[str], id_user: int | None, reason: RevocationReason):
+        # Вставка без ошибки на дубликат; число вставленных строк показывает, был ли ключ уже отозван
+        now = datetime.now()
+        inserted = self.token_repository.add_ignore([
+            {'jti': key, 'id_user': id_user, 'reason': reason.value, 'revoked_at': now,
+             'expires_at': now + UPDATE_EXPIRATION_TIME} for key in keys])
+        self.revocation_list.add(keys)
+        return inserted
+
     def get_user_by_token(self, token: str):
         payload = self.decode_token(token)
+        if 'fam' in payload and self.is_revoked(payload['fam']):
+            raise HTTPException(status_code=401, detail={'status': AuthStatus.TOKEN_REVOKED.value})
         user = self.get_user_filter_by(id=payload['sub'])
         if not user:
             raise HTTPException(status_code=401, detail={'status': AuthStatus.USER_NOT_FOUND.value})
         return user
     
-    def gen_update_token(self, user: User):
-        payload = {"sub": user.id, "exp": datetime.now() + UPDATE_EXPIRATION_TIME}
+    def gen_update_token(self, user: User, family: str):
+        payload = {"sub": user.id, "exp": datetime.now() + UPDATE_EXPIRATION_TIME,
+                   'jti': uuid.uuid4().hex, 'fam': family}
         return jwt.encode(payload, SECRET_KEY, algorithm='HS256')
+
+    def issue_tokens(self, user: User, family: str | None = None):
+        family = family or uuid.uuid4().hex
+        return {
+            'access_token': self.gen_token(user, family),
+            'token_type': 'bearer',
+            'expires': EXPIRATION_TIME.total_seconds()
+        }, self.gen_update_token(user, family)
     
     def login(self, user_login: UserLogin):
         user = self.get_user_filter_by(email=user_login.email)
@@ -54,21 +88,35 @@ class AuthService:
             raise HTTPException(status_code=401, detail={'status': AuthStatus.INVALID_EMAIL_OR_PASSWORD.value})
         if not pbkdf2_sha256.verify(user_login.password, user.password):
             raise HTTPException(status_code=401, detail={'status': AuthStatus.INVALID_EMAIL_OR_PASSWORD.value})
-        token = self.gen_token(user)
-        return {
-            'access_token': token,
-            'token_type': 'bearer',
-            'expires': EXPIRATION_TIME.total_seconds()
-        }, self.gen_update_token(user)
+        return self.issue_tokens(user)
 
     def refresh_token(self, token: str):
+        # Каждый refresh-токен действует один раз: при обновлении его jti отзывается, а новый
+        # получает тот же fam. Повторное предъявление уже использованного токена означает
+        # утечку, и тогда отзывается вся сессия - и у злоумышленника, и у владельца
         payload = self.decode_token(token)
+        if 'jti' not in payload or 'fam' not in payload:
+            raise HTTPException(status_code=401, detail={'status': AuthStatus.INVALID_TOKEN.value})
+        if self.is_revoked(payload['fam']):
+            raise HTTPException(status_code=401, detail={'status': AuthStatus.TOKEN_REVOKED.value})
         user = self.get_user_filter_by(id=payload['sub'])
         if not user:
             raise HTTPException(status_code=401, detail={'status': AuthStatus.USER_NOT_FOUND.value})
-        token = self.gen_token(user)
-        return {
-            'access_token': token,
-            'token_type': 'bearer',
-            'expires': EXPIRATION_TIME.total_seconds()
-        }, self.gen_update_token(user)
\ No newline at end of file
+        if not self.revoke([payload['jti']], user.id, RevocationReason.ROTATED):
+            self.revoke([payload['fam']], user.id, RevocationReason.REUSED)
+            raise HTTPException(status_code=401, detail={'status': AuthStatus.TOKEN_REUSED.value})
+        return self.issue_tokens(user, payload['fam'])
+
+    def logout(self, *tokens: str | None):
+        # Отзываются сессии access- и refresh-токена; битые и истекшие токены пропускаются
+        families = {}
+        for token in tokens:
+            try:
+                payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM], options={'verify_sub': False})
+            except (jwt.InvalidTokenError, TypeError):
+                continue
+            if 'fam' in payload:
+                families[payload['fam']] = payload['sub']
+        for family, id_user in families.items():
+            self.revoke([family], id_user, RevocationReason.LOGOUT)
+        return len(families)
\ No newline at end of file
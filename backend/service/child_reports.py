@@ -0,0 +1,91 @@
+from datetime import date
+from crud.childs import ChildRepository
+from crud.orders import OrderRepository
+from crud.procedure_records import ProcedureRecordRepository
+from crud.archive import ArchiveRepository
+from models import (Child, Parent, ChildDiagnosis, Diagnosis, ProcedureRecord, Procedure, Staff, Order, TreatmentCourse, Room,
+                    ProcedureRecordArchive, OrderArchive)
+from utils.documents import DocumentRenderer
+from utils.enums import OrderStatus
+
+CHILD_FIELDS = ('name', 'birth_date', 'gender', 'height', 'weight', 'blood', 'disability', 'vaccinations', 'medical_note')
+
+class ChildReportService:
+    def __init__(self, child_repository: ChildRepository,
+                 child_diagnosis_repository: ChildRepository,
+                 procedure_record_repository: ProcedureRecordRepository,
+                 order_repository: OrderRepository,
+                 procedure_record_archive_repository: ArchiveRepository,
+                 order_archive_repository: ArchiveRepository,
+                 renderer: DocumentRenderer):
+        self.child_repository=child_repository
+        self.child_diagnosis_repository=child_diagnosis_repository
+        self.procedure_record_repository=procedure_record_repository
+        self.order_repository=order_repository
+        self.procedure_record_archive_repository=procedure_record_archive_repository
+        self.order_archive_repository=order_archive_repository
+        self.renderer=renderer
+
+    def gather(self, ids: list[int]) -> dict[int, dict]:
+        # Шесть запросов на любое число детей: карточки, диагнозы, процедуры и заказы - рабочие
+        # таблицы и архив, иначе из выписки пропадала бы история старше срока переноса в архив
+        reports = {}
+        children = self.child_repository.get_all_filter_by(id__in=ids) \
+            .join(Parent, Child.id_parent == Parent.id) \
+            .with_entities(Child, Parent.id_user, Parent.name, Parent.phone)
+        for child, id_user, parent_name, parent_phone in children:
+            reports[child.id] = {
+                'id_user': id_user,
+                'child': {field: getattr(child, field) for field in CHILD_FIELDS},
+                'parent': {'name': parent_name, 'phone': parent_phone},
+                'diagnoses': [], 'procedures': [], 'orders': [],
+                'generated': date.today(),
+            }
+        if not reports:
+            return reports
+        ids = list(reports)
+
+        diagnoses = self.child_diagnosis_repository.get_all_filter_by(id_child__in=ids) \
+            .join(Diagnosis, ChildDiagnosis.id_diagnosis == Diagnosis.id) \
+            .order_by(ChildDiagnosis.date_diagnosis) \
+            .with_entities(ChildDiagnosis.id_child, ChildDiagnosis.date_diagnosis, ChildDiagnosis.doctor,
+                           ChildDiagnosis.notes, Diagnosis.name, Diagnosis.icd_code)
+        for row in diagnoses:
+            reports[row.id_child]['diagnoses'].append(row._asdict())
+
+        for repository, model in ((self.procedure_record_archive_repository, ProcedureRecordArchive),
+                                  (self.procedure_record_repository, ProcedureRecord)):
+            records = repository.get_all_filter_by(id_child__in=ids) \
+                .join(Procedure, model.id_procedure == Procedure.id) \
+                .outerjoin(Staff, model.id_staff == Staff.id) \
+                .order_by(model.procedure_time) \
+                .with_entities(model.id_child, model.procedure_time,
+                               Procedure.name.label('procedure'), Procedure.duration_min,
+                               Staff.name.label('staff'), Staff.position)
+            for row in records:
+                reports[row.id_child]['procedures'].append(row._asdict())
+
+        for repository, model in ((self.order_archive_repository, OrderArchive), (self.order_repository, Order)):
+            orders = repository.get_all_filter_by(id_child__in=ids) \
+                .join(TreatmentCourse, model.id_treatment_course == TreatmentCourse.id) \
+                .join(Room, model.id_room == Room.id) \
+                .order_by(model.check_in_date) \
+                .with_entities(model.id_child, model.check_in_date, model.check_out_date, model.status,
+                               TreatmentCourse.name.label('course'), Room.number.label('room'))
+            for row in orders:
+                reports[row.id_child]['orders'].append(row._asdict())
+        # Строки из двух таблиц: общий хронологический порядок
+        for report in reports.values():
+            report['procedures'].sort(key=lambda row: row['procedure_time'])
+            report['orders'].sort(key=lambda row: row['check_in_date'])
+        return reports
+
+    def checking_out(self, check_out_date: date) -> list[int]:
+        orders = self.order_repository.get_all_filter_by(check_out_date=check_out_date,
+                                                         status__ne=OrderStatus.CANCELLED.value)
+        return sorted({id_child for id_child, in orders.with_entities(Order.id_child)})
+
+    async def render(self, id: int, data: dict, format: str) -> tuple[bytes, str]:
+        # id_user нужен только для проверки доступа и в документ не попадает
+        data = {k: v for k, v in data.items() if k != 'id_user'}
+        return await self.renderer.render(('child_report', id), format, 'child_report.html', data)
@@ -2,12 +2,17 @@ from fastapi import HTTPException
 from schemas.childs import *
 from crud.childs import *
 from utils.enums import Status
+from service.reports import ReportService
+from utils.audit import audit_cascade
+from config.audit import AUDIT_ENABLED, AUDIT_TABLES
 
 class ChildService:
     def __init__(self, child_repository: ChildRepository,
-                 child_diagnosis_repository: ChildRepository):
+                 child_diagnosis_repository: ChildRepository,
+                 report_service: ReportService):
         self.child_repository=child_repository
         self.child_diagnosis_repository=child_diagnosis_repository
+        self.report_service=report_service
 
     def get_all_child_diagnosis_filter_by(self, **filter):
         return self.child_diagnosis_repository.get_all_filter_by(**filter)
@@ -31,30 +36,54 @@ class ChildService:
             raise HTTPException(status_code=400, detail={'status': Status.FAILED.value})
         
         for diagnosis in diagnoses:
+            diagnosis.pop('id', None)
             diagnosis['id_child'] = created_child.id
-            created_diagnosis = self.child_diagnosis_repository.add(diagnosis)
-            if not created_diagnosis:
-                raise HTTPException(status_code=400, detail={'status': Status.FAILED.value})
+        self.child_diagnosis_repository.add_all(diagnoses)
         return created_child
+
+    def _sync_diagnoses(self, id: int, diagnoses: list[dict]):
+        # Список диагнозов ребенка приводится к присланному: SELECT, DELETE, upsert и INSERT
+        # независимо от числа строк, без коммита
+        model = self.child_diagnosis_repository.model
+        current = {row.id for row in
+                   self.child_diagnosis_repository.get_all_filter_by(id_child=id).with_entities(model.id)}
+        changed, new = [], []
+        for diagnosis in diagnoses:
+            diagnosis['id_child'] = id
+            if diagnosis.get('id') in current:
+                changed.append(diagnosis)
+            else:
+                diagnosis.pop('id', None)
+                new.append(diagnosis)
+
+        query = self.child_diagnosis_repository.get_all_filter_by(id_child=id)
+        kept = [diagnosis['id'] for diagnosis in changed]
+        if kept:
+            query = query.filter(model.id.not_in(kept))
+        query.delete(synchronize_session=False)
+        self.child_diagnosis_repository.upsert(changed, commit=False)
+        self.child_diagnosis_repository.add_all(new, commit=False)
     
     def update_child(self, id: int, upd_data: UpdateChild):
         entity = upd_data.model_dump()
         entity['id'] = id
         
-        diagnoses = entity.pop('diagnoses', []) or []
+        diagnoses = entity.pop('diagnoses', None)
 
         entity = {k: v for k, v in entity.items() if v is not None}
-        updated_child = self.child_repository.update(entity)
+        updated_child = self.child_repository.update(entity, commit=False)
+        if not updated_child:
+            return None
         
-        if diagnoses:
-            for diagnosis in diagnoses:
-                diagnosis['id_child'] = id
-                if diagnosis.get('id') is not None:
-                    updated_diagnosis = self.child_diagnosis_repository.update(diagnosis)
-                else:
-                    created_diagnosis = self.child_diagnosis_repository.add(diagnosis)
+        if diagnoses is not None:
+            self._sync_diagnoses(id, diagnoses)
+        self.child_repository.session.commit()
         return updated_child
     
-    def delete_child(self, id: int):
-        self.child_diagnosis_repository.delete_by_filter(id_child=id)
-        return self.child_repository.delete(id=id)
\ No newline at end of file
+    def delete_child(self, id: int, version: int | None = None):
+        # Диагнозы, процедуры и заказы удаляются каскадом в БД; дельта отчетов - в той же транзакции
+        self.report_service.discard_orders(id_child=id)
+        if AUDIT_ENABLED:
+            childs = self.child_repository.model.__table__
+            audit_cascade(self.child_repository.session, childs, childs.c.id == id, AUDIT_TABLES)
+        return self.child_repository.delete(id=id, version=version)
\ No newline at end of file
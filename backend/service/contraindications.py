@@ -0,0 +1,88 @@
+from crud.contraindications import ContraindicationRepository
+from crud.diagnosis import DiagnosisRepository
+from crud.courses import CourseRepository
+from crud.childs import ChildRepository
+from sqlalchemy import func
+from models import Contraindication, Diagnosis, CourseProcedure, ChildDiagnosis
+from utils.contraindications import ContraindicationMatrix, CompiledMatrix, normalize_icd
+
+
+class ContraindicationService:
+    def __init__(self, contraindication_repository: ContraindicationRepository,
+                 diagnosis_repository: DiagnosisRepository,
+                 course_procedure_repository: CourseRepository,
+                 child_diagnosis_repository: ChildRepository,
+                 contraindication_matrix: ContraindicationMatrix):
+        self.contraindication_repository=contraindication_repository
+        self.diagnosis_repository=diagnosis_repository
+        self.course_procedure_repository=course_procedure_repository
+        self.child_diagnosis_repository=child_diagnosis_repository
+        self.contraindication_matrix=contraindication_matrix
+
+    @classmethod
+    def for_session(cls, session, contraindication_matrix: ContraindicationMatrix):
+        return cls(contraindication_repository=ContraindicationRepository(model=Contraindication, session=session),
+                   diagnosis_repository=DiagnosisRepository(model=Diagnosis, session=session),
+                   course_procedure_repository=CourseRepository(model=CourseProcedure, session=session),
+                   child_diagnosis_repository=ChildRepository(model=ChildDiagnosis, session=session),
+                   contraindication_matrix=contraindication_matrix)
+
+    def get_contraindications_filter_by(self, **filter):
+        return self.contraindication_repository.get_all_filter_by(**filter).order_by(Contraindication.id)
+
+    def create_contraindication(self, id_procedure: int, new_link: dict):
+        if new_link.get('icd_prefix') is not None:
+            new_link['icd_prefix'] = normalize_icd(new_link['icd_prefix'])
+        created = self.contraindication_repository.add({**new_link, 'id_procedure': id_procedure})
+        self.contraindication_matrix.invalidate()
+        return created
+
+    def delete_contraindications(self, id_procedure: int, **filter) -> bool:
+        if filter.get('icd_prefix') is not None:
+            filter['icd_prefix'] = normalize_icd(filter['icd_prefix'])
+        deleted = self.contraindication_repository.delete_by_filter(id_procedure=id_procedure, **filter)
+        self.contraindication_matrix.invalidate()
+        return deleted
+
+    def load(self) -> tuple:
+        # Три узких запроса по справочникам; вызывается только при пересборке матрицы
+        diagnoses = self.diagnosis_repository.get_all_filter_by().with_entities(Diagnosis.id, Diagnosis.icd_code).all()
+        links = self.contraindication_repository.get_all_filter_by() \
+            .with_entities(Contraindication.id_procedure, Contraindication.id_diagnosis, Contraindication.icd_prefix).all()
+        course_procedures = self.course_procedure_repository.get_all_filter_by() \
+            .with_entities(CourseProcedure.id_course, CourseProcedure.id_procedure).all()
+        return diagnoses, links, course_procedures
+
+    def stamp(self) -> tuple:
+        # Дешевая проверка, не изменились ли справочники на другом воркере: агрегаты без выборки строк
+        return (tuple(self.diagnosis_repository.get_all_filter_by()
+                      .with_entities(func.count(), func.max(Diagnosis.id), func.sum(Diagnosis.version)).one()),
+                tuple(self.contraindication_repository.get_all_filter_by()
+                      .with_entities(func.count(), func.max(Contraindication.id)).one()),
+                tuple(self.course_procedure_repository.get_all_filter_by()
+                      .with_entities(func.count(), func.sum(CourseProcedure.id_course * CourseProcedure.id_procedure)).one()))
+
+    def matrix(self) -> CompiledMatrix:
+        return self.contraindication_matrix.get(self.load, self.stamp)
+
+    def child_masks(self, ids_children, matrix: CompiledMatrix) -> dict[int, int]:
+        # Диагнозы всех детей пачки одним запросом. Маски считаются по той же матрице, с которой их
+        # потом сравнивают: номера бит в каждой сборке свои
+        ids_children = list(set(ids_children))
+        if not ids_children:
+            return {}
+        rows = self.child_diagnosis_repository.get_all_filter_by(id_child__in=ids_children) \
+            .with_entities(ChildDiagnosis.id_child, ChildDiagnosis.id_diagnosis)
+        masks = dict.fromkeys(ids_children, 0)
+        for id_child, id_diagnosis in rows:
+            masks[id_child] |= matrix.mask((id_diagnosis,))
+        return masks
+
+    def procedure_conflicts(self, id_child: int, id_procedure: int) -> list[int]:
+        # id диагнозов ребенка, при которых процедура противопоказана; пустой список - можно
+        matrix = self.matrix()
+        return matrix.decode(matrix.procedure_conflicts(id_procedure, self.child_masks([id_child], matrix)[id_child]))
+
+    def course_conflicts(self, id_child: int, id_course: int) -> list[int]:
+        matrix = self.matrix()
+        return matrix.decode(matrix.course_conflicts(id_course, self.child_masks([id_child], matrix)[id_child]))
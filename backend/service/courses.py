@@ -2,14 +2,20 @@ from fastapi import HTTPException
 from schemas.courses import *
 from crud.courses import *
 from utils.enums import Status
+from utils.contraindications import ContraindicationMatrix
+from utils.recommendations import CourseIndex
 
 class CourseService:
     def __init__(self, course_repository: CourseRepository,
                  course_procedure_repository: CourseRepository,
-                 procedure_repository: CourseRepository):
+                 procedure_repository: CourseRepository,
+                 contraindication_matrix: ContraindicationMatrix,
+                 course_index: CourseIndex):
         self.course_repository=course_repository
         self.course_procedure_repository=course_procedure_repository
         self.procedure_repository=procedure_repository
+        self.contraindication_matrix=contraindication_matrix
+        self.course_index=course_index
 
     def get_all_procedures_filter_by(self, **kwargs):
         return self.procedure_repository.get_all_filter_by(**kwargs)
@@ -26,8 +32,12 @@ class CourseService:
         entity = {k: v for k, v in entity.items() if v is not None}
         return self.procedure_repository.update(entity)
     
-    def delete_procedure(self, id: int):
-        return self.procedure_repository.delete(id=id)
+    def delete_procedure(self, id: int, version: int | None = None):
+        deleted = self.procedure_repository.delete(id=id, version=version)
+        self.contraindication_matrix.invalidate()
+        if deleted:
+            self.course_index.remove_procedure(id)
+        return deleted
     
 
     def get_all_course_procedures_filter_by(self, **kwargs):
@@ -37,16 +47,25 @@ class CourseService:
         return self.course_procedure_repository.get_one_filter_by(**kwargs)
     
     def create_course_procedure(self, new_course_procedure: CourseProcedureForm):
-        return self.course_procedure_repository.add(new_course_procedure.model_dump())
+        created = self.course_procedure_repository.add(new_course_procedure.model_dump())
+        self.contraindication_matrix.invalidate()
+        self.course_index.add_procedure(new_course_procedure.id_course, new_course_procedure.id_procedure)
+        return created
     
     def update_course_procedure(self, id: int, upd_course_procedure: CourseProcedureForm):
         entity = upd_course_procedure.model_dump()
         entity['id'] = id
         entity = {k: v for k, v in entity.items() if v is not None}
-        return self.course_procedure_repository.update(entity)
+        updated = self.course_procedure_repository.update(entity)
+        self.contraindication_matrix.invalidate()
+        self.course_index.invalidate()
+        return updated
     
     def delete_course_procedure(self, id: int):
-        return self.course_procedure_repository.delete(id=id)
+        deleted = self.course_procedure_repository.delete(id=id)
+        self.contraindication_matrix.invalidate()
+        self.course_index.invalidate()
+        return deleted
     
 
     def get_all_courses_filter_by(self, **kwargs):
@@ -62,29 +81,53 @@ class CourseService:
         created_course = self.course_repository.add(new_course_dict)
         if not created_course:
             return Status.FAILED.value
+        # Снимок строки до второго коммита: после него атрибуты курса сбрасываются
+        created_row = dict(created_course.__dict__)
         
         if ids_procedures:
-            for id_procedure in ids_procedures:
-                course_procedure = CourseProcedureForm(id_course=created_course.id, id_procedure=id_procedure)
-                self.course_procedure_repository.add(course_procedure.model_dump())
+            self.course_procedure_repository.add_all(
+                [{'id_course': created_course.id, 'id_procedure': id_procedure} for id_procedure in dict.fromkeys(ids_procedures)])
+            self.contraindication_matrix.invalidate()
+        self.course_index.put_course(created_row, ids_procedures)
         return created_course
+
+    def _sync_course_procedures(self, id: int, ids_procedures: list[int]):
+        # Применяет только разницу между текущим и запрошенным набором процедур, без коммита
+        model = self.course_procedure_repository.model
+        current = {row.id_procedure for row in
+                   self.course_procedure_repository.get_all_filter_by(id_course=id).with_entities(model.id_procedure)}
+        requested = list(dict.fromkeys(ids_procedures))
+        removed = current.difference(requested)
+        if removed:
+            # Через репозиторий: удаление повторяется на остальных шардах
+            self.course_procedure_repository.delete_by_filter(id_course=id, id_procedure__in=list(removed),
+                                                              commit=False)
+        self.course_procedure_repository.add_all(
+            [{'id_course': id, 'id_procedure': id_procedure} for id_procedure in requested if id_procedure not in current],
+            commit=False)
     
     def update_course(self, id: int, upd_course: UpdateTreatmentCourse):
         entity = upd_course.model_dump()
         entity['id'] = id
 
-        ids_procedures = entity.pop('ids_procedures', []) or []
+        ids_procedures = entity.pop('ids_procedures', None)
 
         entity = {k: v for k, v in entity.items() if v is not None}
-        updated_product = self.course_repository.update(entity)
+        updated_product = self.course_repository.update(entity, commit=False)
+        if not updated_product:
+            return None
 
-        if ids_procedures:
-            self.course_procedure_repository.delete_by_filter(id_course=id)
-            for id_procedure in ids_procedures:
-                course_procedure = CourseProcedureForm(id_course=id, id_procedure=id_procedure)
-                self.course_procedure_repository.add(course_procedure.model_dump())
+        if ids_procedures is not None:
+            self._sync_course_procedures(id, ids_procedures)
+        self.course_repository.session.commit()
+        if ids_procedures is not None:
+            self.contraindication_matrix.invalidate()
+        self.course_index.put_course({**updated_product, 'id': id}, ids_procedures)
         return updated_product
         
-    def delete_course(self, id: int):
-        self.course_procedure_repository.delete_by_filter(id_course=id)
-        return self.course_repository.delete(id=id)
\ No newline at end of file
+    def delete_course(self, id: int, version: int | None = None):
+        deleted = self.course_repository.delete(id=id, version=version)
+        self.contraindication_matrix.invalidate()
+        if deleted:
+            self.course_index.remove_course(id)
+        return deleted
\ No newline at end of file
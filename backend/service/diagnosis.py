@@ -1,10 +1,16 @@
 from fastapi import HTTPException
 from schemas.diagnosis import *
 from crud.diagnosis import *
+from utils.contraindications import ContraindicationMatrix
+from utils.recommendations import CourseIndex
 
 class DiagnosisService:
-    def __init__(self, diagnosis_repository: DiagnosisRepository):
+    def __init__(self, diagnosis_repository: DiagnosisRepository,
+                 contraindication_matrix: ContraindicationMatrix,
+                 course_index: CourseIndex):
         self.diagnosis_repository=diagnosis_repository
+        self.contraindication_matrix=contraindication_matrix
+        self.course_index=course_index
 
     def get_all_diagnosis_filter_by(self, **filter):
         return self.diagnosis_repository.get_all_filter_by(**filter)
@@ -13,13 +19,25 @@ class DiagnosisService:
         return self.diagnosis_repository.get_one_filter_by(**filter)
     
     def create_diagnosis(self, new_diagnosis: CreateDiagnosis):
-        return self.diagnosis_repository.add(new_diagnosis.model_dump())
+        created = self.diagnosis_repository.add(new_diagnosis.model_dump())
+        # Новый диагноз может попасть под уже заведенный префикс МКБ
+        self.contraindication_matrix.invalidate()
+        self.course_index.set_code(created.id, created.icd_code)
+        return created
     
     def update_diagnosis(self, id: int, upd_diagnosis: UpdateDiagnosis):
         entity = upd_diagnosis.model_dump()
         entity['id'] = id
         entity = {k: v for k, v in entity.items() if v is not None}
-        return self.diagnosis_repository.update(entity)
+        updated = self.diagnosis_repository.update(entity)
+        if updated and 'icd_code' in entity:
+            self.contraindication_matrix.invalidate()
+            self.course_index.set_code(id, entity['icd_code'])
+        return updated
 
-    def delete_diagnosis(self, id: int):
-        return self.diagnosis_repository.delete(id=id)
\ No newline at end of file
+    def delete_diagnosis(self, id: int, version: int | None = None):
+        deleted = self.diagnosis_repository.delete(id=id, version=version)
+        self.contraindication_matrix.invalidate()
+        if deleted:
+            self.course_index.set_code(id, None)
+        return deleted
\ No newline at end of file
@@ -0,0 +1,28 @@
+import uuid
+from datetime import datetime, timedelta
+from crud.jobs import JobRepository
+from config.jobs import JOBS_MAX_ATTEMPTS
+
+class JobService:
+    def __init__(self, job_repository: JobRepository):
+        self.job_repository=job_repository
+
+    def get_one_job_filter_by(self, **filter):
+        return self.job_repository.get_one_filter_by(**filter)
+
+    def get_all_jobs_filter_by(self, **filter):
+        return self.job_repository.get_all_filter_by(**filter)
+
+    def enqueue(self, type: str, payload: dict | None = None, key: str | None = None,
+                delay: float = 0, max_attempts: int = JOBS_MAX_ATTEMPTS, commit: bool = True):
+        # С тем же key задача ставится один раз; commit=False кладет ее в текущую транзакцию,
+        # и она появится в очереди только вместе с изменениями, которые ее породили
+        key = key or uuid.uuid4().hex
+        self.job_repository.add_ignore([{
+            'type': type,
+            'payload': payload or {},
+            'idempotency_key': key,
+            'max_attempts': max_attempts,
+            'run_at': datetime.now() + timedelta(seconds=delay),
+        }], commit=commit)
+        return self.job_repository.get_one_filter_by(idempotency_key=key)
@@ -1,27 +1,83 @@
 from fastapi import HTTPException
 from schemas.orders import *
 from crud.orders import *
+from service.reports import ReportService, order_snapshot
+from service.jobs import JobService
+from itertools import chain
+from crud.archive import ArchiveRepository
+from utils.events import EventBroker
+from utils.archive import reaches_archive, may_be_archived_order
+from config.archive import ARCHIVE_ORDERS_AFTER_DAYS
 
 class OrderService:
-    def __init__(self, order_repository: OrderRepository):
+    def __init__(self, order_repository: OrderRepository,
+                 archive_repository: ArchiveRepository,
+                 report_service: ReportService,
+                 job_service: JobService,
+                 event_broker: EventBroker):
         self.order_repository=order_repository
+        self.archive_repository=archive_repository
+        self.report_service=report_service
+        self.job_service=job_service
+        self.event_broker=event_broker
 
     def get_all_orders_filter_by(self, **filter):
         return self.order_repository.get_all_filter_by(**filter)
     
+    def get_archived_orders_filter_by(self, **filter):
+        # Архив читается, только если фильтр может захватить старые завершенные заказы
+        if not may_be_archived_order(filter) or \
+                not reaches_archive(filter, ('check_out_date', 'check_in_date'), ARCHIVE_ORDERS_AFTER_DAYS):
+            return None
+        return self.archive_repository.get_all_filter_by(**filter)
+
+    def get_order_history_filter_by(self, **filter):
+        archived = self.get_archived_orders_filter_by(**filter)
+        orders = self.order_repository.get_all_filter_by(**filter)
+        return orders if archived is None else chain(orders, archived)
+
     def get_one_order_filter_by(self, **filter):
-        return self.order_repository.get_one_filter_by(**filter)
+        # Архивные заказы доступны только на чтение: update/delete работают с горячей таблицей
+        return self.order_repository.get_one_filter_by(**filter) or self.archive_repository.get_one_filter_by(**filter)
     
     def create_order(self, new_order: dict):
+        self.report_service.apply_order_change(None, new_order)
         return self.order_repository.add(new_order)
     
     def update_order(self, id: int, entity: dict):
         entity['id'] = id
         entity = {k: v for k, v in entity.items() if v is not None}
-        return self.order_repository.update(entity)
+        # Единственный SELECT нужен для дельты отчетов; сама запись - один UPDATE с проверкой версии
+        order = self.order_repository.get_one_filter_by(id=id)
+        if not order:
+            return None
+        # Дельта считается от прочитанной версии: без версии от клиента проверяется она, иначе два
+        # параллельных изменения применили бы дельту к одному старому состоянию. Проигравший получит 409,
+        # и его дельта откатится вместе с транзакцией
+        entity.setdefault('version', order.version)
+        before = order_snapshot(order)
+        self.report_service.apply_order_change(before, {**before, **entity})
+        transition = None
+        if entity.get('status') and entity['status'] != order.status:
+            transition = {'id': id, 'id_parent': order.id_parent, 'id_child': order.id_child,
+                          'id_facility': order.id_facility, 'from': order.status, 'to': entity['status']}
+            # Задача коммитится вместе с заказом; ключ по версии не даст поставить ее дважды
+            self.job_service.enqueue('orders.status_changed', transition,
+                                     key=f'orders.status_changed:{id}:{order.version}', commit=False)
+        updated_order = self.order_repository.update(entity)
+        if updated_order and transition:
+            # Публикуем только после коммита: подписчик не должен увидеть откаченный статус
+            self.event_broker.publish('order_status', {**transition, 'version': updated_order.get('version')},
+                                      channels=('admin', f'parent:{order.id_parent}'))
+        return updated_order
     
-    def delete_order(self, id: int):
-        return self.order_repository.delete(id)
+    def delete_order(self, id: int, version: int | None = None):
+        order = self.order_repository.get_one_filter_by(id=id)
+        if not order:
+            return False
+        self.report_service.apply_order_change(order_snapshot(order), None)
+        # Как и в update_order: вычитается вклад именно прочитанной версии
+        return self.order_repository.delete(id, version=order.version if version is None else version)
         
 
         
@@ -0,0 +1,151 @@
+import logging
+from datetime import date, datetime, timedelta
+from sqlalchemy.orm import joinedload
+from crud.orders import OrderRepository
+from crud.courses import CourseRepository
+from crud.procedure_records import ProcedureRecordRepository
+from service.contraindications import ContraindicationService
+from models import Order, CourseProcedure, ProcedureRecord
+from utils.enums import OrderStatus
+from utils.recurrence import parse_frequency
+from utils.sharding import fan_out
+from utils.contraindications import ContraindicationMatrix
+from config.plans import PLAN_DAY_START, PLAN_DAY_END, PLAN_BATCH_SIZE
+
+logger = logging.getLogger('uvicorn.error')
+
+# Заказы, по которым ребенок точно приедет и процедуры нужно планировать
+PLANNED_ORDER_STATUSES = (OrderStatus.APPROVED, OrderStatus.WAITING_PAYMENT, OrderStatus.PAID, OrderStatus.ACTIVE)
+
+
+class PlanService:
+    def __init__(self, order_repository: OrderRepository,
+                 course_procedure_repository: CourseRepository,
+                 procedure_record_repository: ProcedureRecordRepository,
+                 contraindication_service: ContraindicationService):
+        self.order_repository=order_repository
+        self.course_procedure_repository=course_procedure_repository
+        self.procedure_record_repository=procedure_record_repository
+        self.contraindication_service=contraindication_service
+
+    @classmethod
+    def for_session(cls, session, contraindication_matrix: ContraindicationMatrix):
+        return cls(order_repository=OrderRepository(model=Order, session=session),
+                   course_procedure_repository=CourseRepository(model=CourseProcedure, session=session),
+                   procedure_record_repository=ProcedureRecordRepository(model=ProcedureRecord, session=session),
+                   contraindication_service=ContraindicationService.for_session(session, contraindication_matrix))
+
+    def course_plans(self, ids_courses: set[int]) -> dict[int, tuple]:
+        # Один запрос на все курсы пачки: {id курса: (длительность в днях, [процедуры])}
+        plans = {}
+        rows = self.course_procedure_repository.get_all_filter_by(id_course__in=list(ids_courses)) \
+            .options(joinedload(CourseProcedure.course), joinedload(CourseProcedure.procedure))
+        for row in rows:
+            plans.setdefault(row.id_course, (row.course.duration_days, []))[1].append(row.procedure)
+        return plans
+
+    def slots(self, order, duration_days: int, procedures: list, unparsed: set[int]) -> list[dict]:
+        end = order.check_out_date
+        if duration_days:
+            end = min(end, order.check_in_date + timedelta(days=duration_days))
+        planned = []
+        for procedure in procedures:
+            recurrence = parse_frequency(procedure.frequency)
+            if recurrence is None:
+                unparsed.add(procedure.id)
+                continue
+            for start in recurrence.occurrences(order.check_in_date, end, PLAN_DAY_START, PLAN_DAY_END):
+                planned.append((start, procedure))
+        # У ребенка процедуры идут друг за другом: совпавшие по времени сдвигаются на конец предыдущей
+        planned.sort(key=lambda item: (item[0], item[1].id))
+        rows, busy_until = [], None
+        for start, procedure in planned:
+            if busy_until is not None and start < busy_until:
+                start = busy_until
+            busy_until = start + timedelta(minutes=procedure.duration_min or 0)
+            rows.append({'id_child': order.id_child, 'id_facility': order.id_facility, 'id_order': order.id,
+                         'id_procedure': procedure.id, 'id_staff': None, 'procedure_time': start})
+        return rows
+
+    def replace_unassigned(self, ids_orders: list[int], rows: list[dict]) -> list[dict]:
+        # Повторное развертывание сверяет план с уже созданными слотами по (заказ, процедура, день).
+        # Совпавшие по времени слоты остаются как есть; прошедшие и назначенные сотруднику тоже
+        # остаются и занимают свои номера приема в дне. Будущие слоты без сотрудника, время
+        # которых сдвинулось (новая длительность или частота), пересоздаются - без дублей
+        now = datetime.now()
+        planned: dict[tuple, list[dict]] = {}
+        for row in rows:
+            planned.setdefault((row['id_order'], row['id_procedure'], row['procedure_time'].date()), []).append(row)
+        existing: dict[tuple, list] = {}
+        for i in range(0, len(ids_orders), PLAN_BATCH_SIZE):
+            for record in self.procedure_record_repository.get_all_filter_by(id_order__in=ids_orders[i:i + PLAN_BATCH_SIZE]) \
+                    .with_entities(ProcedureRecord.id, ProcedureRecord.id_order, ProcedureRecord.id_procedure,
+                                   ProcedureRecord.procedure_time, ProcedureRecord.id_staff):
+                existing.setdefault((record.id_order, record.id_procedure, record.procedure_time.date()), []).append(record)
+        fresh, stale = [], []
+        for key in planned.keys() | existing.keys():
+            records = existing.get(key, [])
+            times = {record.procedure_time for record in records}
+            missing = [row for row in planned.get(key, []) if row['procedure_time'] not in times]
+            wanted = {row['procedure_time'] for row in planned.get(key, [])}
+            unmatched = [record for record in records if record.procedure_time not in wanted]
+            fixed = sum(1 for record in unmatched if record.id_staff is not None or record.procedure_time <= now)
+            stale.extend(record.id for record in unmatched if record.id_staff is None and record.procedure_time > now)
+            fresh.extend(missing[fixed:])
+        for i in range(0, len(stale), PLAN_BATCH_SIZE):
+            self.procedure_record_repository.delete_by_filter(id__in=stale[i:i + PLAN_BATCH_SIZE], commit=False)
+        return sorted(fresh, key=lambda row: (row['id_order'], row['procedure_time'], row['id_procedure']))
+
+    def expand(self, orders) -> dict:
+        orders = list(orders)
+        plans = self.course_plans({order.id_treatment_course for order in orders})
+        matrix = self.contraindication_service.matrix()
+        masks = self.contraindication_service.child_masks((order.id_child for order in orders), matrix)
+        unparsed, contraindicated, rows, inserted = set(), [], [], 0
+        for order in orders:
+            duration_days, procedures = plans.get(order.id_treatment_course, (None, []))
+            mask = masks.get(order.id_child, 0)
+            # Весь курс проверяется одним И; по процедурам - только если курс задет
+            if matrix.course_conflicts(order.id_treatment_course, mask):
+                allowed = []
+                for procedure in procedures:
+                    if matrix.procedure_conflicts(procedure.id, mask):
+                        contraindicated.append({'id_order': order.id, 'id_procedure': procedure.id})
+                    else:
+                        allowed.append(procedure)
+                procedures = allowed
+            rows.extend(self.slots(order, duration_days, procedures, unparsed))
+        rows = self.replace_unassigned([order.id for order in orders], rows)
+        for i in range(0, len(rows), PLAN_BATCH_SIZE):
+            inserted += self.procedure_record_repository.add_ignore(rows[i:i + PLAN_BATCH_SIZE], commit=False)
+        self.procedure_record_repository.session.commit()
+        if unparsed:
+            logger.warning('Procedures with unrecognized frequency were not planned: %s', sorted(unparsed))
+        if contraindicated:
+            logger.warning('Contraindicated procedures were not planned: %s', contraindicated)
+        return {'orders': len(orders), 'slots': inserted, 'unparsed': sorted(unparsed), 'contraindicated': contraindicated}
+
+    def expand_order(self, id: int) -> dict:
+        order = self.order_repository.get_one_filter_by(id=id)
+        if not order or order.status not in PLANNED_ORDER_STATUSES:
+            return {'orders': 0, 'slots': 0, 'unparsed': [], 'contraindicated': []}
+        return self.expand([order])
+
+    def expand_period(self, date_from: date, date_to: date) -> dict:
+        orders = self.order_repository.get_all_filter_by(status__in=[status.value for status in PLANNED_ORDER_STATUSES],
+                                                         check_in_date__gte=date_from, check_in_date__lte=date_to)
+        return self.expand(orders)
+
+    def expand_period_all(self, date_from: date, date_to: date) -> dict:
+        matrix = self.contraindication_service.contraindication_matrix
+        results = fan_out(self.order_repository.session,
+                          lambda session: PlanService.for_session(session, matrix).expand_period(date_from, date_to))
+        return {'orders': sum(result['orders'] for result in results.values()),
+                'slots': sum(result['slots'] for result in results.values()),
+                'unparsed': sorted({id for result in results.values() for id in result['unparsed']}),
+                'contraindicated': [item for result in results.values() for item in result['contraindicated']],
+                'shards': results}
+
+    def cancel_order(self, id: int) -> bool:
+        # Прошедшие записи остаются в истории, будущие слоты отмененного заказа удаляются
+        return self.procedure_record_repository.delete_by_filter(id_order=id, procedure_time__gt=datetime.now())
@@ -1,16 +1,27 @@
 from fastapi import HTTPException
 from schemas.childs import *
 from crud.procedure_records import *
+from crud.archive import ArchiveRepository
+from utils.archive import reaches_archive
+from config.archive import ARCHIVE_RECORDS_AFTER_DAYS
 
 class ProcedureRecordService:
-    def __init__(self, procedure_record_repository: ProcedureRecordRepository):
+    def __init__(self, procedure_record_repository: ProcedureRecordRepository,
+                 archive_repository: ArchiveRepository):
         self.procedure_record_repository = procedure_record_repository
+        self.archive_repository = archive_repository
 
     def get_all_procedure_records_filter_by(self, **filter):
         return self.procedure_record_repository.get_all_filter_by(**filter)
     
+    def get_archived_procedure_records_filter_by(self, **filter):
+        if not reaches_archive(filter, ('procedure_time',), ARCHIVE_RECORDS_AFTER_DAYS):
+            return None
+        return self.archive_repository.get_all_filter_by(**filter)
+
     def get_one_procedure_record_filter_by(self, **filter):
-        return self.procedure_record_repository.get_one_filter_by(**filter)
+        return (self.procedure_record_repository.get_one_filter_by(**filter)
+                or self.archive_repository.get_one_filter_by(**filter))
 
     def create_procedure_record(self, new_record: dict):
         return self.procedure_record_repository.add(new_record)
@@ -21,6 +32,6 @@ class ProcedureRecordService:
         entity = {k: v for k, v in entity.items() if v is not None}
         return self.procedure_record_repository.update(entity)
     
-    def delete_procedure_record(self, id: int):
-        return self.procedure_record_repository.delete(id=id)
+    def delete_procedure_record(self, id: int, version: int | None = None):
+        return self.procedure_record_repository.delete(id=id, version=version)
     
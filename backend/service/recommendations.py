@@ -0,0 +1,38 @@
+from crud.courses import CourseRepository
+from crud.diagnosis import DiagnosisRepository
+from crud.childs import ChildRepository
+from models import TreatmentCourse, CourseProcedure, Diagnosis, ChildDiagnosis
+from service.contraindications import ContraindicationService
+from utils.recommendations import CourseIndex, COURSE_FIELDS
+
+
+class RecommendationService:
+    def __init__(self, course_repository: CourseRepository,
+                 course_procedure_repository: CourseRepository,
+                 diagnosis_repository: DiagnosisRepository,
+                 child_diagnosis_repository: ChildRepository,
+                 contraindication_service: ContraindicationService,
+                 course_index: CourseIndex):
+        self.course_repository=course_repository
+        self.course_procedure_repository=course_procedure_repository
+        self.diagnosis_repository=diagnosis_repository
+        self.child_diagnosis_repository=child_diagnosis_repository
+        self.contraindication_service=contraindication_service
+        self.course_index=course_index
+
+    def load(self) -> tuple:
+        # Полная загрузка справочников; дальше индекс живет на правках CourseService
+        diagnoses = self.diagnosis_repository.get_all_filter_by().with_entities(Diagnosis.id, Diagnosis.icd_code).all()
+        courses = [row._asdict() for row in self.course_repository.get_all_filter_by()
+                   .with_entities(*(getattr(TreatmentCourse, field) for field in COURSE_FIELDS))]
+        course_procedures = self.course_procedure_repository.get_all_filter_by() \
+            .with_entities(CourseProcedure.id_course, CourseProcedure.id_procedure).all()
+        return diagnoses, courses, course_procedures
+
+    def recommend_courses(self, id_child: int) -> list[dict]:
+        self.course_index.ensure(self.load)
+        ids_diagnoses = [row.id_diagnosis for row in self.child_diagnosis_repository
+                         .get_all_filter_by(id_child=id_child).with_entities(ChildDiagnosis.id_diagnosis)]
+        if not ids_diagnoses:
+            return []
+        return self.course_index.recommend(ids_diagnoses, self.contraindication_service.matrix())
@@ -0,0 +1,44 @@
+import uuid
+from crud.jobs import JobRepository
+from models import Job
+from service.jobs import JobService
+from config.database import Base, REPLICATION_MAX_ATTEMPTS
+from utils.sharding import dump_statements, load_statements
+from utils.enums import JobStatus
+
+REPLICATION_JOB = 'replication.apply'
+
+
+class ReplicationService:
+    # Недоставленные на шард записи справочников лежат в jobs, по задаче на коммит.
+    # Задачи одного шарда применяются строго по порядку id
+    def __init__(self, job_repository: JobRepository):
+        self.job_repository=job_repository
+
+    @classmethod
+    def for_session(cls, session):
+        return cls(job_repository=JobRepository(model=Job, session=session))
+
+    def backlog(self, shard: str, before: int | None = None) -> bool:
+        query = self.job_repository.get_all_filter_by(
+            type=REPLICATION_JOB, idempotency_key__startswith=f'{REPLICATION_JOB}:{shard}:',
+            status__in=[JobStatus.PENDING.value, JobStatus.RUNNING.value])
+        if before is not None:
+            query = query.filter(Job.id < before)
+        return query.first() is not None
+
+    def queue(self, shard: str, statements: list):
+        key = f'{REPLICATION_JOB}:{shard}:{uuid.uuid4().hex}'
+        return JobService(self.job_repository).enqueue(
+            REPLICATION_JOB, {'shard': shard, 'key': key, 'statements': dump_statements(statements)},
+            key=key, max_attempts=REPLICATION_MAX_ATTEMPTS)
+
+    def apply(self, payload: dict):
+        # Более ранняя задача этого шарда еще не применена: ждем ее, иначе порядок записей нарушится
+        job = self.job_repository.get_one_filter_by(idempotency_key=payload['key'])
+        if self.backlog(payload['shard'], before=job.id):
+            raise RuntimeError(f'earlier replication to shard {payload["shard"]} is pending')
+        with self.job_repository.session.shards[payload['shard']].begin() as connection:
+            for stmt in load_statements(payload['statements'], Base.metadata):
+                connection.execute(stmt)
+        return len(payload['statements'])
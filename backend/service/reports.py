@@ -0,0 +1,143 @@
+from collections import defaultdict
+from itertools import chain
+from datetime import date, timedelta
+from decimal import Decimal
+from crud.reports import ReportRepository
+from crud.orders import OrderRepository
+from crud.archive import ArchiveRepository
+from utils.enums import OrderStatus
+from utils.sharding import fan_out
+from models import Order, OrderArchive, RoomOccupancy, CourseRevenue
+
+# Заказы, которые занимают номер на время проживания
+OCCUPANCY_STATUSES = {OrderStatus.APPROVED, OrderStatus.WAITING_PAYMENT, OrderStatus.PAID,
+                      OrderStatus.ACTIVE, OrderStatus.COMPLETED}
+# Заказы, по которым получена оплата
+REVENUE_STATUSES = {OrderStatus.PAID, OrderStatus.ACTIVE, OrderStatus.COMPLETED}
+
+ORDER_REPORT_FIELDS = ('id_room', 'id_treatment_course', 'status', 'check_in_date', 'check_out_date', 'price')
+
+
+def order_snapshot(order) -> dict:
+    return {field: getattr(order, field) for field in ORDER_REPORT_FIELDS}
+
+
+class ReportService:
+    def __init__(self, order_repository: OrderRepository,
+                 order_archive_repository: ArchiveRepository,
+                 occupancy_repository: ReportRepository,
+                 revenue_repository: ReportRepository):
+        self.order_repository=order_repository
+        self.order_archive_repository=order_archive_repository
+        self.occupancy_repository=occupancy_repository
+        self.revenue_repository=revenue_repository
+
+    @classmethod
+    def for_session(cls, session):
+        return cls(order_repository=OrderRepository(model=Order, session=session),
+                   order_archive_repository=ArchiveRepository(model=OrderArchive, session=session),
+                   occupancy_repository=ReportRepository(model=RoomOccupancy, session=session),
+                   revenue_repository=ReportRepository(model=CourseRevenue, session=session))
+
+    def _contribute(self, order: dict, sign: int, occupancy: dict, revenue: dict):
+        status = order.get('status')
+        check_in, check_out = order.get('check_in_date'), order.get('check_out_date')
+        if not check_in or not check_out:
+            return
+        if status in OCCUPANCY_STATUSES:
+            day = check_in
+            while day < check_out:
+                occupancy[(day, order['id_room'])] += sign
+                day += timedelta(days=1)
+        if status in REVENUE_STATUSES:
+            month = check_in.replace(day=1)
+            revenue[(month, order['id_treatment_course'])][0] += sign
+            revenue[(month, order['id_treatment_course'])][1] += sign * Decimal(str(order.get('price') or 0))
+
+    def _write(self, occupancy: dict, revenue: dict, increment: bool):
+        self.occupancy_repository.upsert([
+            {'day': day, 'id_room': id_room, 'guests': guests}
+            for (day, id_room), guests in occupancy.items() if guests or not increment
+        ], increment=increment, commit=False)
+        self.revenue_repository.upsert([
+            {'month': month, 'id_treatment_course': id_course, 'orders_count': count, 'revenue': amount}
+            for (month, id_course), (count, amount) in revenue.items() if count or amount or not increment
+        ], increment=increment, commit=False)
+
+    def apply_order_changes(self, changes: list[tuple[dict | None, dict | None]]):
+        # Применяет разницу между старым и новым состоянием заказов к сводным таблицам.
+        # Коммит выполняется вместе с изменением самого заказа
+        occupancy = defaultdict(int)
+        revenue = defaultdict(lambda: [0, Decimal(0)])
+        for before, after in changes:
+            if before:
+                self._contribute(before, -1, occupancy, revenue)
+            if after:
+                self._contribute(after, 1, occupancy, revenue)
+        self._write(occupancy, revenue, increment=True)
+
+    def apply_order_change(self, before: dict | None, after: dict | None):
+        self.apply_order_changes([(before, after)])
+
+    def discard_orders(self, **filter):
+        # Архивные заказы удаляются каскадом вместе с горячими, их вклад тоже вычитается
+        orders = chain(self.order_repository.get_all_filter_by(**filter),
+                       self.order_archive_repository.get_all_filter_by(**filter))
+        self.apply_order_changes([(order_snapshot(order), None) for order in orders])
+
+    def rebuild(self):
+        occupancy = defaultdict(int)
+        revenue = defaultdict(lambda: [0, Decimal(0)])
+        orders = chain(self.order_repository.get_all_filter_by().yield_per(1000),
+                       self.order_archive_repository.get_all_filter_by().yield_per(1000))
+        for order in orders:
+            self._contribute(order_snapshot(order), 1, occupancy, revenue)
+
+        self.occupancy_repository.get_all_filter_by().delete()
+        self.revenue_repository.get_all_filter_by().delete()
+        self._write(occupancy, revenue, increment=False)
+        self.occupancy_repository.session.commit()
+        return {'occupancy_rows': len(occupancy), 'revenue_rows': len(revenue)}
+
+    def get_occupancy(self, date_from: date, date_to: date, id_room: int | None = None):
+        model = self.occupancy_repository.model
+        query = self.occupancy_repository.get_all_filter_by().filter(model.day >= date_from, model.day <= date_to,
+                                                                     model.guests > 0)
+        if id_room is not None:
+            query = query.filter(model.id_room == id_room)
+        return query.order_by(model.day, model.id_room).all()
+
+    def get_revenue(self, month_from: date, month_to: date, id_treatment_course: int | None = None):
+        model = self.revenue_repository.model
+        query = self.revenue_repository.get_all_filter_by().filter(model.month >= month_from.replace(day=1),
+                                                                   model.month <= month_to.replace(day=1),
+                                                                   model.orders_count > 0)
+        if id_treatment_course is not None:
+            query = query.filter(model.id_treatment_course == id_treatment_course)
+        return query.order_by(model.month, model.id_treatment_course).all()
+
+    # Сводные таблицы ведутся на каждом шарде по его заказам; отчеты администратора
+    # опрашивают все шарды параллельно и объединяют ответы
+    def rebuild_all(self):
+        return fan_out(self.order_repository.session, lambda session: ReportService.for_session(session).rebuild())
+
+    def get_occupancy_all(self, date_from: date, date_to: date, id_room: int | None = None):
+        results = fan_out(self.occupancy_repository.session,
+                          lambda session: [{**row.__dict__} for row in
+                                           ReportService.for_session(session).get_occupancy(date_from, date_to, id_room)])
+        rows = [{**row, 'shard': shard} for shard, shard_rows in results.items() for row in shard_rows]
+        return sorted(rows, key=lambda row: (row['day'], row['shard'], row['id_room']))
+
+    def get_revenue_all(self, month_from: date, month_to: date, id_treatment_course: int | None = None):
+        # Курсы реплицированы, поэтому строки разных шардов по одному курсу складываются
+        results = fan_out(self.revenue_repository.session,
+                          lambda session: [{**row.__dict__} for row in
+                                           ReportService.for_session(session).get_revenue(month_from, month_to,
+                                                                                          id_treatment_course)])
+        merged = defaultdict(lambda: [0, Decimal(0)])
+        for shard_rows in results.values():
+            for row in shard_rows:
+                merged[(row['month'], row['id_treatment_course'])][0] += row['orders_count']
+                merged[(row['month'], row['id_treatment_course'])][1] += Decimal(str(row['revenue']))
+        return [{'month': month, 'id_treatment_course': id_course, 'orders_count': count, 'revenue': revenue}
+                for (month, id_course), (count, revenue) in sorted(merged.items())]
@@ -21,5 +21,5 @@ class RoomService:
         entity = {k: v for k, v in entity.items() if v is not None}
         return self.room_repository.update(entity)
     
-    def delete_room(self, id: int):
-        return self.room_repository.delete(id=id)
\ No newline at end of file
+    def delete_room(self, id: int, version: int | None = None):
+        return self.room_repository.delete(id=id, version=version)
\ No newline at end of file
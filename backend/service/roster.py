@@ -0,0 +1,86 @@
+from datetime import date, datetime, timedelta
+from sqlalchemy import or_
+from crud.shifts import ShiftRepository
+from crud.users import UserRepository
+from models import StaffShift, Staff
+from utils.recurrence import parse_schedule
+from utils.roster import RosterIndex, Shift, expand
+
+
+class RosterService:
+    def __init__(self, shift_repository: ShiftRepository,
+                 staff_repository: UserRepository,
+                 roster_index: RosterIndex):
+        self.shift_repository=shift_repository
+        self.staff_repository=staff_repository
+        self.roster_index=roster_index
+
+    def get_shifts_filter_by(self, **filter):
+        return self.shift_repository.get_all_filter_by(**filter).order_by(StaffShift.day, StaffShift.weekday,
+                                                                         StaffShift.start_time)
+
+    def add_shift(self, id_staff: int, shift: dict):
+        # Исключение на дату заменяет прежние исключения этого сотрудника на ту же дату
+        if shift.get('day') is not None:
+            self.shift_repository.delete_by_filter(id_staff=id_staff, day=shift['day'])
+        created = self.shift_repository.add({**shift, 'id_staff': id_staff})
+        self.roster_index.invalidate()
+        return created
+
+    def delete_shifts(self, id_staff: int, **filter) -> bool:
+        deleted = self.shift_repository.delete_by_filter(id_staff=id_staff, **filter)
+        self.roster_index.invalidate()
+        return deleted
+
+    def sync_schedule(self, id_staff: int, schedule: str) -> bool:
+        # Недельный график пересобирается из текста Staff.schedule; исключения не трогаются.
+        # False - текст не разобран, график остается прежним
+        parsed = parse_schedule(schedule)
+        if parsed is None:
+            return False
+        self.shift_repository.delete_by_filter(id_staff=id_staff, weekday__ne=None)
+        self.shift_repository.add_all([{'id_staff': id_staff, 'weekday': weekday, 'start_time': start, 'end_time': end}
+                                       for weekday, windows in sorted(parsed.items()) for start, end in windows])
+        self.roster_index.invalidate()
+        return True
+
+    def sync_all(self) -> dict:
+        # Первичное заполнение: сотрудники, у которых еще нет недельного графика
+        synced = self.shift_repository.session.query(StaffShift.id_staff).filter(StaffShift.weekday.is_not(None))
+        staffs = self.staff_repository.get_all_filter_by().filter(Staff.id.not_in(synced.scalar_subquery()))
+        result = {'synced': 0, 'unparsed': []}
+        for staff in staffs:
+            if self.sync_schedule(staff.id, staff.schedule):
+                result['synced'] += 1
+            else:
+                result['unparsed'].append(staff.id)
+        return result
+
+    def unrostered(self) -> list:
+        # Сотрудники без единой строки графика: текст Staff.schedule еще не синхронизирован или не разобран
+        rostered = self.shift_repository.session.query(StaffShift.id_staff).distinct()
+        return self.staff_repository.get_all_filter_by().filter(Staff.id.not_in(rostered.scalar_subquery())) \
+            .order_by(Staff.id).all()
+
+    def load_day(self, day: date) -> list[Shift]:
+        # Строки графика на день и на предыдущий (его ночные смены заходят в этот день)
+        previous = day - timedelta(days=1)
+        rows = self.shift_repository.session.query(StaffShift.id_staff, Staff.department, StaffShift.weekday,
+                                                   StaffShift.day, StaffShift.start_time, StaffShift.end_time) \
+            .join(Staff, Staff.id == StaffShift.id_staff) \
+            .filter(or_(StaffShift.weekday.in_([day.weekday(), previous.weekday()]),
+                        StaffShift.day.in_([day, previous]))).all()
+        patterns = [(id_staff, department, weekday, start, end)
+                    for id_staff, department, weekday, _, start, end in rows if weekday is not None]
+        exceptions = [(id_staff, department, exception_day, start, end)
+                      for id_staff, department, _, exception_day, start, end in rows if exception_day is not None]
+        return expand(previous, patterns, exceptions) + expand(day, patterns, exceptions)
+
+    def day_index(self, day: date):
+        return self.roster_index.day(day, self.load_day)
+
+    def on_duty(self, at: datetime, department: str | None = None):
+        ids = self.roster_index.on_duty(at, department, self.load_day)
+        if not ids:
+            return []
+        return self.staff_repository.get_all_filter_by(id__in=ids).order_by(Staff.id).all()
@@ -0,0 +1,69 @@
+import logging
+from datetime import datetime
+from service.reports import ReportService
+from service.archive import ArchiveService
+from service.jobs import JobService
+from service.plans import PlanService, PLANNED_ORDER_STATUSES
+from service.replication import ReplicationService, REPLICATION_JOB
+from crud import JobRepository
+from models import Job
+from config.archive import (ARCHIVE_ORDERS_AFTER_DAYS, ARCHIVE_RECORDS_AFTER_DAYS, ARCHIVE_BATCH_SIZE,
+                            ARCHIVE_MAX_BATCHES, ARCHIVE_INTERVAL)
+from utils.jobs import job_handler
+from utils.enums import OrderStatus
+from dependencies import contraindication_matrix
+
+logger = logging.getLogger('uvicorn.error')
+
+# Обработчики фоновых задач. Регистрируются при импорте модуля (см. main.py)
+
+@job_handler('reports.rebuild', concurrency=1, timeout=1800)
+def rebuild_reports(payload: dict, session):
+    result = ReportService.for_session(session).rebuild_all()
+    logger.info('Reports rebuilt: %s', result)
+    return result
+
+@job_handler('orders.status_changed', concurrency=4)
+def order_status_changed(payload: dict, session):
+    # Побочные эффекты смены статуса заказа, которые не должны задерживать ответ
+    logger.info('Order %s: %s -> %s', payload['id'], payload['from'], payload['to'])
+    # Заказ живет на шарде своего филиала
+    session.info['facility'] = payload.get('id_facility')
+    plans = PlanService.for_session(session, contraindication_matrix)
+    if payload['to'] in PLANNED_ORDER_STATUSES:
+        # Повторный запуск безопасен: неназначенные будущие слоты пересоздаются, остальные не дублируются
+        logger.info('Order %s planned: %s', payload['id'], plans.expand_order(payload['id']))
+    elif payload['to'] == OrderStatus.CANCELLED:
+        plans.cancel_order(payload['id'])
+
+@job_handler(REPLICATION_JOB, concurrency=1)
+def apply_replication(payload: dict, session):
+    # Запись справочника, не дошедшая до шарда при коммите (см. utils/routing.py)
+    return ReplicationService.for_session(session).apply(payload)
+
+def schedule_archive(session, delay: float = 0):
+    # Один плановый запуск на интервал: ключ по номеру интервала не даст воркерам поставить его дважды
+    slot = int((datetime.now().timestamp() + delay) // ARCHIVE_INTERVAL)
+    JobService(JobRepository(model=Job, session=session)).enqueue('archive.run', key=f'archive.run:{slot}',
+                                                                   delay=delay)
+
+def bootstrap_archive(session_factory):
+    session = session_factory()
+    try:
+        schedule_archive(session)
+    except Exception as e:
+        logger.warning('Archive job not scheduled: %s', e)
+    finally:
+        session.close()
+
+@job_handler('archive.run', concurrency=1, timeout=1800)
+def archive_old_rows(payload: dict, session):
+    result = ArchiveService.for_session(session).run_all(ARCHIVE_ORDERS_AFTER_DAYS, ARCHIVE_RECORDS_AFTER_DAYS,
+                                                          ARCHIVE_BATCH_SIZE, ARCHIVE_MAX_BATCHES)
+    logger.info('Archived: %s', result)
+    jobs = JobService(JobRepository(model=Job, session=session))
+    if not result['done']:
+        # Лимит пачек исчерпан: продолжаем отдельной задачей, не занимая обработчик надолго
+        jobs.enqueue('archive.run', {'continued': True})
+    schedule_archive(session, delay=ARCHIVE_INTERVAL)
+    return result
@@ -3,14 +3,24 @@ from fastapi import HTTPException
 from passlib.hash import pbkdf2_sha256
 from schemas.users import *
 from crud.users import UserRepository
+from service.reports import ReportService
+from service.roster import RosterService
+from sqlalchemy import select
+from utils.abstract_repository import VersionConflict
+from utils.audit import audit_cascade
+from config.audit import AUDIT_ENABLED, AUDIT_TABLES
 
 class UserService:
     def __init__(self, user_repository: UserRepository,
                  parent_repository: UserRepository,
-                 staff_repository: UserRepository):
+                 staff_repository: UserRepository,
+                 report_service: ReportService,
+                 roster_service: RosterService):
         self.user_repository=user_repository
         self.parent_repository=parent_repository
         self.staff_repository=staff_repository
+        self.report_service=report_service
+        self.roster_service=roster_service
 
     def get_all_users_filter_by(self, **filter):
         users = self.user_repository.get_all_filter_by(**filter)
@@ -21,18 +31,34 @@ class UserService:
         return user
 
     def update(self, user_id: int, data: UserUpdate):
-        entity = data.model_dump()
-        user = self.user_repository.get_one_filter_by(id=user_id)
-        if data.password and not pbkdf2_sha256.verify(data.password, user.password):
-            raise HTTPException(status_code=403, detail={'status': AuthStatus.INVALID_PASSWORD.value})
+        entity = {k: v for k, v in data.model_dump().items() if v is not None}
         if data.password:
+            user = self.user_repository.get_one_filter_by(id=user_id)
+            if not user:
+                return None
+            if not pbkdf2_sha256.verify(data.password, user.password):
+                raise HTTPException(status_code=403, detail={'status': AuthStatus.INVALID_PASSWORD.value})
             entity['password'] = pbkdf2_sha256.hash(data.password)
-        self.user_repository.update(user_id, entity)
-        updated_user = self.user_repository.get_one_filter_by(id=user_id)
-        return updated_user
+        entity['id'] = user_id
+        return self.user_repository.update(entity)
 
     def delete_user(self, id: int):
         return self.user_repository.delete(id=id)
+
+    def _delete_account(self, profile_repository: UserRepository, id: int, version: int | None):
+        # Один DELETE из users по id_user профиля: профиль и все зависимые строки удаляет каскад
+        profile = profile_repository.model
+        id_user = select(profile.id_user).where(profile.id == id)
+        if version is not None:
+            id_user = id_user.where(profile.version == version)
+        if AUDIT_ENABLED:
+            # Дети, диагнозы, заказы и записи процедур уходят каскадом мимо журнала - фиксируем заранее
+            users = self.user_repository.model.__table__
+            audit_cascade(self.user_repository.session, users, users.c.id == id_user.scalar_subquery(), AUDIT_TABLES)
+        deleted = self.user_repository.delete(id=id_user.scalar_subquery())
+        if not deleted and version is not None and profile_repository.get_one_filter_by(id=id):
+            raise VersionConflict(profile.__tablename__, id)
+        return deleted
     
 
     def get_all_parents_filter_by(self, **filter):
@@ -50,8 +76,9 @@ class UserService:
         entity = {k: v for k, v in entity.items() if v is not None}
         return self.parent_repository.update(entity)
 
-    def delete_parent(self, id: int):
-        return self.parent_repository.delete(id=id)
+    def delete_parent(self, id: int, version: int | None = None):
+        self.report_service.discard_orders(id_parent=id)
+        return self._delete_account(self.parent_repository, id, version)
     
 
     def get_all_staffs_filter_by(self, **filter):
@@ -61,13 +88,20 @@ class UserService:
         return self.staff_repository.get_one_filter_by(**filter)
     
     def create_staff(self, new_staff: CreateModelStaff):
-        return self.staff_repository.add(new_staff.model_dump())
+        staff = self.staff_repository.add(new_staff.model_dump())
+        self.roster_service.sync_schedule(staff.id, staff.schedule)
+        return staff
     
     def update_staff(self, id: int, upd_staff: UpdateStaff):
         entity = upd_staff.model_dump()
         entity['id'] = id
         entity = {k: v for k, v in entity.items() if v is not None}
-        return self.staff_repository.update(entity)
+        updated = self.staff_repository.update(entity)
+        if updated and 'schedule' in entity:
+            self.roster_service.sync_schedule(id, entity['schedule'])
+        elif updated and 'department' in entity:
+            self.roster_service.roster_index.invalidate()
+        return updated
 
-    def delete_staff(self, id: int):
-        return self.staff_repository.delete(id=id)
\ No newline at end of file
+    def delete_staff(self, id: int, version: int | None = None):
+        return self._delete_account(self.staff_repository, id, version)
\ No newline at end of file
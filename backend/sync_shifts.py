@@ -0,0 +1,15 @@
+from config.database import SessionLocal
+from service import RosterService
+from crud import ShiftRepository, UserRepository
+from models import StaffShift, Staff
+from utils.roster import RosterIndex
+
+# Заполнение недельных графиков из текста Staff.schedule для сотрудников без них: python sync_shifts.py
+if __name__ == '__main__':
+    session = SessionLocal()
+    try:
+        print(RosterService(shift_repository=ShiftRepository(model=StaffShift, session=session),
+                            staff_repository=UserRepository(model=Staff, session=session),
+                            roster_index=RosterIndex(0, 0)).sync_all())
+    finally:
+        session.close()
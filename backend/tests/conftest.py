@@ -0,0 +1,55 @@
+import os
+
+# Настройки читаются при импорте config: тесты не ходят в MySQL и не требуют .env
+os.environ.setdefault('DATABASE_URL', 'sqlite://')
+os.environ.setdefault('SECRET_KEY', 'test')
+os.environ.setdefault('JOBS_ENABLED', '0')
+
+import pytest
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from config.database import Base, enable_foreign_keys
+from utils.routing import RoutingSession
+import models
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine('sqlite://', poolclass=StaticPool, connect_args={'check_same_thread': False})
+    event.listen(engine, 'connect', enable_foreign_keys)
+    Base.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def session(engine):
+    session = sessionmaker(class_=RoutingSession, autocommit=False, autoflush=False, bind=engine)()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def facilities(session):
+    session.execute(text("INSERT INTO facilities (id, name) VALUES (1, 'main'), (2, 'east')"))
+    session.commit()
+
+
+@pytest.fixture
+def catalog(session, facilities):
+    # Минимальный справочник: родитель с ребенком и диагнозом, два номера, два курса
+    for statement in (
+            "INSERT INTO users (id, role, email, password) VALUES (1, 'USER', 'p@x.ru', '-')",
+            "INSERT INTO parents (id, id_user, name, phone, address, passport_data) VALUES (1, 1, 'P', '1', 'a', 'p')",
+            "INSERT INTO diagnosis (id, name, icd_code, description, symptoms, contraindications) "
+            "VALUES (1, 'Астма', 'J45', '', '', '')",
+            "INSERT INTO childs (id, name, birth_date, gender, id_parent, height, weight, blood, disability, "
+            "vaccinations, medical_note) VALUES (1, 'Kid', '2015-01-01', 'M', 1, 120, 30, '1+', '-', 'v', 'm')",
+            "INSERT INTO child_diagnosis (id, id_child, id_diagnosis, date_diagnosis, doctor, notes) "
+            "VALUES (1, 1, 1, '2020-01-01', 'Dr', 'n')",
+            "INSERT INTO rooms (id, number, floor, capacity, description) VALUES (1, '101', 1, 2, ''), (2, '102', 1, 2, '')",
+            "INSERT INTO treatment_courses (id, name, description, price, duration_days, id_diagnosis) "
+            "VALUES (1, 'C1', '', 1000, 10, 1), (2, 'C2', '', 500, 5, 1)"):
+        session.execute(text(statement))
+    session.commit()
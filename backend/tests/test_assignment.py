@@ -0,0 +1,72 @@
+import random
+from utils.assignment import Assignment, Slot, Worker
+
+
+def check(assignment: Assignment, slots: list[Slot]):
+    assert set(assignment.result) | set(assignment.unassigned) == {slot.id for slot in slots}
+    assert not set(assignment.result) & set(assignment.unassigned)
+    by_worker = {}
+    for slot in slots:
+        if slot.id in assignment.result:
+            worker = assignment.workers[assignment.result[slot.id]]
+            assert slot.group is None or worker.group == slot.group
+            assert worker.within_hours(slot.start, slot.end)
+            by_worker.setdefault(worker.id, []).append((slot.start, slot.end))
+    for intervals in by_worker.values():
+        intervals.sort()
+        assert all(previous[1] <= current[0] for previous, current in zip(intervals, intervals[1:]))
+
+
+def test_balances_load_between_equal_workers():
+    slots = [Slot(id=i, start=i * 60, end=i * 60 + 30, group=None) for i in range(4)]
+    workers = [Worker(id=1, group=None, windows=[(0, 600)]), Worker(id=2, group=None, windows=[(0, 600)])]
+    assignment = Assignment(slots, workers)
+    assignment.solve(0.1)
+    check(assignment, slots)
+    assert [worker.load for worker in workers] == [60, 60]
+
+
+def test_respects_department_and_hours():
+    slots = [Slot(id=1, start=540, end=600, group='massage'), Slot(id=2, start=900, end=960, group='massage'),
+             Slot(id=3, start=540, end=600, group='pool')]
+    workers = [Worker(id=1, group='massage', windows=[(480, 720)]), Worker(id=2, group='pool', windows=[(480, 1080)])]
+    assignment = Assignment(slots, workers)
+    result = assignment.solve(0.1)
+    check(assignment, slots)
+    assert result == {1: 1, 3: 2}
+    assert assignment.unassigned == [2]
+
+
+def test_existing_bookings_block_time():
+    worker = Worker(id=1, group=None, windows=[(0, 600)])
+    worker.book(60, 120)
+    slots = [Slot(id=1, start=90, end=150, group=None)]
+    assignment = Assignment(slots, [worker])
+    assert assignment.solve(0.1) == {}
+    assert assignment.unassigned == [1]
+
+
+def test_repair_moves_a_blocking_slot():
+    # Жадный проход отдает слот 1 первому сотруднику, и слот 2, который помещается только
+    # в его смену, остается без исполнителя; локальный поиск передает слот 1 второму
+    slots = [Slot(id=1, start=60, end=90, group=None), Slot(id=2, start=60, end=120, group=None)]
+    workers = [Worker(id=1, group=None, windows=[(0, 600)]), Worker(id=2, group=None, windows=[(0, 100)])]
+    assignment = Assignment(slots, workers)
+    assignment.greedy()
+    assert assignment.unassigned == [2]
+    assert assignment.repair(float('inf'))
+    check(assignment, slots)
+    assert assignment.result == {1: 2, 2: 1}
+
+
+def test_random_instances_stay_valid():
+    rng = random.Random(7)
+    groups = ['a', 'b', None]
+    slots = []
+    for i in range(300):
+        start = rng.randrange(480, 1080, 15)
+        slots.append(Slot(id=i, start=start, end=start + rng.choice((15, 30, 45)), group=rng.choice(groups)))
+    workers = [Worker(id=i, group=groups[i % 2], windows=[(480, 840), (900, 1200)]) for i in range(8)]
+    assignment = Assignment(slots, workers)
+    assignment.solve(0.2)
+    check(assignment, slots)
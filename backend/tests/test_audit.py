@@ -0,0 +1,12 @@
+from utils.audit import entry
+
+
+def test_entry_takes_facility_from_the_row():
+    assert entry('rooms', None, {'id': 1, 'id_facility': 2})['id_facility'] == 2
+    assert entry('rooms', {'id': 1, 'id_facility': 2, 'capacity': 1}, None)['id_facility'] == 2
+    # Строка переносится в другой филиал - в журнал идет новый
+    assert entry('rooms', {'id': 1, 'id_facility': 2}, {'id': 1, 'id_facility': 3})['id_facility'] == 3
+
+
+def test_entry_without_facility_column_leaves_it_to_the_session():
+    assert 'id_facility' not in entry('diagnosis', None, {'id': 1, 'name': 'x'})
@@ -0,0 +1,26 @@
+from datetime import datetime
+from sqlalchemy import text
+from crud import ChildRepository
+from models import Child, ChildDiagnosis, Order, ProcedureRecord
+from service.childs import ChildService
+from service.reports import ReportService
+
+
+def test_delete_child_cascades(session, catalog):
+    for statement in (
+            "INSERT INTO orders (id, id_child, id_parent, id_treatment_course, id_room, status, check_in_date, "
+            "check_out_date, price) VALUES (1, 1, 1, 1, 1, 'PAID', '2026-01-01', '2026-01-10', 1000)",
+            "INSERT INTO procedures (id, name, description, contraindications, frequency, duration_min) "
+            "VALUES (1, 'P1', '', '', 'ежедневно', 30)"):
+        session.execute(text(statement))
+    session.add(ProcedureRecord(id_child=1, id_procedure=1, id_order=1, procedure_time=datetime(2026, 1, 2, 9)))
+    session.commit()
+    childs = ChildService(child_repository=ChildRepository(model=Child, session=session),
+                          child_diagnosis_repository=ChildRepository(model=ChildDiagnosis, session=session),
+                          report_service=ReportService.for_session(session))
+
+    assert childs.delete_child(1) is True
+    for model in (Child, ChildDiagnosis, Order, ProcedureRecord):
+        assert session.query(model).count() == 0
+    # Родитель и справочники не затронуты
+    assert session.execute(text('SELECT count(*) FROM parents')).scalar() == 1
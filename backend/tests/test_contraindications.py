@@ -0,0 +1,52 @@
+from utils.contraindications import ContraindicationMatrix, compile_matrix, normalize_icd
+
+DIAGNOSES = [(1, 'J45'), (2, 'J45.0'), (3, 'K20'), (4, 'j45.9 ')]
+
+
+def test_normalize_icd():
+    assert normalize_icd(' j45.0 ') == 'J450'
+    assert normalize_icd(None) == ''
+
+
+def test_prefix_covers_all_descendants():
+    matrix = compile_matrix(DIAGNOSES, [(10, None, 'J45')], [])
+    assert matrix.decode(matrix.procedures[10]) == [1, 2, 4]
+
+
+def test_procedure_and_course_conflicts():
+    matrix = compile_matrix(DIAGNOSES, [(10, 3, None), (11, None, 'J45.0')], [(100, 10), (100, 11), (101, 12)])
+    child = matrix.mask([2, 3])
+    assert matrix.decode(matrix.procedure_conflicts(10, child)) == [3]
+    assert matrix.decode(matrix.procedure_conflicts(11, child)) == [2]
+    assert matrix.decode(matrix.course_conflicts(100, child)) == [2, 3]
+    assert matrix.course_conflicts(101, child) == 0
+    assert matrix.procedure_conflicts(10, matrix.mask([1, 4])) == 0
+
+
+def test_unknown_ids_do_not_conflict():
+    matrix = compile_matrix(DIAGNOSES, [(10, 99, None)], [])
+    assert matrix.mask([99]) == 0
+    assert matrix.procedure_conflicts(10, matrix.mask([1, 2, 3, 4])) == 0
+
+
+def test_matrix_rebuilds_only_when_stamp_changes():
+    builds, stamp = [], ['v1']
+    loader = lambda: (builds.append(1) or DIAGNOSES, [(10, 3, None)], [])
+    cache = ContraindicationMatrix(ttl=0)
+    first = cache.get(loader, lambda: stamp[0])
+    assert cache.get(loader, lambda: stamp[0]) is first
+    assert len(builds) == 1
+    stamp[0] = 'v2'
+    assert cache.get(loader, lambda: stamp[0]) is not first
+    assert len(builds) == 2
+
+
+def test_invalidate_forces_rebuild():
+    builds = []
+    loader = lambda: (builds.append(1) or DIAGNOSES, [], [])
+    cache = ContraindicationMatrix(ttl=300)
+    cache.get(loader)
+    cache.get(loader)
+    cache.invalidate()
+    cache.get(loader)
+    assert len(builds) == 2
@@ -0,0 +1,80 @@
+import asyncio
+import jwt
+import pytest
+from config.auth import SECRET_KEY, ALGORITHM
+from middlewares import SingleFlightMiddleware
+from models import Room
+from utils.abstract_repository import IREpository
+from utils.singleflight import SingleFlight
+
+
+@pytest.fixture
+def rooms(session, facilities):
+    repository = IREpository(model=Room, session=session)
+    repository.add({'number': '101', 'floor': 1, 'capacity': 2, 'description': 'd', 'id_facility': 1})
+    return repository
+
+
+def test_writes_are_scoped_to_facility(rooms, session):
+    session.info['facility'] = 2
+    assert rooms.get_one_filter_by(id=1) is None
+    assert rooms.update({'id': 1, 'capacity': 9, 'version': 1}) is None
+    assert rooms.delete(1, version=1) is False
+    assert rooms.update_by_filter({'id': 1}, {'capacity': 9}) == 0
+    assert rooms.delete_by_filter(id=1) is False
+    session.info['facility'] = 1
+    assert rooms.get_one_filter_by(id=1).capacity == 2
+
+
+def bearer(**claims) -> bytes:
+    return b'Bearer ' + jwt.encode({'sub': 1, **claims}, SECRET_KEY, algorithm=ALGORITHM).encode()
+
+
+def get_concurrently(*headers) -> tuple[list[bytes], SingleFlight]:
+    # Медленный обработчик: второй запрос приходит, пока первый еще выполняется
+    async def app(scope, receive, send):
+        await asyncio.sleep(0.05)
+        await send({'type': 'http.response.start', 'status': 200, 'headers': []})
+        await send({'type': 'http.response.body', 'body': dict(scope['headers'])[b'authorization']})
+
+    single_flight = SingleFlight()
+    middleware = SingleFlightMiddleware(app, single_flight, routes=(('/api/rooms', 'public'),))
+
+    async def get(request_headers):
+        body = []
+
+        async def send(message):
+            if message['type'] == 'http.response.body':
+                body.append(message['body'])
+
+        scope = {'type': 'http', 'method': 'GET', 'path': '/api/rooms', 'query_string': b'',
+                 'headers': list(request_headers)}
+        await middleware(scope, None, send)
+        return b''.join(body)
+
+    async def main():
+        return await asyncio.gather(*(get(request_headers) for request_headers in headers))
+
+    return asyncio.run(main()), single_flight
+
+
+def test_tokens_of_different_facilities_are_not_coalesced():
+    first, second = bearer(fac=1), bearer(fac=2)
+    bodies, single_flight = get_concurrently([(b'authorization', first)], [(b'authorization', second)])
+    assert bodies == [first, second]
+    assert single_flight.metrics()['/api/rooms'] == {'executed': 2, 'coalesced': 0}
+
+
+def test_same_facility_is_coalesced_on_public_route():
+    first, second = bearer(fac=1), bearer(fac=1, role='ADMIN')
+    bodies, single_flight = get_concurrently([(b'authorization', first)],
+                                             [(b'authorization', second), (b'x-facility', b'1')])
+    assert bodies == [first, first]
+    assert single_flight.metrics()['/api/rooms'] == {'executed': 1, 'coalesced': 1}
+
+
+def test_header_contradicting_token_is_not_coalesced():
+    token = bearer(fac=1)
+    _, single_flight = get_concurrently([(b'authorization', token)],
+                                        [(b'authorization', token), (b'x-facility', b'2')])
+    assert single_flight.metrics()['/api/rooms'] == {'executed': 1, 'coalesced': 0}
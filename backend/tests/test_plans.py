@@ -0,0 +1,59 @@
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy import text
+from models import ProcedureRecord
+from service.plans import PlanService
+from utils.contraindications import ContraindicationMatrix
+
+DAY = (datetime.now() + timedelta(days=3)).replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+@pytest.fixture(autouse=True)
+def order(session, catalog):
+    # Слоты ссылаются на заказ, процедуры и сотрудника
+    for statement in (
+            "INSERT INTO procedures (id, name, description, contraindications, frequency, duration_min) "
+            "VALUES (1, 'P1', '', '', 'ежедневно', 30), (2, 'P2', '', '', 'ежедневно', 30)",
+            "INSERT INTO staff (id, id_user, name, position, qualification, hire_date, department, schedule) "
+            "VALUES (7, 1, 'S', 'nurse', '', '2020-01-01', '', '')",
+            "INSERT INTO orders (id, id_child, id_parent, id_treatment_course, id_room, status, check_in_date, "
+            "check_out_date, price) VALUES (1, 1, 1, 1, 1, 'APPROVED', '2026-01-01', '2026-01-10', 1000)"):
+        session.execute(text(statement))
+    session.commit()
+
+
+def slot(id_procedure: int, hour: float) -> dict:
+    return {'id_child': 1, 'id_facility': 1, 'id_order': 1, 'id_procedure': id_procedure, 'id_staff': None,
+            'procedure_time': DAY + timedelta(hours=hour)}
+
+
+def expand(plans: PlanService, rows: list[dict]):
+    fresh = plans.replace_unassigned([1], rows)
+    plans.procedure_record_repository.add_ignore(fresh)
+    return sorted((record.id_procedure, record.procedure_time.hour + record.procedure_time.minute / 60, record.id_staff)
+                  for record in plans.procedure_record_repository.get_all_filter_by(id_order=1))
+
+
+def test_unchanged_plan_writes_nothing(session):
+    plans = PlanService.for_session(session, ContraindicationMatrix(10))
+    rows = [slot(1, 9), slot(2, 9.5)]
+    expand(plans, rows)
+    assert plans.replace_unassigned([1], rows) == []
+
+
+def test_shifted_slots_are_replaced_not_duplicated(session):
+    plans = PlanService.for_session(session, ContraindicationMatrix(10))
+    expand(plans, [slot(1, 9), slot(2, 9.5), slot(2, 13.5)])
+    session.query(ProcedureRecord).filter_by(id_procedure=1).update({'id_staff': 7})
+    session.commit()
+    # Процедура 1 стала длиннее: слоты процедуры 2 сдвигаются
+    assert expand(plans, [slot(1, 9), slot(2, 11), slot(2, 13.5)]) == [(1, 9, 7), (2, 11, None), (2, 13.5, None)]
+
+
+def test_assigned_slot_keeps_its_occurrence(session):
+    plans = PlanService.for_session(session, ContraindicationMatrix(10))
+    expand(plans, [slot(1, 9), slot(2, 9.5)])
+    session.query(ProcedureRecord).filter_by(id_procedure=2).update({'id_staff': 7})
+    session.commit()
+    # Назначенный сотруднику прием не переносится и заменяет собой сдвинутый
+    assert expand(plans, [slot(1, 9), slot(2, 10)]) == [(1, 9, None), (2, 9.5, 7)]
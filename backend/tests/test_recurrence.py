@@ -0,0 +1,49 @@
+from datetime import date, time
+import pytest
+from utils.recurrence import parse_frequency, parse_schedule, weekday
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('2 раза в день', dict(times_per_day=2)),
+    ('через день', dict(interval_days=2)),
+    ('каждые 3 дня', dict(interval_days=3)),
+    ('3 раза в неделю', dict(weekdays=frozenset({0, 2, 4}))),
+    ('пн, ср, пт', dict(weekdays=frozenset({0, 2, 4}))),
+    ('по вторникам и пятницам', dict(weekdays=frozenset({1, 4}))),
+    ('в среду', dict(weekdays=frozenset({2}))),
+    ('ежедневно, 10 процедур', dict(total=10)),
+    ('однократно', dict(total=1)),
+])
+def test_parse_frequency(text, expected):
+    recurrence = parse_frequency(text)
+    assert recurrence is not None
+    for field, value in expected.items():
+        assert getattr(recurrence, field) == value
+
+
+def test_unrecognized_frequency():
+    assert parse_frequency('по необходимости') is None
+    assert parse_frequency(None) is None
+
+
+def test_ordinary_words_are_not_weekdays():
+    # "среднем" начинается с "сред", но это не среда
+    assert parse_frequency('раз в день, в среднем 15 мин').weekdays is None
+    assert weekday('среднем') is None
+    assert weekday('вторично') is None
+    assert weekday('средам') == 2
+
+
+def test_occurrences_respect_total_and_window():
+    recurrence = parse_frequency('2 раза в день, 3 процедуры')
+    starts = recurrence.occurrences(date(2026, 11, 2), date(2026, 11, 10), time(9), time(17))
+    assert [start.isoformat() for start in starts] == ['2026-11-02T09:00:00', '2026-11-02T13:00:00',
+                                                       '2026-11-03T09:00:00']
+
+
+def test_parse_schedule():
+    assert parse_schedule('Пн-Пт 9:00-18:00') == {day: ((time(9), time(18)),) for day in range(5)}
+    assert parse_schedule('Пн, Ср 8-14; Сб 10:00-15:00') == {0: ((time(8), time(14)),), 2: ((time(8), time(14)),),
+                                                            5: ((time(10), time(15)),)}
+    assert parse_schedule('ежедневно 9-17') == {day: ((time(9), time(17)),) for day in range(7)}
+    assert parse_schedule('по договоренности') is None
@@ -0,0 +1,101 @@
+from datetime import date
+import pytest
+from crud import OrderRepository, ArchiveRepository, JobRepository
+from models import Order, OrderArchive, Job
+from service.orders import OrderService
+from service.reports import ReportService
+from service.jobs import JobService
+from sqlalchemy.orm import sessionmaker
+from utils.abstract_repository import VersionConflict
+from utils.events import EventBroker
+from utils.routing import RoutingSession
+
+
+def order_service(session) -> OrderService:
+    return OrderService(order_repository=OrderRepository(model=Order, session=session),
+                        archive_repository=ArchiveRepository(model=OrderArchive, session=session),
+                        report_service=ReportService.for_session(session),
+                        job_service=JobService(JobRepository(model=Job, session=session)),
+                        event_broker=EventBroker(buffer_size=10, queue_size=10))
+
+
+def order(**values) -> dict:
+    return {'id_child': 1, 'id_parent': 1, 'id_treatment_course': 1, 'id_room': 1, 'status': 'PAID',
+            'check_in_date': date(2026, 1, 30), 'check_out_date': date(2026, 2, 2), 'price': 1000, **values}
+
+
+def summaries(session) -> tuple:
+    reports = ReportService.for_session(session)
+    occupancy = [(row.day, row.id_room, row.guests) for row in reports.get_occupancy(date(2020, 1, 1), date(2030, 1, 1))]
+    revenue = [(row.month, row.id_treatment_course, row.orders_count, float(row.revenue))
+               for row in reports.get_revenue(date(2020, 1, 1), date(2030, 1, 1))]
+    return occupancy, revenue
+
+
+def assert_matches_rebuild(session):
+    incremental = summaries(session)
+    ReportService.for_session(session).rebuild()
+    assert summaries(session) == incremental
+
+
+@pytest.fixture
+def orders(session, catalog):
+    return order_service(session)
+
+
+def test_create(orders, session):
+    orders.create_order(order())
+    orders.create_order(order(status='PENDING', id_room=2))
+    occupancy, revenue = summaries(session)
+    assert occupancy == [(date(2026, 1, 30), 1, 1), (date(2026, 1, 31), 1, 1), (date(2026, 2, 1), 1, 1)]
+    assert revenue == [(date(2026, 1, 1), 1, 1, 1000.0)]
+    assert_matches_rebuild(session)
+
+
+def test_status_change(orders, session):
+    orders.create_order(order(status='PENDING'))
+    orders.update_order(1, {'status': 'PAID'})
+    assert summaries(session)[1] == [(date(2026, 1, 1), 1, 1, 1000.0)]
+    orders.update_order(1, {'status': 'CANCELLED'})
+    assert summaries(session) == ([], [])
+    assert_matches_rebuild(session)
+
+
+def test_date_and_room_change(orders, session):
+    orders.create_order(order())
+    orders.update_order(1, {'check_in_date': date(2026, 3, 1), 'check_out_date': date(2026, 3, 3), 'id_room': 2})
+    occupancy, revenue = summaries(session)
+    assert occupancy == [(date(2026, 3, 1), 2, 1), (date(2026, 3, 2), 2, 1)]
+    assert revenue == [(date(2026, 3, 1), 1, 1, 1000.0)]
+    assert_matches_rebuild(session)
+
+
+def test_delete(orders, session):
+    orders.create_order(order())
+    orders.create_order(order(id_treatment_course=2, price=500))
+    assert orders.delete_order(1)
+    occupancy, revenue = summaries(session)
+    assert [guests for _, _, guests in occupancy] == [1, 1, 1]
+    assert revenue == [(date(2026, 1, 1), 2, 1, 500.0)]
+    assert_matches_rebuild(session)
+
+
+def test_concurrent_update_loses_with_conflict(orders, session, engine):
+    orders.create_order(order(status='PENDING'))
+    read = orders.order_repository.get_one_filter_by
+
+    def read_then_race(**filter):
+        # Между чтением заказа и записью его успевает изменить другой запрос со своей сессией
+        found = read(**filter)
+        other = sessionmaker(class_=RoutingSession, autocommit=False, autoflush=False, bind=engine)()
+        order_service(other).update_order(1, {'status': 'PAID'})
+        other.close()
+        return found
+
+    orders.order_repository.get_one_filter_by = read_then_race
+    with pytest.raises(VersionConflict):
+        orders.update_order(1, {'status': 'APPROVED'})
+    orders.order_repository.get_one_filter_by = read
+    assert summaries(session)[1] == [(date(2026, 1, 1), 1, 1, 1000.0)]
+    assert session.query(Job).filter(Job.type == 'orders.status_changed').count() == 1
+    assert_matches_rebuild(session)
@@ -0,0 +1,49 @@
+import pytest
+from models import Room
+from utils.abstract_repository import IREpository, VersionConflict
+
+
+@pytest.fixture
+def rooms(session, facilities):
+    repository = IREpository(model=Room, session=session)
+    repository.add({'number': '101', 'floor': 1, 'capacity': 2, 'description': 'd', 'id_facility': 1})
+    return repository
+
+
+@pytest.fixture(params=[True, False], ids=['returning', 'reselect'])
+def returning(request, engine):
+    # MySQL не умеет UPDATE ... RETURNING: второй вариант проверяет перечитывание строки
+    engine.dialect.update_returning = request.param
+    yield request.param
+    engine.dialect.update_returning = True
+
+
+def test_update_returns_full_row_and_bumps_version(rooms, returning):
+    updated = rooms.update({'id': 1, 'capacity': 3, 'version': 1})
+    assert updated['capacity'] == 3
+    assert updated['number'] == '101'
+    assert updated['version'] == 2
+
+
+def test_update_without_version_still_bumps_it(rooms, returning):
+    assert rooms.update({'id': 1, 'floor': 2})['version'] == 2
+
+
+def test_stale_version_conflicts(rooms, returning):
+    rooms.update({'id': 1, 'capacity': 3, 'version': 1})
+    with pytest.raises(VersionConflict):
+        rooms.update({'id': 1, 'capacity': 4, 'version': 1})
+    assert rooms.get_one_filter_by(id=1).capacity == 3
+
+
+def test_missing_row(rooms):
+    assert rooms.update({'id': 99, 'capacity': 4, 'version': 1}) is None
+    assert rooms.delete(99) is False
+
+
+def test_delete_with_version(rooms):
+    with pytest.raises(VersionConflict):
+        rooms.delete(1, version=5)
+    assert rooms.delete(1, version=1) is True
+    assert rooms.get_one_filter_by(id=1) is None
+
@@ -1,5 +1,16 @@
 from abc import ABC, abstractmethod
 from sqlalchemy.orm import Session
+from sqlalchemy import inspect, insert, update, delete, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.dialects import mysql, sqlite, postgresql
+from utils.filters import compile_filters
+from utils.sharding import replicate, replicate_row, is_replicated, facility_of
+
+class VersionConflict(Exception):
+    def __init__(self, table: str, id: int):
+        super().__init__(f'{table} #{id} was modified concurrently')
+        self.table = table
+        self.id = id
 
 class AbstractRepository(ABC):
     @abstractmethod
@@ -31,37 +42,182 @@ class IREpository(AbstractRepository):
         self.model = model
         self.session = session
 
+    def _scoped(self, filters: dict) -> dict:
+        # Несколько филиалов могут делить один шард: запросы с X-Facility видят только свой
+        facility = facility_of(self.session)
+        if facility is not None and 'id_facility' in self.model.__table__.c:
+            filters = {**filters, 'id_facility': facility}
+        return filters
+
+    def _with_facility(self, entity: dict) -> dict:
+        facility = facility_of(self.session)
+        if facility is not None and 'id_facility' in self.model.__table__.c:
+            entity = {**entity, 'id_facility': facility}
+        return entity
+
     def get_all_filter_by(self, **filters):
-        query = self.session.query(self.model)
-        for key, value in filters.items():
-            query = query.filter(getattr(self.model, key) == value)
-        return query
+        return self.session.query(self.model).filter(*compile_filters(self.model, self._scoped(filters)))
 
     def get_one_filter_by(self, **filter):
-        return self.session.query(self.model).filter_by(**filter).first()
+        return self.session.query(self.model).filter(*compile_filters(self.model, self._scoped(filter))).first()
 
     def add(self, entity: dict):
-        entity = self.model(**entity)
+        entity = self.model(**self._with_facility(entity))
         self.session.add(entity)
+        if is_replicated(self.session, self.model):
+            self.session.flush()
+            replicate_row(self.session, entity)
         self.session.commit()
         self.session.refresh(entity)
         return entity
 
-    def update(self, entity: dict):
-        self.session.query(self.model).filter_by(id=entity['id']).update(entity)
-        self.session.commit()
-        return entity
+    def add_all(self, entities: list[dict], commit: bool = True):
+        # Один многострочный INSERT вместо add() с коммитом на каждую строку
+        if entities:
+            stmt = insert(self.model).values([self._with_facility(entity) for entity in entities])
+            self.session.execute(stmt)
+            replicate(self.session, self.model, stmt)
+        if commit:
+            self.session.commit()
+        return len(entities)
 
-    def delete(self, id: int):
-        self.session.query(self.model).filter_by(id=id).delete()
-        self.session.commit()
+    def add_ignore(self, entities: list[dict], commit: bool = True):
+        # INSERT IGNORE / ON CONFLICT DO NOTHING: строки, нарушающие уникальность, пропускаются.
+        # Строки передаются параметрами executemany: запрос компилируется один раз на любую пачку
+        if not entities:
+            return 0
+        table = self.model.__table__
+        dialect = self.session.get_bind().dialect.name
+        if dialect == 'mysql':
+            stmt = mysql.insert(table).prefix_with('IGNORE')
+        else:
+            stmt = (postgresql if dialect == 'postgresql' else sqlite).insert(table).on_conflict_do_nothing()
+        result = self.session.execute(stmt, entities)
+        if is_replicated(self.session, self.model):
+            replicate(self.session, self.model, stmt.values(entities))
+        if commit:
+            self.session.commit()
+        return result.rowcount
 
-    def update_by_filter(self, filters: dict, updates: dict):
-        result = self.session.query(self.model).filter_by(**filters).update(updates)
-        self.session.commit()
+    def _conflict_or_missing(self, id: int, version: int | None):
+        # Вызывается только когда UPDATE/DELETE не затронул ни одной строки
+        if version is not None and self.session.query(self.model.id) \
+                .filter(*compile_filters(self.model, self._scoped({'id': id}))).first():
+            raise VersionConflict(self.model.__tablename__, id)
+
+    def update(self, entity: dict, commit: bool = True):
+        # Один UPDATE ... WHERE id=? [AND version=?]; None, если строки нет или она чужого филиала
+        values = dict(entity)
+        id = values.pop('id')
+        version = values.pop('version', None)
+        versioned = 'version' in self.model.__table__.c
+
+        stmt = update(self.model).where(*compile_filters(self.model, self._scoped({'id': id})))
+        if versioned:
+            if version is not None:
+                stmt = stmt.where(self.model.version == version)
+            values['version'] = self.model.version + 1
+        stmt = stmt.values(**values).execution_options(synchronize_session=False)
+        replicated = stmt
+
+        returning = self.session.get_bind().dialect.update_returning
+        if returning:
+            stmt = stmt.returning(*self.model.__table__.c)
+        result = self.session.execute(stmt)
+        row = result.mappings().first() if returning else None
+        missing = row is None if returning else result.rowcount == 0
+        if missing:
+            self.session.rollback()
+            self._conflict_or_missing(id, version)
+            return None
+        replicate(self.session, self.model, replicated)
+        if commit:
+            self.session.commit()
+
+        if row is None:
+            # Без UPDATE ... RETURNING (MySQL) строка перечитывается по id: ответ содержит все колонки и новую version
+            row = self.session.execute(select(*self.model.__table__.c).where(self.model.id == id)).mappings().first()
+        return dict(row)
+
+    def delete(self, id: int, version: int | None = None, commit: bool = True):
+        stmt = delete(self.model).where(*compile_filters(self.model, self._scoped({'id': id})))
+        if version is not None and 'version' in self.model.__table__.c:
+            stmt = stmt.where(self.model.version == version)
+        try:
+            result = self.session.execute(stmt.execution_options(synchronize_session=False))
+        except IntegrityError:
+            # На строку ссылаются записи без каскада (например, заказы на курс)
+            self.session.rollback()
+            raise
+        if result.rowcount == 0:
+            self.session.rollback()
+            self._conflict_or_missing(id, version)
+            return False
+        replicate(self.session, self.model, stmt)
+        if commit:
+            self.session.commit()
+        return True
+
+    def update_by_filter(self, filters: dict, updates: dict, commit: bool = True):
+        filters = self._scoped(filters)
+        result = self.session.query(self.model).filter(*compile_filters(self.model, filters)) \
+            .update(updates, synchronize_session=False)
+        replicate(self.session, self.model,
+                  update(self.model).where(*compile_filters(self.model, filters)).values(updates))
+        if commit:
+            self.session.commit()
         return result
 
-    def delete_by_filter(self, **filter):
-        result = self.session.query(self.model).filter_by(**filter).delete()
-        self.session.commit()
+    def delete_by_filter(self, commit: bool = True, **filter):
+        filter = self._scoped(filter)
+        result = self.session.query(self.model).filter(*compile_filters(self.model, filter)).delete()
+        replicate(self.session, self.model, delete(self.model).where(*compile_filters(self.model, filter)))
+        if commit:
+            self.session.commit()
         return result > 0
+
+    def upsert(self, entities: list[dict], increment: bool = False, commit: bool = True):
+        # INSERT ... ON DUPLICATE KEY UPDATE / ON CONFLICT DO UPDATE по первичному ключу.
+        # increment=True прибавляет значения к существующей строке вместо замены
+        if not entities:
+            return 0
+        table = self.model.__table__
+        keys = [column.name for column in inspect(self.model).primary_key]
+        values = [key for key in entities[0] if key not in keys]
+
+        dialect = self.session.get_bind().dialect.name
+        if dialect == 'mysql':
+            stmt = mysql.insert(table).values(entities)
+            new = stmt.inserted
+        else:
+            stmt = (postgresql if dialect == 'postgresql' else sqlite).insert(table).values(entities)
+            new = stmt.excluded
+
+        updates = {key: table.c[key] + new[key] if increment else new[key] for key in values}
+        if dialect == 'mysql':
+            stmt = stmt.on_duplicate_key_update(updates)
+        else:
+            stmt = stmt.on_conflict_do_update(index_elements=keys, set_=updates)
+
+        result = self.session.execute(stmt)
+        replicate(self.session, self.model, stmt)
+        if commit:
+            self.session.commit()
+        return result.rowcount
+
+    def move_to(self, target_model, filters: dict, limit: int):
+        # Переносит до limit строк в таблицу с теми же колонками: INSERT ... SELECT и DELETE по
+        # одному списку id в одной транзакции, так что строка не теряется и не дублируется
+        ids = [row.id for row in self.session.query(self.model.id)
+               .filter(*compile_filters(self.model, filters)).order_by(self.model.id).limit(limit)]
+        if not ids:
+            return 0
+        columns = [column.name for column in target_model.__table__.c]
+        source = self.model.__table__.c
+        self.session.execute(insert(target_model).from_select(
+            columns, select(*[source[column] for column in columns]).where(self.model.id.in_(ids))))
+        # Перенос в архив не меняет данные, поэтому в журнал аудита не пишется
+        self.session.execute(delete(self.model).where(self.model.id.in_(ids))
+                             .execution_options(synchronize_session=False, audit=False))
+        self.session.commit()
+        return len(ids)
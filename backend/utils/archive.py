@@ -0,0 +1,52 @@
+from datetime import date, datetime, timedelta
+from utils.enums import OrderStatus
+from utils.filters import split_filter
+
+ARCHIVED_ORDER_STATUSES = {OrderStatus.COMPLETED, OrderStatus.CANCELLED}
+
+
+def horizon(days: int) -> date:
+    # Все, что в архиве, старше этой даты. Граница только сдвигается вперед, поэтому
+    # запрос, начинающийся не раньше нее, гарантированно обходится горячей таблицей
+    return date.today() - timedelta(days=days)
+
+
+def as_date(value) -> date | None:
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    try:
+        return datetime.fromisoformat(str(value)).date()
+    except ValueError:
+        return None
+
+
+def lower_bound(filters: dict, columns: tuple[str, ...]) -> date | None:
+    bound = None
+    for key, value in filters.items():
+        name, operator = split_filter(key)
+        if name not in columns or operator not in ('eq', 'gt', 'gte', 'in'):
+            continue
+        values = [as_date(item) for item in value] if operator == 'in' else [as_date(value)]
+        if not values or None in values:
+            continue
+        bound = max(bound or min(values), min(values))
+    return bound
+
+
+def reaches_archive(filters: dict, columns: tuple[str, ...], days: int) -> bool:
+    bound = lower_bound(filters, columns)
+    return bound is None or bound < horizon(days)
+
+
+def may_be_archived_order(filters: dict) -> bool:
+    for key, value in filters.items():
+        name, operator = split_filter(key)
+        if name != 'status':
+            continue
+        if operator == 'eq' and value not in ARCHIVED_ORDER_STATUSES:
+            return False
+        if operator == 'in' and not ARCHIVED_ORDER_STATUSES.intersection(value):
+            return False
+    return True
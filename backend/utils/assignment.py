@@ -0,0 +1,159 @@
+import heapq
+import time
+from bisect import bisect_left, insort
+from collections import defaultdict
+from dataclasses import dataclass, field
+
+# Время везде - минуты от начала дня: сравнение целых чисел дешевле datetime на тысячах слотов
+
+
+@dataclass
+class Slot:
+    id: int
+    start: int
+    end: int
+    group: str | None # Отдел процедуры; None - подходит любой сотрудник
+
+
+@dataclass
+class Worker:
+    id: int
+    group: str | None
+    windows: list[tuple[int, int]] # Рабочие интервалы в этот день
+    busy: list[tuple[int, int]] = field(default_factory=list) # Отсортированные занятые интервалы
+    load: int = 0 # Занятые минуты, включая записи, назначенные раньше
+
+    def within_hours(self, start: int, end: int) -> bool:
+        return any(window_start <= start and end <= window_end for window_start, window_end in self.windows)
+
+    def conflicts(self, start: int, end: int) -> list[tuple[int, int]]:
+        i = bisect_left(self.busy, (start, start))
+        found = []
+        if i > 0 and self.busy[i - 1][1] > start:
+            found.append(self.busy[i - 1])
+        while i < len(self.busy) and self.busy[i][0] < end:
+            found.append(self.busy[i])
+            i += 1
+        return found
+
+    def fits(self, start: int, end: int) -> bool:
+        return self.within_hours(start, end) and not self.conflicts(start, end)
+
+    def book(self, start: int, end: int):
+        insort(self.busy, (start, end))
+        self.load += end - start
+
+    def release(self, start: int, end: int):
+        self.busy.remove((start, end))
+        self.load -= end - start
+
+
+class Assignment:
+    # Жадное назначение по очереди с приоритетом (наименее загруженный подходящий сотрудник),
+    # затем локальный поиск в пределах бюджета времени: перенос слотов с самых загруженных
+    # на менее загруженных и освобождение места для неназначенных сдвигом одного соседа
+    def __init__(self, slots: list[Slot], workers: list[Worker]):
+        self.slots = {slot.id: slot for slot in slots}
+        self.workers = {worker.id: worker for worker in workers}
+        self.groups: dict[str | None, list[Worker]] = defaultdict(list)
+        for worker in workers:
+            self.groups[worker.group].append(worker)
+        self.result: dict[int, int] = {}
+        self.unassigned: list[int] = []
+
+    def candidates(self, slot: Slot) -> list[Worker]:
+        return list(self.workers.values()) if slot.group is None else self.groups.get(slot.group, [])
+
+    def place(self, slot: Slot, worker: Worker):
+        worker.book(slot.start, slot.end)
+        self.result[slot.id] = worker.id
+
+    def unplace(self, slot: Slot):
+        self.workers[self.result.pop(slot.id)].release(slot.start, slot.end)
+
+    def greedy(self):
+        # Сначала слоты с самым узким выбором сотрудников, внутри - по времени
+        order = sorted(self.slots.values(), key=lambda slot: (len(self.candidates(slot)), slot.start, slot.id))
+        heaps: dict[str | None, list] = {}
+        for slot in order:
+            key = slot.group
+            if key not in heaps:
+                heaps[key] = [(worker.load, worker.id) for worker in self.candidates(slot)]
+                heapq.heapify(heaps[key])
+            heap, skipped, chosen = heaps[key], [], None
+            while heap:
+                load, id = heapq.heappop(heap)
+                worker = self.workers[id]
+                if load != worker.load:
+                    heapq.heappush(heap, (worker.load, id)) # Устаревшая запись: нагрузку изменил другой слот
+                    continue
+                if worker.fits(slot.start, slot.end):
+                    chosen = worker
+                    break
+                skipped.append((load, id))
+            for item in skipped:
+                heapq.heappush(heap, item)
+            if chosen is None:
+                self.unassigned.append(slot.id)
+                continue
+            self.place(slot, chosen)
+            heapq.heappush(heap, (chosen.load, chosen.id))
+
+    def rebalance(self, deadline: float) -> bool:
+        improved = False
+        for slot_id in sorted(self.result, key=lambda id: -self.workers[self.result[id]].load):
+            if time.perf_counter() > deadline:
+                break
+            slot = self.slots[slot_id]
+            current = self.workers[self.result[slot_id]]
+            duration = slot.end - slot.start
+            best = min((worker for worker in self.candidates(slot)
+                        if worker.load + duration < current.load and worker.fits(slot.start, slot.end)),
+                       key=lambda worker: worker.load, default=None)
+            if best is not None:
+                self.unplace(slot)
+                self.place(slot, best)
+                improved = True
+        return improved
+
+    def repair(self, deadline: float) -> bool:
+        # Неназначенный слот встает к сотруднику, у которого мешает ровно один слот,
+        # если этот слот удается передать кому-то еще
+        improved = False
+        by_interval = defaultdict(list)
+        for slot_id, worker_id in self.result.items():
+            slot = self.slots[slot_id]
+            by_interval[(worker_id, slot.start, slot.end)].append(slot_id)
+        for slot_id in list(self.unassigned):
+            if time.perf_counter() > deadline:
+                break
+            slot = self.slots[slot_id]
+            for worker in self.candidates(slot):
+                if not worker.within_hours(slot.start, slot.end):
+                    continue
+                blocking = worker.conflicts(slot.start, slot.end)
+                if len(blocking) != 1 or not by_interval.get((worker.id, *blocking[0])):
+                    continue
+                other = self.slots[by_interval[(worker.id, *blocking[0])][0]]
+                target = next((candidate for candidate in self.candidates(other) if candidate is not worker
+                               and candidate.fits(other.start, other.end)), None)
+                if target is None:
+                    continue
+                by_interval[(worker.id, other.start, other.end)].remove(other.id)
+                self.unplace(other)
+                self.place(other, target)
+                by_interval[(target.id, other.start, other.end)].append(other.id)
+                self.place(slot, worker)
+                by_interval[(worker.id, slot.start, slot.end)].append(slot.id)
+                self.unassigned.remove(slot_id)
+                improved = True
+                break
+        return improved
+
+    def solve(self, budget: float) -> dict[int, int]:
+        deadline = time.perf_counter() + budget
+        self.greedy()
+        while time.perf_counter() < deadline:
+            if not (self.repair(deadline) | self.rebalance(deadline)):
+                break
+        return self.result
@@ -0,0 +1,303 @@
+import asyncio
+import json
+import logging
+import os
+import threading
+from collections import deque
+from datetime import date, datetime, time
+from decimal import Decimal
+from enum import Enum
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import event, insert, select, inspect, func
+from sqlalchemy.orm import Session, ORMExecuteState
+from sqlalchemy.sql.elements import BindParameter
+from utils.enums import AuditAction
+
+logger = logging.getLogger('uvicorn.error')
+
+
+def statement_rows(stmt) -> list[dict]:
+    # Литеральные значения из .values(); выражения вроде version + 1 в журнал не попадают
+    if getattr(stmt, '_multi_values', None):
+        raw = [row for group in stmt._multi_values for row in group]
+    else:
+        raw = [getattr(stmt, '_values', None) or {}]
+    rows = []
+    for values in raw:
+        row = {}
+        for key, value in values.items():
+            if isinstance(value, BindParameter):
+                value = value.value
+            elif hasattr(value, '__clause_element__') or hasattr(value, 'compile'):
+                continue
+            row[getattr(key, 'name', key)] = value
+        rows.append(row)
+    return rows
+
+
+def plain(value):
+    # То же, что jsonable_encoder для значений колонок, но без его обхода типов: при массовой
+    # вставке (план процедур) на тысячах строк разница заметна
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, Enum):
+        return value.value
+    return value
+
+
+def diff(before: dict | None, after: dict | None) -> dict:
+    keys = (before or after).keys() | (after or {}).keys()
+    changes = {}
+    for key in keys:
+        if key == 'version':
+            continue
+        old, new = (before or {}).get(key), (after or {}).get(key)
+        if before is None or after is None or (key in after and old != new):
+            changes[key] = [plain(old), plain(new)]
+    return changes
+
+
+def entry(entity: str, before: dict | None, after: dict | None) -> dict | None:
+    action = AuditAction.CREATE if before is None else AuditAction.DELETE if after is None else AuditAction.UPDATE
+    changes = diff(before, after)
+    if action == AuditAction.UPDATE and not changes:
+        return None
+    item = {'entity': entity, 'entity_id': (before or after).get('id'), 'action': action.value, 'changes': changes}
+    row = after or before
+    if 'id_facility' in row:
+        # Филиал самой строки: запрос сети без X-Facility или с другим филиалом не должен его подменять
+        item['id_facility'] = row['id_facility']
+    return item
+
+
+def object_row(obj, committed: bool = False) -> dict:
+    state = inspect(obj)
+    row = {}
+    for attr in state.mapper.column_attrs:
+        history = state.attrs[attr.key].history
+        if committed and history.deleted:
+            row[attr.key] = history.deleted[0]
+        else:
+            row[attr.key] = getattr(obj, attr.key)
+    return row
+
+
+def cascade_entries(session, table, where, tables: set[str], seen: set) -> list[dict]:
+    # Строки журналируемых таблиц, которые СУБД удалит (ON DELETE CASCADE) или обнулит
+    # (ON DELETE SET NULL) вслед за строками table по условию where. Путь до них строится
+    # вложенными подзапросами без чтения промежуточных таблиц; один SELECT на журналируемую таблицу
+    entries = []
+    for child in table.metadata.sorted_tables:
+        for fk in child.foreign_keys:
+            ondelete = (fk.ondelete or '').upper()
+            if fk.column.table is not table or ondelete not in ('CASCADE', 'SET NULL'):
+                continue
+            child_where = fk.parent.in_(select(fk.column).where(where))
+            if child.name in tables:
+                for row in session.execute(select(*child.c).where(child_where)).mappings():
+                    if (child.name, row['id']) in seen:
+                        continue
+                    seen.add((child.name, row['id']))
+                    row = dict(row)
+                    entries.append(entry(child.name, row, None if ondelete == 'CASCADE' else {**row, fk.parent.name: None}))
+            if ondelete == 'CASCADE':
+                entries.extend(cascade_entries(session, child, child_where, tables, seen))
+    return entries
+
+
+def audit_cascade(session, table, where, tables: tuple[str, ...]):
+    # Каскады выполняет СУБД, и события ORM их не видят: зависимые строки читаются до удаления
+    # и уходят в журнал вместе с ним. Откат транзакции отбрасывает их (см. track_changes)
+    session.info['primary'] = True
+    session.info.setdefault('audit', []).extend(cascade_entries(session, table, where, set(tables), set()))
+
+
+def track_changes(buffer: 'AuditBuffer', tables: tuple[str, ...]):
+    # Изменения копятся в session.info до коммита: откаченная транзакция в журнал не попадает
+    tables = set(tables)
+
+    def pending(session: Session) -> list:
+        return session.info.setdefault('audit', [])
+
+    @event.listens_for(Session, 'do_orm_execute')
+    def capture_statement(state: ORMExecuteState):
+        # Цена журнала: UPDATE/DELETE журналируемой таблицы предваряется SELECT по тому же условию
+        # (состояние "до"), многострочный INSERT без id - двумя SELECT вокруг него (см. ниже).
+        # Остальные таблицы и SELECT идут без лишних запросов
+        if not (state.is_update or state.is_delete or state.is_insert):
+            return
+        stmt = state.statement
+        table = stmt.table
+        if table.name not in tables or not state.execution_options.get('audit', True):
+            return
+        values = statement_rows(stmt)
+        if state.is_insert and not any(values):
+            # executemany: строки пришли параметрами, а не через .values()
+            params = state.parameters
+            values = [dict(row) for row in params] if isinstance(params, list) else [dict(params or {})]
+        if state.is_insert and not any(values):
+            return
+        session = state.session
+        # Состояние "до" читается с primary в той же транзакции, что и запись
+        session.info['primary'] = True
+        if state.is_insert:
+            ids = [row.get('id') for row in values]
+            if not ids or None in ids:
+                return inserted_rows(state, session, table)
+            where = table.c.id.in_(ids)
+        else:
+            where = stmt.whereclause
+        before = {}
+        if where is not None:
+            rows = session.execute(select(*table.c).where(where).execution_options(audit=False))
+            before = {row['id']: dict(row) for row in rows.mappings()}
+        entries = pending(session)
+        if state.is_insert:
+            for row in values:
+                old = before.get(row.get('id'))
+                entries.append(entry(table.name, old, {**(old or {}), **row}))
+        else:
+            for id, old in before.items():
+                entries.append(entry(table.name, old, None if state.is_delete else {**old, **values[0]}))
+
+    def inserted_rows(state: ORMExecuteState, session: Session, table):
+        # id назначает СУБД (add_all, add_ignore): запрос выполняется здесь, и в журнал идут строки
+        # с id больше прежнего максимума. В транзакции REPEATABLE READ (MySQL по умолчанию) чужие
+        # вставки после первого чтения не видны, а пропущенные INSERT IGNORE строки не попадают
+        last = session.execute(select(func.max(table.c.id)).execution_options(audit=False)).scalar() or 0
+        result = state.invoke_statement()
+        rows = session.execute(select(*table.c).where(table.c.id > last).order_by(table.c.id)
+                               .execution_options(audit=False)).mappings()
+        pending(session).extend(entry(table.name, None, dict(row)) for row in rows)
+        return result
+
+    @event.listens_for(Session, 'after_flush')
+    def capture_flush(session: Session, flush_context):
+        # Объекты, записанные через session.add / изменение атрибутов
+        entries = pending(session)
+        for obj in session.new:
+            if obj.__table__.name in tables:
+                entries.append(entry(obj.__table__.name, None, object_row(obj)))
+        for obj in session.dirty:
+            if obj.__table__.name in tables and session.is_modified(obj):
+                entries.append(entry(obj.__table__.name, object_row(obj, committed=True), object_row(obj)))
+        for obj in session.deleted:
+            if obj.__table__.name in tables:
+                entries.append(entry(obj.__table__.name, object_row(obj, committed=True), None))
+
+    @event.listens_for(Session, 'after_commit')
+    def push(session: Session):
+        entries = [item for item in session.info.pop('audit', []) if item is not None]
+        if entries:
+            now = datetime.now()
+            # Филиал сессии - только для таблиц без своего id_facility (справочники, учетные записи)
+            buffer.append([{**item, 'created_at': now, 'id_user': session.info.get('actor'),
+                            'id_facility': item.get('id_facility', session.info.get('facility'))}
+                           for item in entries])
+
+    @event.listens_for(Session, 'after_rollback')
+    def discard(session: Session):
+        session.info.pop('audit', None)
+
+
+class AuditBuffer:
+    # Буфер записи журнала: коммиты только добавляют строки в память, в audit_log они уходят
+    # одним INSERT по набору batch_size или раз в interval. Не записанное при остановке
+    # сохраняется в файл и дописывается при следующем старте
+    def __init__(self, model, batch_size: int, interval: float, max_size: int, spill_path: str):
+        self.model = model
+        self.batch_size = batch_size
+        self.interval = interval
+        self.max_size = max_size
+        self.spill_path = spill_path
+        self.entries: deque[dict] = deque()
+        self.lock = threading.Lock()
+        self.session_factory = None
+        self.loop: asyncio.AbstractEventLoop | None = None
+        self.wakeup: asyncio.Event | None = None
+        self.task: asyncio.Task | None = None
+
+    def append(self, entries: list[dict]):
+        with self.lock:
+            self.entries.extend(entries)
+            size = len(self.entries)
+        if size > self.max_size:
+            self.spill()
+        elif size >= self.batch_size and self.loop is not None and not self.loop.is_closed():
+            self.loop.call_soon_threadsafe(self.wakeup.set)
+
+    def take(self) -> list[dict]:
+        with self.lock:
+            return [self.entries.popleft() for _ in range(min(self.batch_size, len(self.entries)))]
+
+    def flush(self) -> int:
+        written = 0
+        while batch := self.take():
+            session = self.session_factory()
+            session.info['primary'] = True
+            try:
+                session.execute(insert(self.model).values(batch))
+                session.commit()
+            except Exception as e:
+                # Пачка возвращается в начало буфера и уйдет при следующем сбросе
+                session.rollback()
+                with self.lock:
+                    self.entries.extendleft(reversed(batch))
+                logger.warning('Audit flush failed, %s entries kept in memory: %s', len(self.entries), e)
+                break
+            finally:
+                session.close()
+            written += len(batch)
+        return written
+
+    def spill(self):
+        with self.lock:
+            entries, self.entries = list(self.entries), deque()
+        if not entries:
+            return
+        # Одна запись на весь сброс: в режиме 'a' строки соседних воркеров не перемешиваются
+        data = ''.join(json.dumps(jsonable_encoder(item), ensure_ascii=False) + '\n' for item in entries)
+        with open(self.spill_path, 'a', encoding='utf-8') as f:
+            f.write(data)
+        logger.warning('Audit buffer spilled %s entries to %s', len(entries), self.spill_path)
+
+    def restore(self):
+        # Файл общий для всех воркеров: его забирает тот, чье атомарное переименование прошло первым,
+        # остальные получают FileNotFoundError. Новые сбросы в это время пишут уже в новый файл
+        claimed = f'{self.spill_path}.{os.getpid()}'
+        try:
+            os.replace(self.spill_path, claimed)
+        except FileNotFoundError:
+            return
+        with open(claimed, encoding='utf-8') as f:
+            entries = [json.loads(line) for line in f if line.strip()]
+        for item in entries:
+            item['created_at'] = datetime.fromisoformat(item['created_at'])
+        with self.lock:
+            self.entries.extendleft(reversed(entries))
+        os.remove(claimed)
+
+    async def run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self.wakeup.wait(), self.interval)
+            except asyncio.TimeoutError:
+                pass
+            self.wakeup.clear()
+            await asyncio.to_thread(self.flush)
+
+    def start(self, session_factory):
+        self.session_factory = session_factory
+        self.loop = asyncio.get_running_loop()
+        self.wakeup = asyncio.Event()
+        self.restore()
+        self.task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+            await asyncio.gather(self.task, return_exceptions=True)
+        await asyncio.to_thread(self.flush)
+        self.spill()
@@ -0,0 +1,114 @@
+import threading
+import time
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from typing import Callable
+
+
+def normalize_icd(code: str | None) -> str:
+    # "j45.0 " -> "J450": точки и регистр в справочнике не согласованы
+    return (code or '').upper().replace('.', '').strip()
+
+
+@dataclass
+class CompiledMatrix:
+    # Столбцы - диагнозы справочника (номер бита), строки - процедуры и курсы:
+    # маска строки - множество противопоказанных диагнозов. Проверка - одно побитовое И
+    bits: dict[int, int] = field(default_factory=dict) # id диагноза -> номер бита
+    diagnoses: list[int] = field(default_factory=list) # номер бита -> id диагноза
+    procedures: dict[int, int] = field(default_factory=dict)
+    courses: dict[int, int] = field(default_factory=dict)
+
+    def mask(self, ids_diagnoses) -> int:
+        result = 0
+        for id in ids_diagnoses:
+            bit = self.bits.get(id)
+            if bit is not None:
+                result |= 1 << bit
+        return result
+
+    def procedure_conflicts(self, id_procedure: int, mask: int) -> int:
+        return self.procedures.get(id_procedure, 0) & mask
+
+    def course_conflicts(self, id_course: int, mask: int) -> int:
+        return self.courses.get(id_course, 0) & mask
+
+    def decode(self, mask: int) -> list[int]:
+        # Только для ответа клиенту: какие именно диагнозы мешают
+        result = []
+        while mask:
+            low = mask & -mask
+            result.append(self.diagnoses[low.bit_length() - 1])
+            mask ^= low
+        return sorted(result)
+
+
+def compile_matrix(diagnoses: list[tuple[int, str]], links: list[tuple[int, int | None, str | None]],
+                   course_procedures: list[tuple[int, int]]) -> CompiledMatrix:
+    matrix = CompiledMatrix()
+    # Биты нумеруются по отсортированным кодам МКБ: диагнозы с общим префиксом занимают
+    # непрерывный диапазон бит, и маска префикса строится одним сдвигом после двух bisect
+    codes = sorted((normalize_icd(code), id) for id, code in diagnoses)
+    keys = [code for code, _ in codes]
+    for _, id in codes:
+        matrix.bits[id] = len(matrix.diagnoses)
+        matrix.diagnoses.append(id)
+    for id_procedure, id_diagnosis, icd_prefix in links:
+        mask = 0
+        if id_diagnosis in matrix.bits:
+            mask |= 1 << matrix.bits[id_diagnosis]
+        prefix = normalize_icd(icd_prefix)
+        if prefix:
+            start, end = bisect_left(keys, prefix), bisect_left(keys, prefix + '\uffff')
+            mask |= ((1 << (end - start)) - 1) << start
+        matrix.procedures[id_procedure] = matrix.procedures.get(id_procedure, 0) | mask
+    for id_course, id_procedure in course_procedures:
+        matrix.courses[id_course] = matrix.courses.get(id_course, 0) | matrix.procedures.get(id_procedure, 0)
+    return matrix
+
+
+class ContraindicationMatrix:
+    # Матрица собирается лениво из справочников. Запись в справочники на этом воркере
+    # сбрасывает ее сразу; раз в ttl секунд сверяется отпечаток справочников (stamper), и
+    # пересборка идет, только если он изменился, - так правки других воркеров видны через ttl
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self.compiled: CompiledMatrix | None = None
+        self.compiled_at = 0.0
+        self.stamp = None
+        self.lock = threading.Lock()
+        self.builds = 0
+        self.checks = 0
+        self.generation = 0
+
+    def get(self, loader: Callable[[], tuple], stamper: Callable[[], tuple] | None = None) -> CompiledMatrix:
+        now = time.monotonic()
+        compiled = self.compiled
+        if compiled is not None and now - self.compiled_at < self.ttl:
+            return compiled
+        with self.lock:
+            if self.compiled is not None and now - self.compiled_at < self.ttl:
+                return self.compiled
+            generation = self.generation
+            stamp = stamper() if stamper is not None else None
+            self.checks += 1
+            if self.compiled is not None and stamp is not None and stamp == self.stamp:
+                self.compiled_at = now
+                return self.compiled
+            compiled = compile_matrix(*loader())
+            self.builds += 1
+            # Справочник изменился, пока матрица собиралась: результат годится для этого запроса, но не кешируется
+            if generation == self.generation:
+                self.compiled, self.compiled_at, self.stamp = compiled, now, stamp
+            return compiled
+
+    def invalidate(self):
+        self.generation += 1
+        self.compiled = None
+
+    def metrics(self) -> dict:
+        compiled = self.compiled
+        return {'builds': self.builds, 'checks': self.checks,
+                'diagnoses': len(compiled.diagnoses) if compiled else 0,
+                'procedures': sum(1 for mask in compiled.procedures.values() if mask) if compiled else 0,
+                'courses': sum(1 for mask in compiled.courses.values() if mask) if compiled else 0}
@@ -0,0 +1,81 @@
+import asyncio
+import hashlib
+import json
+import multiprocessing
+import os
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from jinja2 import Environment, FileSystemLoader, select_autoescape
+
+try:
+    import weasyprint
+except ImportError:
+    weasyprint = None
+
+TEMPLATES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'templates')
+MEDIA_TYPES = {'html': 'text/html; charset=utf-8', 'pdf': 'application/pdf'}
+
+_environment = None
+
+
+def environment() -> Environment:
+    global _environment
+    if _environment is None:
+        _environment = Environment(loader=FileSystemLoader(TEMPLATES_DIR), autoescape=select_autoescape())
+    return _environment
+
+
+def render_html(template: str, data: dict) -> bytes:
+    return environment().get_template(template).render(**data).encode()
+
+
+def render_pdf(template: str, data: dict) -> bytes:
+    html = render_html(template, data).decode()
+    return weasyprint.HTML(string=html, base_url=TEMPLATES_DIR).write_pdf()
+
+
+def render(format: str, template: str, data: dict) -> bytes:
+    # Выполняется в процессе пула: только данные на входе, только байты на выходе
+    return render_pdf(template, data) if format == 'pdf' else render_html(template, data)
+
+
+def fingerprint(data: dict) -> str:
+    return hashlib.blake2b(json.dumps(data, sort_keys=True, default=str).encode(), digest_size=16).hexdigest()
+
+
+def pdf_available() -> bool:
+    return weasyprint is not None
+
+
+class DocumentRenderer:
+    # Кеш хранит последний документ по ключу вместе с отпечатком данных, из которых он собран:
+    # пока данные те же, повторный рендеринг не нужен
+    def __init__(self, processes: int, cache_size: int):
+        self.processes = processes
+        self.cache_size = cache_size
+        self.cache: OrderedDict[tuple, tuple[str, bytes]] = OrderedDict()
+        self.pool: ProcessPoolExecutor | None = None
+
+    def executor(self) -> ProcessPoolExecutor:
+        if self.pool is None:
+            self.pool = ProcessPoolExecutor(max_workers=self.processes, mp_context=multiprocessing.get_context('spawn'))
+        return self.pool
+
+    async def render(self, key, format: str, template: str, data: dict) -> tuple[bytes, str]:
+        digest = fingerprint(data)
+        cached = self.cache.get((key, format))
+        if cached is not None and cached[0] == digest:
+            self.cache.move_to_end((key, format))
+            return cached[1], digest
+
+        content = await asyncio.get_running_loop().run_in_executor(self.executor(), render, format, template, data)
+        self.cache[(key, format)] = (digest, content)
+        self.cache.move_to_end((key, format))
+        if len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+        return content, digest
+
+    def shutdown(self):
+        if self.pool is not None:
+            self.pool.shutdown(cancel_futures=True)
+            self.pool = None
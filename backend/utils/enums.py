@@ -5,6 +5,10 @@ class Status(Enum):
     FAILED = 'FAILED'
     NOT_FOUND = 'NOT_FOUND'
     UNAUTHORIZED = 'UNAUTHORIZED'
+    CONFLICT = 'CONFLICT'
+    TOO_MANY_REQUESTS = 'TOO_MANY_REQUESTS'
+    OVERLOADED = 'OVERLOADED'
+    CONTRAINDICATED = 'CONTRAINDICATED'
 
 class AuthStatus(Enum):
     SUCCESS = 'SUCCESS'
@@ -21,6 +25,8 @@ class AuthStatus(Enum):
     TOKEN_EXPIRED = 'TOKEN_EXPIRED'
     USER_NOT_FOUND = 'USER_NOT_FOUND'
     FORBIDDEN = 'FORBIDDEN'
+    TOKEN_REVOKED = 'TOKEN_REVOKED'
+    TOKEN_REUSED = 'TOKEN_REUSED'
 
 class Roles(Enum):
     ADMIN = 'ADMIN'
@@ -36,6 +42,16 @@ class OrderStatus(StrEnum):
     COMPLETED = 'COMPLETED'
     CANCELLED = 'CANCELLED'
 
+class JobStatus(StrEnum):
+    PENDING = 'PENDING'
+    RUNNING = 'RUNNING'
+    DONE = 'DONE'
+    FAILED = 'FAILED'
+
+class DocumentFormat(StrEnum):
+    PDF = 'pdf'
+    HTML = 'html'
+
 class BloodType(StrEnum):
     FIRST_POSITIVE = '1+'
     FIRST_NEGATIVE = '1-'
@@ -48,4 +64,14 @@ class BloodType(StrEnum):
 
 class GenderType(StrEnum):
     MALE = 'M'
-    FEMALE = 'F'
\ No newline at end of file
+    FEMALE = 'F'
+
+class RevocationReason(StrEnum):
+    LOGOUT = 'LOGOUT'
+    ROTATED = 'ROTATED'
+    REUSED = 'REUSED'
+
+class AuditAction(StrEnum):
+    CREATE = 'CREATE'
+    UPDATE = 'UPDATE'
+    DELETE = 'DELETE'
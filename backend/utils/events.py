@@ -0,0 +1,119 @@
+import asyncio
+import json
+import uuid
+from collections import deque
+from dataclasses import dataclass, field
+
+CLOSED = object()
+
+
+@dataclass
+class Event:
+    id: str
+    seq: int
+    type: str
+    data: dict
+    channels: tuple[str, ...]
+
+    def encode(self) -> bytes:
+        return f'id: {self.id}\nevent: {self.type}\ndata: {json.dumps(self.data, default=str)}\n\n'.encode()
+
+
+@dataclass(eq=False)
+class Subscriber:
+    channel: str
+    queue: asyncio.Queue = field(repr=False)
+
+
+class EventBroker:
+    # Pub/sub внутри процесса. Подписчик - это очередь на одном канале; простаивающее
+    # соединение не делает ничего, кроме ожидания очереди и редкого пинга
+    def __init__(self, buffer_size: int, queue_size: int):
+        # Id экземпляра брокера: воркеры, запущенные в одну секунду, не должны принимать чужой Last-Event-ID
+        self.boot = uuid.uuid4().hex
+        self.seq = 0
+        self.buffer: deque[Event] = deque(maxlen=buffer_size)
+        self.queue_size = queue_size
+        self.channels: dict[str, set[Subscriber]] = {}
+        self.loop: asyncio.AbstractEventLoop | None = None
+
+    def subscribe(self, channel: str) -> Subscriber:
+        self.loop = asyncio.get_running_loop()
+        subscriber = Subscriber(channel=channel, queue=asyncio.Queue(maxsize=self.queue_size))
+        self.channels.setdefault(channel, set()).add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber):
+        subscribers = self.channels.get(subscriber.channel)
+        if subscribers is not None:
+            subscribers.discard(subscriber)
+            if not subscribers:
+                del self.channels[subscriber.channel]
+
+    def publish(self, type: str, data: dict, channels: tuple[str, ...]):
+        # Можно вызывать и из потоков пула: доставка всегда выполняется в цикле событий
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if self.loop is not None and running is not self.loop:
+            self.loop.call_soon_threadsafe(self._publish, type, data, channels)
+        else:
+            self._publish(type, data, channels)
+
+    def _publish(self, type: str, data: dict, channels: tuple[str, ...]):
+        self.seq += 1
+        event = Event(id=f'{self.boot}-{self.seq}', seq=self.seq, type=type, data=data, channels=channels)
+        self.buffer.append(event)
+        for channel in channels:
+            for subscriber in list(self.channels.get(channel, ())):
+                try:
+                    subscriber.queue.put_nowait(event)
+                except asyncio.QueueFull:
+                    # Медленный клиент: отключаем, он переподключится и докачает пропущенное
+                    self.unsubscribe(subscriber)
+                    subscriber.queue.get_nowait()
+                    subscriber.queue.put_nowait(CLOSED)
+
+    def replay(self, channel: str, last_event_id: str | None) -> list[Event] | None:
+        # None - продолжить нельзя (рестарт процесса или событие уже вытеснено из буфера)
+        if not last_event_id:
+            return []
+        boot, _, seq = last_event_id.partition('-')
+        if boot != self.boot or not seq.isdigit():
+            return None
+        seq = int(seq)
+        if self.buffer and seq < self.buffer[0].seq - 1:
+            return None
+        return [event for event in self.buffer if event.seq > seq and channel in event.channels]
+
+    def close(self):
+        for subscribers in list(self.channels.values()):
+            for subscriber in list(subscribers):
+                self.unsubscribe(subscriber)
+                if subscriber.queue.full():
+                    subscriber.queue.get_nowait()
+                subscriber.queue.put_nowait(CLOSED)
+
+
+async def stream(broker: EventBroker, subscriber: Subscriber, backlog: list[Event] | None,
+                 heartbeat: float, retry_ms: int):
+    try:
+        yield f'retry: {retry_ms}\n\n'.encode()
+        if backlog is None:
+            # Клиент должен один раз перечитать данные обычным запросом
+            yield b'event: reset\ndata: {}\n\n'
+        else:
+            for event in backlog:
+                yield event.encode()
+        while True:
+            try:
+                event = await asyncio.wait_for(subscriber.queue.get(), heartbeat)
+            except asyncio.TimeoutError:
+                yield b': ping\n\n'
+                continue
+            if event is CLOSED:
+                return
+            yield event.encode()
+    finally:
+        broker.unsubscribe(subscriber)
@@ -0,0 +1,40 @@
+from functools import lru_cache
+from fastapi import HTTPException
+from pydantic import BaseModel, create_model
+from sqlalchemy import inspect
+from sqlalchemy.orm import load_only
+from utils.enums import Status
+
+def parse_fields(schema: type[BaseModel], fields: str | None) -> tuple[str, ...] | None:
+    # ?fields=id,name,diagnosis -> ('id', 'name', 'diagnosis'); None означает полный ответ
+    if not fields:
+        return None
+    requested = tuple(dict.fromkeys(field.strip() for field in fields.split(',') if field.strip()))
+    unknown = [field for field in requested if field not in schema.model_fields]
+    if unknown:
+        raise HTTPException(status_code=400, detail={'status': Status.FAILED.value, 'fields': unknown})
+    if 'id' in schema.model_fields and 'id' not in requested:
+        requested = ('id',) + requested
+    return requested
+
+
+def wants(fields: tuple[str, ...] | None, name: str) -> bool:
+    return fields is None or name in fields
+
+
+def load_fields(query, fields: tuple[str, ...] | None, required: tuple[str, ...] = ()):
+    # Переводит набор полей ответа в load_only: в SELECT попадают только нужные колонки
+    model = query.column_descriptions[0]['entity']
+    if fields is None:
+        return query
+    columns = [column for column in inspect(model).columns.keys()
+               if column in fields or column in required]
+    return query.options(load_only(*[getattr(model, column) for column in columns]))
+
+
+@lru_cache(maxsize=None)
+def trim_schema(schema: type[BaseModel], fields: tuple[str, ...] | None) -> type[BaseModel]:
+    if fields is None:
+        return schema
+    return create_model(f'{schema.__name__}Fields',
+                        **{name: (info.annotation, info) for name, info in schema.model_fields.items() if name in fields})
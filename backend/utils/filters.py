@@ -0,0 +1,61 @@
+from fastapi import HTTPException, Request
+from pydantic import TypeAdapter, ValidationError
+from sqlalchemy import inspect
+from utils.enums import Status
+
+# Фильтры вида <колонка>__<оператор>=значение, например check_in_date__gte=2025-06-01,
+# status__in=PAID,ACTIVE, name__startswith=Ива. Без оператора - обычное равенство
+OPERATORS = {
+    'eq': lambda column, value: column == value,
+    'ne': lambda column, value: column != value,
+    'lt': lambda column, value: column < value,
+    'lte': lambda column, value: column <= value,
+    'gt': lambda column, value: column > value,
+    'gte': lambda column, value: column >= value,
+    'in': lambda column, value: column.in_(value),
+    'startswith': lambda column, value: column.startswith(value, autoescape=True),
+    'contains': lambda column, value: column.contains(value, autoescape=True),
+}
+LIST_OPERATORS = {'in'}
+
+
+def split_filter(key: str) -> tuple[str, str]:
+    column, _, operator = key.partition('__')
+    return column, operator or 'eq'
+
+
+def compile_filters(model, filters: dict) -> list:
+    columns = inspect(model).columns
+    clauses = []
+    for key, value in filters.items():
+        name, operator = split_filter(key)
+        if name not in columns or operator not in OPERATORS:
+            raise ValueError(f'Unsupported filter: {key}')
+        clauses.append(OPERATORS[operator](getattr(model, name), value))
+    return clauses
+
+
+def query_filters(model):
+    # Зависимость для роутов: собирает из query-параметров все фильтры с оператором,
+    # проверяет их по колонкам модели и приводит значения к типу колонки
+    columns = inspect(model).columns
+
+    def dependency(request: Request) -> dict:
+        filters = {}
+        for key, raw in request.query_params.multi_items():
+            if '__' not in key:
+                continue
+            name, operator = split_filter(key)
+            if name not in columns or operator not in OPERATORS:
+                raise HTTPException(status_code=400, detail={'status': Status.FAILED.value, 'filter': key})
+            adapter = TypeAdapter(columns[name].type.python_type)
+            try:
+                if operator in LIST_OPERATORS:
+                    value = [adapter.validate_python(item) for item in raw.split(',') if item]
+                else:
+                    value = adapter.validate_python(raw)
+            except ValidationError:
+                raise HTTPException(status_code=400, detail={'status': Status.FAILED.value, 'filter': key})
+            filters[key] = value
+        return filters
+    return dependency
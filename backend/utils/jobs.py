@@ -0,0 +1,213 @@
+import asyncio
+import inspect
+import logging
+import random
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Callable
+from sqlalchemy import update, and_, or_
+from config.jobs import (JOBS_POLL_INTERVAL, JOBS_VISIBILITY_TIMEOUT, JOBS_BACKOFF_BASE,
+                         JOBS_BACKOFF_MAX, JOBS_SHUTDOWN_GRACE)
+from models.jobs import Job
+from utils.enums import JobStatus
+
+logger = logging.getLogger('uvicorn.error')
+
+
+@dataclass(frozen=True)
+class JobType:
+    name: str
+    func: Callable
+    concurrency: int
+    timeout: int
+
+
+HANDLERS: dict[str, JobType] = {}
+
+
+def job_handler(name: str, concurrency: int = 1, timeout: int = JOBS_VISIBILITY_TIMEOUT):
+    # Обработчик получает payload и отдельную сессию: handler(payload, session).
+    # Доставка "хотя бы один раз", поэтому обработчик должен быть идемпотентным
+    def decorator(func):
+        HANDLERS[name] = JobType(name=name, func=func, concurrency=concurrency, timeout=timeout)
+        return func
+    return decorator
+
+
+def backoff(attempts: int) -> float:
+    delay = min(JOBS_BACKOFF_BASE * 2 ** max(attempts - 1, 0), JOBS_BACKOFF_MAX)
+    return delay * random.uniform(0.5, 1)
+
+
+def available(now: datetime):
+    # Ждущие своего времени задачи и взятые, но не завершенные за таймаут видимости
+    return or_(and_(Job.status == JobStatus.PENDING.value, Job.run_at <= now),
+               and_(Job.status == JobStatus.RUNNING.value, Job.locked_until < now))
+
+
+class JobRunner:
+    def __init__(self, session_factory, handlers: dict[str, JobType] = HANDLERS,
+                 poll_interval: float = JOBS_POLL_INTERVAL):
+        self.session_factory = session_factory
+        self.handlers = handlers
+        self.poll_interval = poll_interval
+        self.running: dict[str, int] = defaultdict(int)
+        self.tasks: set[asyncio.Task] = set()
+        self.stopping = asyncio.Event()
+        self.wakeup = asyncio.Event()
+        self.loop_task: asyncio.Task | None = None
+
+    def session(self):
+        session = self.session_factory()
+        session.info['primary'] = True
+        return session
+
+    async def start(self):
+        self.loop_task = asyncio.create_task(self.run())
+
+    async def stop(self, grace: float = JOBS_SHUTDOWN_GRACE):
+        # Незавершенные задачи остаются RUNNING и после таймаута видимости будут взяты снова
+        self.stopping.set()
+        if self.loop_task is not None:
+            await self.loop_task
+        if self.tasks:
+            await asyncio.wait(self.tasks, timeout=grace)
+
+    def wake(self):
+        self.wakeup.set()
+
+    async def run(self):
+        while not self.stopping.is_set():
+            free = {name: job_type.concurrency - self.running[name]
+                    for name, job_type in self.handlers.items()
+                    if job_type.concurrency > self.running[name]}
+            if free:
+                try:
+                    claimed = await asyncio.to_thread(self.claim, free)
+                except Exception as e:
+                    logger.warning('Job queue poll failed: %s', e)
+                    claimed = []
+                for job in claimed:
+                    self.running[job['type']] += 1
+                    task = asyncio.create_task(self.execute(job))
+                    self.tasks.add(task)
+                    task.add_done_callback(self.tasks.discard)
+            self.wakeup.clear()
+            waiters = [asyncio.create_task(self.stopping.wait()), asyncio.create_task(self.wakeup.wait())]
+            await asyncio.wait(waiters, timeout=self.poll_interval, return_when=asyncio.FIRST_COMPLETED)
+            for waiter in waiters:
+                waiter.cancel()
+
+    def claim(self, free: dict[str, int]) -> list[dict]:
+        # Кандидаты берутся обычным SELECT, а задача считается взятой, только если условный
+        # UPDATE изменил строку: так несколько воркеров не возьмут одну задачу без SKIP LOCKED
+        session = self.session()
+        try:
+            now = datetime.now()
+            candidates = (session.query(Job.id, Job.type)
+                          .filter(Job.type.in_(list(free)), available(now))
+                          .order_by(Job.run_at)
+                          .limit(sum(free.values()) * 2)
+                          .all())
+            claimed = []
+            for id, type in candidates:
+                if free[type] <= 0:
+                    continue
+                result = session.execute(
+                    update(Job).where(Job.id == id, available(now))
+                    .values(status=JobStatus.RUNNING.value, attempts=Job.attempts + 1,
+                            locked_until=now + timedelta(seconds=self.handlers[type].timeout))
+                    .execution_options(synchronize_session=False))
+                if result.rowcount == 1:
+                    free[type] -= 1
+                    claimed.append(id)
+            session.commit()
+            if not claimed:
+                return []
+            rows = session.query(Job.id, Job.type, Job.payload, Job.attempts, Job.max_attempts) \
+                .filter(Job.id.in_(claimed)).all()
+            return [row._asdict() for row in rows]
+        finally:
+            session.close()
+
+    def call(self, job_type: JobType, payload: dict):
+        session = self.session()
+        try:
+            return job_type.func(payload, session)
+        finally:
+            session.close()
+
+    async def execute(self, job: dict):
+        job_type = self.handlers[job['type']]
+        error = None
+        try:
+            if inspect.iscoroutinefunction(job_type.func):
+                session = self.session()
+                try:
+                    await asyncio.wait_for(job_type.func(job['payload'], session), job_type.timeout)
+                finally:
+                    session.close()
+            else:
+                thread = asyncio.ensure_future(asyncio.to_thread(self.call, job_type, job['payload']))
+                try:
+                    await asyncio.wait_for(asyncio.shield(thread), job_type.timeout)
+                except asyncio.TimeoutError:
+                    # Поток не прервать: задача остается взятой, пока он не закончится, иначе повтор
+                    # пошел бы параллельно с первой попыткой. Результат берется у самого потока
+                    logger.warning('Job %s (%s) exceeded %ss, waiting for its thread', job['id'], job['type'],
+                                   job_type.timeout)
+                    await self.hold(job, job_type, thread)
+        except Exception as e:
+            error = f'{type(e).__name__}: {e}' if str(e) else type(e).__name__
+            logger.warning('Job %s (%s) attempt %s failed: %s', job['id'], job['type'], job['attempts'], error)
+        finally:
+            self.running[job['type']] -= 1
+        try:
+            await asyncio.to_thread(self.finish, job, error)
+        except Exception as e:
+            logger.warning('Job %s result not saved, it will be retried: %s', job['id'], e)
+        self.wake()
+
+    async def hold(self, job: dict, job_type: JobType, thread: asyncio.Future):
+        while True:
+            try:
+                await asyncio.to_thread(self.extend, job, job_type.timeout)
+            except Exception as e:
+                logger.warning('Job %s lock not extended: %s', job['id'], e)
+            done, _ = await asyncio.wait({thread}, timeout=job_type.timeout / 2)
+            if done:
+                return thread.result()
+
+    def extend(self, job: dict, timeout: int):
+        session = self.session()
+        try:
+            session.execute(update(Job)
+                            .where(Job.id == job['id'], Job.status == JobStatus.RUNNING.value,
+                                   Job.attempts == job['attempts'])
+                            .values(locked_until=datetime.now() + timedelta(seconds=timeout))
+                            .execution_options(synchronize_session=False))
+            session.commit()
+        finally:
+            session.close()
+
+    def finish(self, job: dict, error: str | None):
+        now = datetime.now()
+        if error is None:
+            values = {'status': JobStatus.DONE.value, 'finished_at': now, 'last_error': None}
+        elif job['attempts'] >= job['max_attempts']:
+            values = {'status': JobStatus.FAILED.value, 'finished_at': now, 'last_error': error}
+        else:
+            values = {'status': JobStatus.PENDING.value, 'last_error': error,
+                      'run_at': now + timedelta(seconds=backoff(job['attempts']))}
+        session = self.session()
+        try:
+            # attempts в условии: если задачу уже перехватил другой воркер, результат не перезаписываем
+            session.execute(update(Job)
+                            .where(Job.id == job['id'], Job.status == JobStatus.RUNNING.value,
+                                   Job.attempts == job['attempts'])
+                            .values(locked_until=None, **values)
+                            .execution_options(synchronize_session=False))
+            session.commit()
+        finally:
+            session.close()
@@ -0,0 +1,82 @@
+import asyncio
+import threading
+import time
+from collections import Counter
+from sqlalchemy.pool import QueuePool
+
+
+class TimedQueuePool(QueuePool):
+    # QueuePool, который знает, сколько потоков сейчас ждут соединение и как долго
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.waiters: dict[int, float] = {}
+        self.recent_wait = 0.0
+
+    def _do_get(self):
+        start = time.monotonic()
+        self.waiters[threading.get_ident()] = start
+        try:
+            return super()._do_get()
+        finally:
+            self.waiters.pop(threading.get_ident(), None)
+            self.recent_wait = max(self.recent_wait, time.monotonic() - start)
+
+    def wait_time(self) -> float:
+        oldest = min(list(self.waiters.values()), default=None)
+        current = time.monotonic() - oldest if oldest is not None else 0.0
+        return max(current, self.recent_wait)
+
+    def decay(self):
+        self.recent_wait /= 2
+
+
+class LoadMonitor:
+    # Сигналы пересчитываются фоновой задачей раз в interval, middleware только читает их
+    def __init__(self, engines, pool_wait: float, max_in_flight: int, loop_lag: float, interval: float):
+        self.engines = engines
+        self.thresholds = {'pool_wait': pool_wait, 'in_flight': max_in_flight, 'loop_lag': loop_lag}
+        self.interval = interval
+        self.in_flight = 0
+        self.signals = {'pool_wait': 0.0, 'in_flight': 0, 'loop_lag': 0.0}
+        self.admitted = 0
+        self.shed: Counter[str] = Counter()
+        self.task: asyncio.Task | None = None
+
+    def pools(self):
+        # engine.pool пересоздается при dispose (после fork), поэтому берется каждый раз заново
+        return [engine.pool for engine in self.engines if isinstance(engine.pool, TimedQueuePool)]
+
+    def sample(self, lag: float):
+        pools = self.pools()
+        self.signals['pool_wait'] = round(max((pool.wait_time() for pool in pools), default=0.0), 3)
+        self.signals['loop_lag'] = round(lag, 3)
+        for pool in pools:
+            pool.decay()
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(self.interval)
+            self.sample(max(loop.time() - start - self.interval, 0.0))
+
+    def start(self):
+        self.task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+            await asyncio.gather(self.task, return_exceptions=True)
+
+    def overloaded(self) -> str | None:
+        self.signals['in_flight'] = self.in_flight
+        for name, threshold in self.thresholds.items():
+            if self.signals[name] > threshold:
+                return name
+        return None
+
+    def metrics(self) -> dict:
+        return {'signals': {**self.signals, 'in_flight': self.in_flight},
+                'thresholds': self.thresholds,
+                'admitted': self.admitted,
+                'shed': dict(self.shed)}
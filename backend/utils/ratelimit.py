@@ -0,0 +1,64 @@
+import threading
+from abc import ABC, abstractmethod
+import time
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class RateLimit:
+    method: str
+    path: str
+    key: str
+    capacity: int
+    rate: float # Токенов в секунду
+
+
+def parse_rate(value: str) -> tuple[int, float]:
+    # "5/60" - пять запросов за минуту: емкость ведра 5, пополнение 5/60 токена в секунду
+    count, _, seconds = value.partition('/')
+    count, seconds = int(count), float(seconds or 1)
+    return count, count / seconds
+
+
+def load_limits(rules) -> dict[tuple[str, str], RateLimit]:
+    limits = {}
+    for method, path, key, value in rules:
+        capacity, rate = parse_rate(value)
+        path = path.rstrip('/') or '/'
+        limits[(method, path)] = RateLimit(method=method, path=path, key=key, capacity=capacity, rate=rate)
+    return limits
+
+
+class RateLimitStore(ABC):
+    # Общее хранилище (например, Redis) должно реализовать take атомарно на своей стороне
+    @abstractmethod
+    async def take(self, key: str, capacity: int, rate: float) -> float:
+        # 0 - запрос пропущен, иначе через сколько секунд появится токен
+        pass
+
+
+class MemoryStore(RateLimitStore):
+    # Ключи раскиданы по шардам, lock держится только на время пересчета одного ведра.
+    # Вытесненный ключ просто начинает с полного ведра, поэтому хватает FIFO-вытеснения
+    def __init__(self, shards: int, max_keys: int):
+        self.shards = [({}, threading.Lock()) for _ in range(shards)]
+        self.max_keys = max_keys
+
+    def take_now(self, key: str, capacity: int, rate: float, now: float) -> float:
+        buckets, lock = self.shards[hash(key) % len(self.shards)]
+        with lock:
+            bucket = buckets.get(key)
+            if bucket is None:
+                if len(buckets) >= self.max_keys:
+                    del buckets[next(iter(buckets))]
+                bucket = buckets[key] = [float(capacity), now]
+            tokens = min(capacity, bucket[0] + (now - bucket[1]) * rate)
+            bucket[1] = now
+            if tokens >= 1:
+                bucket[0] = tokens - 1
+                return 0
+            bucket[0] = tokens
+            return (1 - tokens) / rate
+
+    async def take(self, key: str, capacity: int, rate: float) -> float:
+        return self.take_now(key, capacity, rate, time.monotonic())
@@ -0,0 +1,132 @@
+import threading
+import time
+from collections import defaultdict
+from typing import Callable
+from utils.contraindications import CompiledMatrix, normalize_icd
+
+# Поля курса, которые нужны для ответа без похода в БД
+COURSE_FIELDS = ('id', 'name', 'description', 'price', 'duration_days', 'id_diagnosis', 'version')
+
+
+class CourseIndex:
+    # Обратный индекс диагноз -> курсы -> процедуры. Собирается из справочников при первом
+    # запросе, дальше поддерживается записями CourseService на этом воркере; записи других
+    # воркеров подхватываются полной пересборкой раз в ttl секунд
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self.lock = threading.RLock()
+        self.loaded_at: float | None = None
+        self.courses: dict[int, dict] = {}
+        self.procedures: dict[int, set[int]] = {}
+        self.by_diagnosis: dict[int, set[int]] = defaultdict(set)
+        self.codes: dict[int, str] = {}
+        self.by_code: dict[str, set[int]] = defaultdict(set)
+        self.builds = 0
+
+    def ensure(self, loader: Callable[[], tuple]):
+        if self.loaded_at is not None and time.monotonic() - self.loaded_at < self.ttl:
+            return
+        with self.lock:
+            if self.loaded_at is not None and time.monotonic() - self.loaded_at < self.ttl:
+                return
+            # Правки, пришедшие во время загрузки, ждут блокировку и ложатся поверх
+            diagnoses, courses, course_procedures = loader()
+            self.courses, self.procedures = {}, {}
+            self.by_diagnosis, self.codes, self.by_code = defaultdict(set), {}, defaultdict(set)
+            for id, code in diagnoses:
+                self._set_code(id, code)
+            for course in courses:
+                self._put(course, set())
+            for id_course, id_procedure in course_procedures:
+                if id_course in self.procedures:
+                    self.procedures[id_course].add(id_procedure)
+            self.loaded_at = time.monotonic()
+            self.builds += 1
+
+    def _set_code(self, id_diagnosis: int, code: str | None):
+        previous = self.codes.pop(id_diagnosis, None)
+        if previous is not None:
+            self.by_code[previous].discard(id_diagnosis)
+        if code is not None:
+            self.codes[id_diagnosis] = normalize_icd(code)
+            self.by_code[self.codes[id_diagnosis]].add(id_diagnosis)
+
+    def _put(self, course: dict, ids_procedures: set[int] | None):
+        previous = self.courses.get(course['id'])
+        entry = {**(previous or {}), **{k: course[k] for k in COURSE_FIELDS if course.get(k) is not None}}
+        if previous is not None and previous['id_diagnosis'] != entry['id_diagnosis']:
+            self.by_diagnosis[previous['id_diagnosis']].discard(course['id'])
+        self.courses[course['id']] = entry
+        self.by_diagnosis[entry['id_diagnosis']].add(course['id'])
+        if ids_procedures is not None or course['id'] not in self.procedures:
+            self.procedures[course['id']] = set(ids_procedures or ())
+
+    # Правки из CourseService/DiagnosisService: пока индекс не загружен, их подхватит загрузка
+
+    def put_course(self, course: dict, ids_procedures: list[int] | None = None):
+        with self.lock:
+            if self.loaded_at is None:
+                return
+            if course['id'] in self.courses or all(course.get(k) is not None for k in COURSE_FIELDS):
+                self._put(course, set(ids_procedures) if ids_procedures is not None else None)
+            else:
+                # Курс создан на другом воркере, а СУБД не вернула строку целиком: перечитываем справочник
+                self.loaded_at = None
+
+    def remove_course(self, id: int):
+        with self.lock:
+            entry = self.courses.pop(id, None)
+            self.procedures.pop(id, None)
+            if entry is not None:
+                self.by_diagnosis[entry['id_diagnosis']].discard(id)
+
+    def add_procedure(self, id_course: int, id_procedure: int):
+        with self.lock:
+            if id_course in self.procedures:
+                self.procedures[id_course].add(id_procedure)
+
+    def remove_procedure(self, id_procedure: int):
+        with self.lock:
+            for procedures in self.procedures.values():
+                procedures.discard(id_procedure)
+
+    def set_code(self, id_diagnosis: int, code: str | None):
+        with self.lock:
+            if self.loaded_at is not None:
+                self._set_code(id_diagnosis, code)
+
+    def invalidate(self):
+        with self.lock:
+            self.loaded_at = None
+
+    def covering(self, code: str) -> set[int]:
+        # Курсы на диагноз и на все его предков по МКБ: курс на J45 подходит и для J45.0
+        found = set()
+        for length in range(1, len(code) + 1):
+            for id_diagnosis in self.by_code.get(code[:length], ()):
+                found |= self.by_diagnosis.get(id_diagnosis, set())
+        return found
+
+    def recommend(self, ids_diagnoses: list[int], matrix: CompiledMatrix) -> list[dict]:
+        # Ранжирование: сколько диагнозов ребенка покрывает курс, затем цена. Курсы,
+        # где хотя бы одна процедура противопоказана при диагнозах ребенка, отбрасываются
+        mask = matrix.mask(ids_diagnoses)
+        with self.lock:
+            covered: dict[int, set[int]] = defaultdict(set)
+            for id_diagnosis in set(ids_diagnoses):
+                code = self.codes.get(id_diagnosis)
+                ids_courses = self.covering(code) if code else self.by_diagnosis.get(id_diagnosis, set())
+                for id_course in ids_courses:
+                    covered[id_course].add(id_diagnosis)
+            result = [{'course': self.courses[id_course],
+                       'ids_diagnoses': sorted(ids),
+                       'ids_procedures': sorted(self.procedures.get(id_course, ())),
+                       'coverage': len(ids) / len(set(ids_diagnoses))}
+                      for id_course, ids in covered.items()
+                      if id_course in self.courses and not any(matrix.procedure_conflicts(id_procedure, mask)
+                                                               for id_procedure in self.procedures.get(id_course, ()))]
+        result.sort(key=lambda item: (-len(item['ids_diagnoses']), float(item['course']['price']), item['course']['id']))
+        return result
+
+    def metrics(self) -> dict:
+        return {'courses': len(self.courses), 'diagnoses': len(self.codes), 'builds': self.builds}
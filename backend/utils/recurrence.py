@@ -0,0 +1,144 @@
+import re
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta
+from functools import lru_cache
+
+# Procedure.frequency - свободный текст из админки: "2 раза в день", "через день",
+# "3 раза в неделю", "пн, ср, пт", "каждые 3 дня", "10 процедур", "однократно"
+WEEKDAYS = {'пн': 0, 'вт': 1, 'ср': 2, 'чт': 3, 'пт': 4, 'сб': 5, 'вс': 6,
+            'mon': 0, 'tue': 1, 'wed': 2, 'thu': 3, 'fri': 4, 'sat': 5, 'sun': 6}
+# Полные названия во всех падежах: "по вторникам", "в среду", "пятница". Только точные словоформы:
+# по основе "сред" днем недели оказалось бы и "в среднем"
+WEEKDAY_FORMS = [(re.compile(pattern), day) for pattern, day in (
+    (r'понедельник(?:а|у|ом|е|и|ов|ам|ами|ах)?', 0), (r'вторник(?:а|у|ом|е|и|ов|ам|ами|ах)?', 1),
+    (r'сред(?:а|ы|е|у|ой|ам|ами|ах)', 2), (r'четверг(?:а|у|ом|е|и|ов|ам|ами|ах)?', 3),
+    (r'пятниц(?:а|ы|е|у|ей|ам|ами|ах)?', 4), (r'суббот(?:а|ы|е|у|ой|ам|ами|ах)?', 5),
+    (r'воскресень(?:е|я|ю|ем|ям|ями|ях)|воскресений', 6),
+    (r'mondays?', 0), (r'tuesdays?', 1), (r'wednesdays?', 2), (r'thursdays?', 3),
+    (r'fridays?', 4), (r'saturdays?', 5), (r'sundays?', 6))]
+NUMBERS = {'один': 1, 'одна': 1, 'два': 2, 'две': 2, 'три': 3, 'четыре': 4, 'пять': 5, 'шесть': 6,
+           'once': 1, 'twice': 2, 'one': 1, 'two': 2, 'three': 3, 'four': 4}
+NUMBER = r'(\d+|' + '|'.join(NUMBERS) + r')?'
+
+PER_DAY = re.compile(NUMBER + r'\s*(?:раз[а]?|р\.?|x|х|times?)?\s*(?:в|/|a|per)\s*(?:день|сутки|д\.?|day)\b')
+PER_WEEK = re.compile(NUMBER + r'\s*(?:раз[а]?|р\.?|x|х|times?)?\s*(?:в|/|a|per)\s*(?:неделю|нед\.?|week)\b')
+EVERY_DAYS = re.compile(r'(?:каждые|раз в|every)\s*(\d+)\s*(?:дн[яей]*|сут\w*|days?)')
+TOTAL = re.compile(r'(\d+)\s*(?:процедур\w*|сеанс\w*|sessions?|procedures?)')
+
+
+@dataclass(frozen=True)
+class Recurrence:
+    times_per_day: int = 1
+    interval_days: int = 1 # Каждый n-й день начиная с первого дня курса
+    weekdays: frozenset[int] | None = None # Только эти дни недели (0 - понедельник)
+    total: int | None = None # Не больше стольких процедур за курс
+
+    def days(self, start: date, end: date):
+        # Дни курса [start, end), в которые назначена процедура
+        day = start
+        while day < end:
+            if (day - start).days % self.interval_days == 0 and (self.weekdays is None or day.weekday() in self.weekdays):
+                yield day
+            day += timedelta(days=1)
+
+    def occurrences(self, start: date, end: date, day_start: time, day_end: time) -> list[datetime]:
+        # Приемы за день равномерно распределяются по рабочему окну
+        window = datetime.combine(start, day_end) - datetime.combine(start, day_start)
+        step = window / self.times_per_day
+        result = []
+        for day in self.days(start, end):
+            begin = datetime.combine(day, day_start)
+            for i in range(self.times_per_day):
+                if self.total is not None and len(result) >= self.total:
+                    return result
+                result.append(begin + step * i)
+        return result
+
+
+def number(value: str | None) -> int:
+    if not value:
+        return 1
+    return int(value) if value.isdigit() else NUMBERS[value]
+
+
+def weekday(word: str) -> int | None:
+    if word in WEEKDAYS:
+        return WEEKDAYS[word]
+    return next((day for form, day in WEEKDAY_FORMS if form.fullmatch(word)), None)
+
+
+def spread(count: int) -> frozenset[int]:
+    # "N раз в неделю" без явных дней: равномерно, начиная с понедельника
+    count = min(max(count, 1), 7)
+    return frozenset(i * 7 // count for i in range(count))
+
+
+@lru_cache(maxsize=1024)
+def parse_frequency(text: str | None) -> Recurrence | None:
+    # None - частоту не удалось разобрать; такие процедуры планируются вручную
+    if not text:
+        return None
+    text = text.lower().replace('ё', 'е').strip()
+    if re.search(r'однократно|один раз$|^once$|разово', text):
+        return Recurrence(total=1)
+    found = False
+    times_per_day, interval_days, weekdays, total = 1, 1, None, None
+    if match := PER_DAY.search(text):
+        times_per_day, found = number(match.group(1)), True
+    elif re.search(r'ежедневно|каждый день|daily|every day', text):
+        found = True
+    if re.search(r'через день|every other day', text):
+        interval_days, found = 2, True
+    elif match := EVERY_DAYS.search(text):
+        interval_days, found = max(int(match.group(1)), 1), True
+    named = {weekday(word) for word in re.findall(r'[a-zа-я]+', text)} - {None}
+    if named:
+        weekdays, found = frozenset(named), True
+    elif match := PER_WEEK.search(text):
+        weekdays, found = spread(number(match.group(1))), True
+    elif re.search(r'еженедельно|weekly', text):
+        weekdays, found = spread(1), True
+    if match := TOTAL.search(text):
+        total, found = int(match.group(1)), True
+    if not found:
+        return None
+    return Recurrence(times_per_day=max(times_per_day, 1), interval_days=interval_days, weekdays=weekdays, total=total)
+
+
+SHIFT = re.compile(r'(\d{1,2})(?:[:.](\d{2}))?\s*[-–—]\s*(\d{1,2})(?:[:.](\d{2}))?')
+DAY_RANGE = re.compile(r'([a-zа-я]+)\.?\s*[-–—]\s*([a-zа-я]+)')
+
+
+def schedule_days(text: str) -> set[int]:
+    days = set()
+    for first, last in DAY_RANGE.findall(text):
+        start, end = weekday(first), weekday(last)
+        if start is not None and end is not None:
+            days.update((start + i) % 7 for i in range((end - start) % 7 + 1))
+    if not days:
+        days = {weekday(word) for word in re.findall(r'[a-zа-я]+', text)} - {None}
+    return days
+
+
+@lru_cache(maxsize=1024)
+def parse_schedule(text: str | None) -> dict[int, tuple[tuple[time, time], ...]] | None:
+    # Staff.schedule: "Пн-Пт 9:00-18:00", "Пн, Ср, Пт 8-14; Сб 10:00-15:00", "ежедневно 9-17".
+    # Дни перед часами относятся к ним; без дней - каждый день. None - график не разобран
+    if not text:
+        return None
+    text = text.lower().replace('ё', 'е')
+    shifts: dict[int, list[tuple[time, time]]] = {}
+    position = 0
+    for match in SHIFT.finditer(text):
+        start_hour, start_minute, end_hour, end_minute = match.groups()
+        if int(start_hour) > 23 or int(end_hour) > 24:
+            return None
+        start = time(int(start_hour), int(start_minute or 0))
+        end = time.max if int(end_hour) == 24 else time(int(end_hour), int(end_minute or 0))
+        days = schedule_days(text[position:match.start()]) or set(range(7))
+        position = match.end()
+        for day in days:
+            shifts.setdefault(day, []).append((start, end))
+    if not shifts:
+        return None
+    return {day: tuple(sorted(windows)) for day, windows in shifts.items()}
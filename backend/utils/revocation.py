@@ -0,0 +1,143 @@
+import asyncio
+import hashlib
+import logging
+import math
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Callable
+from sqlalchemy import delete
+
+logger = logging.getLogger('uvicorn.error')
+
+
+class BloomFilter:
+    # Ответ "нет" точный, "да" - с вероятностью ошибки error_rate при заполнении до capacity
+    def __init__(self, capacity: int, error_rate: float):
+        self.capacity = max(capacity, 1)
+        self.size = max(int(-self.capacity * math.log(error_rate) / math.log(2) ** 2), 8)
+        self.hashes = max(round(self.size / self.capacity * math.log(2)), 1)
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def positions(self, key: str):
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        h1, h2 = int.from_bytes(digest[:8], 'little'), int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hashes)]
+
+    def add(self, key: str):
+        for position in self.positions(key):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, key: str) -> bool:
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self.positions(key))
+
+
+class RevocationList:
+    # Проверка "не отозван" без обращения к БД: отрицательный ответ фильтра окончательный,
+    # положительный подтверждается LRU недавних отзывов, а при промахе - запросом lookup.
+    # Отзывы других воркеров подтягиваются из таблицы раз в sync_interval
+    def __init__(self, model, capacity: int, error_rate: float, recent_size: int, sync_interval: float):
+        self.model = model
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.recent_size = recent_size
+        self.sync_interval = sync_interval
+        self.filter = BloomFilter(capacity, error_rate)
+        self.recent: OrderedDict[str, None] = OrderedDict()
+        self.watermark: datetime | None = None
+        self.lock = threading.Lock()
+        self.session_factory = None
+        self.task: asyncio.Task | None = None
+        self.lookups = 0
+
+    def remember(self, key: str):
+        self.recent[key] = None
+        self.recent.move_to_end(key)
+        if len(self.recent) > self.recent_size:
+            self.recent.popitem(last=False)
+
+    def add(self, keys: list[str]):
+        with self.lock:
+            for key in keys:
+                self.filter.add(key)
+                self.remember(key)
+            grow = self.filter.count > self.filter.capacity
+        if grow and self.session_factory is not None:
+            # Переполненный фильтр начинает чаще ошибаться: перестраиваем с запасом при следующей синхронизации
+            self.watermark = None
+
+    def is_revoked(self, key: str, lookup: Callable[[str], bool]) -> bool:
+        with self.lock:
+            if key in self.recent:
+                self.recent.move_to_end(key)
+                return True
+            if key not in self.filter:
+                return False
+        self.lookups += 1
+        revoked = lookup(key)
+        if revoked:
+            with self.lock:
+                self.remember(key)
+        return revoked
+
+    def rebuild(self, session):
+        # Истекшие строки больше не нужны: такие токены отклоняет сама проверка exp
+        now = datetime.now()
+        session.execute(delete(self.model).where(self.model.expires_at < now))
+        session.commit()
+        rows = session.query(self.model.jti, self.model.revoked_at).filter(self.model.expires_at >= now).all()
+        bloom = BloomFilter(max(self.capacity, len(rows) * 2), self.error_rate)
+        for jti, _ in rows:
+            bloom.add(jti)
+        with self.lock:
+            self.filter = bloom
+        self.watermark = max((revoked_at for _, revoked_at in rows), default=now)
+        logger.info('Revocation list rebuilt: %s tokens', len(rows))
+
+    def sync(self, session):
+        if self.watermark is None:
+            return self.rebuild(session)
+        # Небольшое перекрытие: часы воркеров расходятся, повторное добавление безвредно
+        rows = session.query(self.model.jti, self.model.revoked_at) \
+            .filter(self.model.revoked_at >= self.watermark - timedelta(seconds=self.sync_interval)).all()
+        if rows:
+            with self.lock:
+                for jti, _ in rows:
+                    self.filter.add(jti)
+            self.watermark = max(self.watermark, *(revoked_at for _, revoked_at in rows))
+
+    def refresh(self):
+        session = self.session_factory()
+        session.info['primary'] = True
+        try:
+            self.sync(session)
+        finally:
+            session.close()
+
+    async def run(self):
+        while True:
+            await asyncio.sleep(self.sync_interval)
+            try:
+                await asyncio.to_thread(self.refresh)
+            except Exception as e:
+                logger.warning('Revocation list sync failed: %s', e)
+
+    def start(self, session_factory):
+        self.session_factory = session_factory
+        try:
+            self.refresh()
+        except Exception as e:
+            # Без списка отзывы все равно ловятся вставкой jti при обновлении токена
+            logger.warning('Revocation list not loaded: %s', e)
+        self.task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+            await asyncio.gather(self.task, return_exceptions=True)
+
+    def metrics(self) -> dict:
+        return {'filter_size': self.filter.size, 'filter_hashes': self.filter.hashes,
+                'revoked': self.filter.count, 'recent': len(self.recent), 'lookups': self.lookups}
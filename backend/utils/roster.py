@@ -0,0 +1,108 @@
+import threading
+import time as clock
+from bisect import bisect_right
+from collections import OrderedDict, defaultdict
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta
+from typing import Callable
+
+
+@dataclass(frozen=True)
+class Shift:
+    id_staff: int
+    department: str | None
+    start: datetime
+    end: datetime
+
+
+def shift_bounds(day: date, start: time, end: time) -> tuple[datetime, datetime]:
+    # Конец не позже начала - смена через полночь (20:00-08:00)
+    begin = datetime.combine(day, start)
+    finish = datetime.combine(day, end)
+    if finish <= begin:
+        finish += timedelta(days=1)
+    return begin, finish
+
+
+def expand(day: date, patterns: list, exceptions: list) -> list[Shift]:
+    # patterns/exceptions - строки (id_staff, department, weekday|day, start_time, end_time).
+    # Если на дату у сотрудника есть исключения, недельный график в этот день не действует:
+    # исключение без времени - выходной, со временем - смена вместо обычной
+    overridden = {row[0] for row in exceptions if row[2] == day}
+    shifts = []
+    for id_staff, department, weekday, start, end in patterns:
+        if weekday == day.weekday() and id_staff not in overridden:
+            shifts.append(Shift(id_staff, department, *shift_bounds(day, start, end)))
+    for id_staff, department, exception_day, start, end in exceptions:
+        if exception_day == day and start is not None and end is not None:
+            shifts.append(Shift(id_staff, department, *shift_bounds(day, start, end)))
+    return shifts
+
+
+class DayIndex:
+    # Смены, пересекающие сутки, разбиты на элементарные отрезки между соседними границами;
+    # для каждого отрезка заранее известен состав по отделам. Запрос - один bisect
+    def __init__(self, day: date, shifts: list[Shift]):
+        start, end = datetime.combine(day, time.min), datetime.combine(day + timedelta(days=1), time.min)
+        self.shifts = [shift for shift in shifts if shift.start < end and shift.end > start]
+        self.bounds = sorted({max(shift.start, start) for shift in self.shifts} |
+                             {min(shift.end, end) for shift in self.shifts})
+        self.segments: list[dict[str | None, tuple[int, ...]]] = []
+        for i, bound in enumerate(self.bounds[:-1]):
+            on_duty = defaultdict(set)
+            for shift in self.shifts:
+                if shift.start <= bound < shift.end:
+                    on_duty[shift.department].add(shift.id_staff)
+            self.segments.append({department: tuple(sorted(ids)) for department, ids in on_duty.items()})
+
+    def at(self, moment: datetime, department: str | None = None) -> list[int]:
+        i = bisect_right(self.bounds, moment) - 1
+        if i < 0 or i >= len(self.segments):
+            return []
+        segment = self.segments[i]
+        if department is not None:
+            return list(segment.get(department, ()))
+        return sorted({id for ids in segment.values() for id in ids})
+
+    def windows(self) -> dict[int, list[tuple[datetime, datetime]]]:
+        result = defaultdict(list)
+        for shift in self.shifts:
+            result[shift.id_staff].append((shift.start, shift.end))
+        return result
+
+
+class RosterIndex:
+    # Дни разворачиваются из графика лениво, при первом запросе, и живут ttl секунд:
+    # изменения на других воркерах подхватываются не позже чем через ttl
+    def __init__(self, ttl: float, max_days: int):
+        self.ttl = ttl
+        self.max_days = max_days
+        self.days: OrderedDict[date, tuple[float, DayIndex]] = OrderedDict()
+        self.lock = threading.Lock()
+        self.builds = 0
+
+    def day(self, day: date, loader: Callable[[date], list[Shift]]) -> DayIndex:
+        now = clock.monotonic()
+        with self.lock:
+            cached = self.days.get(day)
+            if cached is not None and now - cached[0] < self.ttl:
+                self.days.move_to_end(day)
+                return cached[1]
+        index = DayIndex(day, loader(day))
+        with self.lock:
+            self.builds += 1
+            self.days[day] = (now, index)
+            self.days.move_to_end(day)
+            while len(self.days) > self.max_days:
+                self.days.popitem(last=False)
+        return index
+
+    def on_duty(self, moment: datetime, department: str | None, loader: Callable[[date], list[Shift]]) -> list[int]:
+        return self.day(moment.date(), loader).at(moment, department)
+
+    def invalidate(self):
+        with self.lock:
+            self.days.clear()
+
+    def metrics(self) -> dict:
+        return {'days': len(self.days), 'builds': self.builds}
@@ -0,0 +1,87 @@
+import logging
+import random
+from contextvars import ContextVar
+from sqlalchemy import Select, event
+from sqlalchemy.orm import Session
+from utils.sharding import DEFAULT_SHARD, DEFAULT_ONLY_TABLES
+
+logger = logging.getLogger('uvicorn.error')
+
+# Выставляется middleware для запросов на запись и для клиентов, недавно писавших в БД
+use_primary: ContextVar[bool] = ContextVar('use_primary', default=False)
+
+
+class RoutingSession(Session):
+    # Сессия живет на шарде своего филиала (info['facility'] или явно info['shard']).
+    # На основном шарде SELECT уходят на одну из реплик, все остальное - на primary. После
+    # первой записи сессия до конца живет на primary, чтобы в рамках запроса читать свои изменения
+    def __init__(self, replicas=(), shards=None, facility_shards=None, **kwargs):
+        super().__init__(**kwargs)
+        self.replicas = list(replicas)
+        self.shards = shards or {}
+        self.facility_shards = facility_shards or {}
+        self.options = {'replicas': replicas, 'shards': shards, 'facility_shards': facility_shards, **kwargs}
+
+    def for_shard(self, name: str) -> 'RoutingSession':
+        session = type(self)(**self.options)
+        session.info['shard'] = name
+        return session
+
+    def shard(self) -> str:
+        if 'shard' in self.info:
+            return self.info['shard']
+        return self.facility_shards.get(self.info.get('facility'), DEFAULT_SHARD)
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        primary = super().get_bind(mapper=mapper, clause=clause, **kwargs)
+        name = self.shard()
+        # INSERT по таблице (add_ignore) приходит без mapper: имя берется из самого запроса
+        table = mapper.local_table if mapper is not None else getattr(clause, 'table', None)
+        if name != DEFAULT_SHARD and not (table is not None and table.name in DEFAULT_ONLY_TABLES):
+            return self.shards[name]
+        if not self.replicas or self.info.get('primary'):
+            return primary
+        if self._flushing or not isinstance(clause, Select) or clause._for_update_arg is not None:
+            if clause is not None or self._flushing:
+                self.info['primary'] = True
+            return primary
+        if 'replica' not in self.info:
+            self.info['replica'] = random.choice(self.replicas)
+        return self.info['replica']
+
+
+@event.listens_for(RoutingSession, 'after_commit')
+def replicate_to_shards(session: RoutingSession):
+    statements = session.info.pop('replicate', [])
+    if not statements:
+        return
+    from service.replication import ReplicationService
+    current = session.shard()
+    outbox = session.for_shard(DEFAULT_SHARD)
+    outbox.info['primary'] = True
+    try:
+        replication = ReplicationService.for_session(outbox)
+        for name, engine in session.shards.items():
+            if name == current:
+                continue
+            try:
+                # Пока у шарда есть недоставленные записи, новые встают в очередь за ними
+                if not replication.backlog(name):
+                    try:
+                        with engine.begin() as connection:
+                            for stmt in statements:
+                                connection.execute(stmt)
+                        continue
+                    except Exception as e:
+                        logger.warning('Replication to shard %s failed, queued for retry: %s', name, e)
+                replication.queue(name, statements)
+            except Exception as e:
+                # Коммит на своем шарде уже состоялся, а очередь повторов недоступна
+                logger.error('Replication to shard %s lost: %s', name, e)
+    finally:
+        outbox.close()
+
+
+@event.listens_for(RoutingSession, 'after_rollback')
+def discard_replication(session: RoutingSession):
+    session.info.pop('replicate', None)
@@ -0,0 +1,68 @@
+import base64
+from concurrent.futures import ThreadPoolExecutor
+from sqlalchemy import insert
+from sqlalchemy.ext import serializer
+
+DEFAULT_SHARD = 'default'
+
+# Справочники и учетные записи есть на каждом шарде: записи в них повторяются на всех шардах
+REPLICATED_TABLES = {'facilities', 'users', 'parents', 'staff', 'diagnosis', 'procedures',
+                     'treatment_courses', 'courses_procedures', 'staff_shifts',
+                     'contraindications'}
+# Служебные таблицы, которые живут только на основном шарде
+DEFAULT_ONLY_TABLES = {'jobs', 'audit_log', 'revoked_tokens'}
+
+
+def parse_mapping(value: str) -> dict[str, str]:
+    # "east=mysql+pymysql://...,west=..." / "2=east,3=west"
+    pairs = (item.split('=', 1) for item in value.split(',') if '=' in item)
+    return {key.strip(): target.strip() for key, target in pairs}
+
+
+def is_replicated(session, model) -> bool:
+    return model.__tablename__ in REPLICATED_TABLES and len(getattr(session, 'shards', {})) > 1
+
+
+def replicate(session, model, stmt):
+    # Запись повторяется на остальных шардах после коммита (см. RoutingSession)
+    if is_replicated(session, model):
+        session.info.setdefault('replicate', []).append(stmt)
+
+
+def replicate_row(session, entity):
+    # Для ORM add: строка уже получила id во flush, на остальные шарды уходит с тем же id
+    model = type(entity)
+    if is_replicated(session, model):
+        values = {column.key: getattr(entity, column.key) for column in model.__mapper__.column_attrs
+                  if getattr(entity, column.key) is not None}
+        replicate(session, model, insert(model).values(values))
+
+
+def dump_statements(statements) -> list[str]:
+    # Для очереди повторов в jobs: запрос Core сохраняется целиком, таблицы восстанавливаются по metadata
+    return [base64.b64encode(serializer.dumps(stmt)).decode() for stmt in statements]
+
+
+def load_statements(data: list[str], metadata) -> list:
+    return [serializer.loads(base64.b64decode(item), metadata) for item in data]
+
+
+def facility_of(session) -> int | None:
+    return session.info.get('facility')
+
+
+def fan_out(session, func) -> dict:
+    # Выполняет func(session) на каждом шарде параллельно, результат - {имя шарда: результат}
+    shards = getattr(session, 'shards', {})
+    if len(shards) <= 1:
+        return {DEFAULT_SHARD: func(session)}
+
+    def run(name):
+        shard_session = session.for_shard(name)
+        try:
+            return func(shard_session)
+        finally:
+            shard_session.close()
+
+    with ThreadPoolExecutor(max_workers=len(shards)) as executor:
+        return dict(zip(shards, executor.map(run, shards)))
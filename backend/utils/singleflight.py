@@ -0,0 +1,25 @@
+import asyncio
+import hashlib
+from collections import Counter
+from urllib.parse import parse_qsl, urlencode
+
+
+def normalize_query(query_string: bytes) -> str:
+    # Порядок параметров и способ экранирования не должны давать разные ключи
+    return urlencode(sorted(parse_qsl(query_string.decode('latin-1'), keep_blank_values=True)))
+
+
+class SingleFlight:
+    # Ключ -> future с сообщениями ответа первого (ведущего) запроса
+    def __init__(self):
+        self.flights: dict[tuple, asyncio.Future] = {}
+        self.leaders: Counter[str] = Counter()
+        self.coalesced: Counter[str] = Counter()
+
+    def key(self, path: str, query_string: bytes, authorization: str | None, facility: str | None) -> tuple:
+        scope = hashlib.blake2b(authorization.encode(), digest_size=16).hexdigest() if authorization else ''
+        return path, normalize_query(query_string), scope, facility
+
+    def metrics(self) -> dict:
+        return {path: {'executed': self.leaders[path], 'coalesced': self.coalesced[path]}
+                for path in self.leaders.keys() | self.coalesced.keys()}
@@ -0,0 +1,18 @@
+import jwt
+from config.auth import SECRET_KEY, ALGORITHM
+
+
+def bearer_claims(authorization: str | None) -> dict | None:
+    # Payload токена из заголовка Authorization: только проверка подписи, без похода в БД
+    if not authorization or not authorization.lower().startswith('bearer '):
+        return None
+    try:
+        payload = jwt.decode(authorization[7:], SECRET_KEY, algorithms=[ALGORITHM], options={'verify_sub': False})
+    except jwt.InvalidTokenError:
+        return None
+    return payload if 'sub' in payload else None
+
+
+def bearer_subject(authorization: str | None):
+    claims = bearer_claims(authorization)
+    return claims['sub'] if claims else None
@@ -0,0 +1,75 @@
+import inspect
+import logging
+import os
+import time
+from pydantic import BaseModel
+from sqlalchemy import text
+from sqlalchemy.orm import configure_mappers
+import schemas
+
+logger = logging.getLogger('uvicorn.error')
+
+
+def rss_mb() -> float:
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 1024 / 1024
+    except OSError:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def timed(timings: dict, name: str, func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    timings[name] = round((time.perf_counter() - start) * 1000, 1)
+    return result
+
+
+def build_schemas():
+    # Достраивает модели с forward-ссылками; валидаторы ответов FastAPI собирает сам при openapi()
+    models = [obj for obj in vars(schemas).values()
+              if inspect.isclass(obj) and issubclass(obj, BaseModel) and obj is not BaseModel]
+    for model in models:
+        model.model_rebuild()
+    return len(models)
+
+
+def preload(app) -> dict:
+    # Все, что не требует соединения с БД: безопасно выполнять в мастере до fork
+    timings = {}
+    timed(timings, 'configure_mappers', configure_mappers)
+    timed(timings, 'schemas', build_schemas)
+    timed(timings, 'openapi', app.openapi)
+    return timings
+
+
+def open_connections(engine, count: int):
+    connections = [engine.connect() for _ in range(count)]
+    for connection in connections:
+        connection.execute(text('SELECT 1'))
+        connection.close()
+
+
+def prime_catalogs(session_factory):
+    # Первый прогон запросов каталогов: компилирует их в кеш SQLAlchemy и прогревает буферы БД
+    from models import Diagnosis, Procedure, Room, TreatmentCourse, CourseProcedure
+    session = session_factory()
+    try:
+        for model in (Diagnosis, Procedure, Room, TreatmentCourse, CourseProcedure):
+            session.query(model).all()
+    finally:
+        session.close()
+
+
+def warm_up(app, engine, session_factory, connections: int) -> dict:
+    start = time.perf_counter()
+    timings = preload(app)
+    try:
+        timed(timings, 'connections', open_connections, engine, connections)
+        timed(timings, 'catalogs', prime_catalogs, session_factory)
+    except Exception as e:
+        logger.warning('Warm-up skipped database phase: %s', e)
+    timings['total'] = round((time.perf_counter() - start) * 1000, 1)
+    logger.info('Worker %s warmed up in %s ms, rss %.1f MB: %s', os.getpid(), timings['total'], rss_mb(), timings)
+    return timings